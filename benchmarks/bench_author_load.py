@@ -0,0 +1,72 @@
+"""Loading a catalogue where a few authors own most recipes.
+
+Writes a synthetic CSV from the bundled rows (fresh RecipeIds, every row
+credited to one of ``authors`` authors), times CSVDataReader.csv_reader on
+it, and times the list membership scan Author.add_recipe used to do for the
+same recipes.
+
+Usage: python benchmarks/bench_author_load.py [recipes] [authors]   (default 20000 2)
+"""
+import csv
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from recipe.adapters.datareader.csvdatareader import CSVDataReader
+from recipe.adapters.memory_repo import DEFAULT_CSV_PATH
+from recipe.domainmodel.author import Author
+
+
+def write_csv(path, count, authors):
+    with open(DEFAULT_CSV_PATH, encoding='utf-8') as source:
+        reader = csv.DictReader(source)
+        rows = list(reader)
+        fieldnames = reader.fieldnames
+    with open(path, 'w', encoding='utf-8', newline='') as target:
+        writer = csv.DictWriter(target, fieldnames=fieldnames)
+        writer.writeheader()
+        for i in range(count):
+            row = dict(rows[i % len(rows)])
+            row['RecipeId'] = str(i + 1)
+            row['AuthorId'] = str(i % authors + 1)
+            row['AuthorName'] = f"Prolific Author {i % authors + 1}"
+            writer.writerow(row)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    authors = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'recipes.csv')
+        write_csv(path, count, authors)
+        reader = CSVDataReader(path, lazy=True)
+        start = time.perf_counter()
+        reader.csv_reader()
+        load = time.perf_counter() - start
+
+    print(f"{count} recipes, {authors} authors "
+          f"({max(len(author.recipes) for author in reader.authors.values())} recipes each)")
+    print(f"csv_reader: {load:.2f} s")
+
+    start = time.perf_counter()
+    lists = {}
+    for recipe in reader.recipes:
+        recipes = lists.setdefault(recipe.author.id, [])
+        if recipe not in recipes:
+            recipes.append(recipe)
+    print(f"linking recipes to authors: list scan {time.perf_counter() - start:.2f} s", end=', ')
+
+    start = time.perf_counter()
+    fresh = {}
+    for recipe in reader.recipes:
+        author = fresh.get(recipe.author.id)
+        if author is None:
+            author = fresh[recipe.author.id] = Author(recipe.author.id, recipe.author.name)
+        author.add_recipe(recipe)
+    print(f"Author.add_recipe {time.perf_counter() - start:.3f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""Autocomplete latency from the sorted prefix index vs scanning every value.
+
+The bundled catalogue is replicated (with fresh ids and a numeric suffix on
+each name) to the requested sizes; prefixes are typed one character at a
+time, as a search box would send them.
+
+Usage: python benchmarks/bench_autocomplete.py [sizes...]   (default 10000 100000)
+"""
+import os
+import sys
+import time
+from collections import Counter
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from recipe.adapters.memory_repo import MemoryRepository
+from recipe.domainmodel.recipe import Recipe
+
+WORDS = ["chocolate cake", "banana bread", "soup", "zucchini", "lemonade", "xyzzy"]
+PREFIXES = [word[:i] for word in WORDS for i in range(1, len(word) + 1)]
+
+
+def per_prefix(fn, rounds=3):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for prefix in PREFIXES:
+            fn(prefix)
+    return (time.perf_counter() - start) / (rounds * len(PREFIXES)) * 1000
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+    template = MemoryRepository().get_all_recipes()
+    print(f"{'recipes':>9} {'indexed':>10} {'scan':>10}")
+    for size in sizes:
+        repo = MemoryRepository(csv_path=None)
+        for i in range(size):
+            source = template[i % len(template)]
+            repo.add_recipe(Recipe(i + 1, f"{source.name} {i // len(template)}", source.author,
+                                   category=source.category))
+        names = [recipe.name for recipe in repo.get_all_recipes()]
+        indexed = per_prefix(lambda prefix: repo.suggest('name', prefix, 8))
+
+        def scan(prefix):
+            counts = Counter(name.lower() for name in names if name.lower().startswith(prefix))
+            return sorted(counts, key=lambda key: (-counts[key], key))[:8]
+
+        print(f"{size:>9} {indexed:>7.3f} ms {per_prefix(scan, rounds=1):>7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Memory taken by the domain objects themselves, per recipe.
+
+The CSV is parsed up front, so the strings, lists and dates the objects point
+at are shared and not counted; what is measured is the Recipe, Nutrition
+(standalone, and the NutritionView the catalogue uses), Author, Category,
+User, Review and Favourite instances. Run on two checkouts to compare
+layouts.
+
+Usage: python benchmarks/bench_domain_memory.py [copies]   (default 1, the full catalogue)
+"""
+import os
+import sys
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from recipe.adapters.datareader.csvdatareader import CSVDataReader
+from recipe.adapters.memory_repo import DEFAULT_CSV_PATH
+from recipe.domainmodel.favourite import Favourite
+from recipe.domainmodel.nutrition_table import NutritionTable
+from recipe.domainmodel.review import Review
+from recipe.domainmodel.user import User
+
+
+def traced(build):
+    tracemalloc.start()
+    result = build()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, memory
+
+
+def main():
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    parsed = list(CSVDataReader(DEFAULT_CSV_PATH)._parse_rows())
+    rows = [(i + 1, *p[1:]) for i, p in enumerate(parsed * copies)]
+    count = len(rows)
+    print(f"{count} recipes")
+
+    reader = CSVDataReader(DEFAULT_CSV_PATH)
+    recipes, standalone = traced(lambda: [reader.build_recipe(row) for row in rows])
+
+    def build_views():
+        fresh = CSVDataReader(DEFAULT_CSV_PATH)
+        views = [fresh.build_recipe(row, table) for row in rows]
+        table.freeze()
+        return views
+
+    # Fill CPython's tuple free list with the table's pending rows first, so
+    # the rows freed by freeze() are not counted as retained.
+    warm_up = NutritionTable()
+    for row in rows[:2000]:
+        warm_up.append(row[0], row[12])
+    warm_up.freeze()
+    table = NutritionTable()
+    _, viewed = traced(build_views)
+    # The table's arrays are not per-object memory, so only the views count.
+    viewed -= table.recipe_ids.nbytes + table.health_rating.nbytes + sum(c.nbytes for c in table.columns.values())
+    users, user_memory = traced(lambda: [User(f"user{i}", "hash", i) for i in range(1, count + 1)])
+    reviews, review_memory = traced(
+        lambda: [Review(i, user, recipe.id, 4, "Tasty") for i, (user, recipe) in enumerate(zip(users, recipes))])
+    _, favourite_memory = traced(
+        lambda: [Favourite(i, user, recipe) for i, (user, recipe) in enumerate(zip(users, recipes))])
+
+    print(f"{'recipe + Nutrition':>24} {standalone / count:>7.0f} bytes/recipe")
+    print(f"{'recipe + NutritionView':>24} {viewed / count:>7.0f} bytes/recipe")
+    print(f"{'User':>24} {user_memory / count:>7.0f} bytes each")
+    print(f"{'Review':>24} {review_memory / count:>7.0f} bytes each")
+    print(f"{'Favourite':>24} {favourite_memory / count:>7.0f} bytes each")
+    print(f"{'authors, categories':>24} {len(reader.authors)}, {len(reader.categories)}")
+
+
+if __name__ == '__main__':
+    main()
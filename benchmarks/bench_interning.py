@@ -0,0 +1,45 @@
+"""Memory of ingredient names and quantities with and without interning.
+
+Parses the full catalogue, then counts the distinct ``str`` objects the
+ingredient and quantity lists point at: as ``parse_row`` decodes them (one
+object per occurrence) and after ``build_recipe`` interned them through the
+reader's vocabularies.
+
+Usage: python benchmarks/bench_interning.py
+"""
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from recipe.adapters.datareader.csvdatareader import CSVDataReader
+from recipe.adapters.memory_repo import DEFAULT_CSV_PATH
+
+
+def string_bytes(lists) -> tuple[int, int, int]:
+    """(references, distinct objects, bytes of the distinct objects)"""
+    seen = {}
+    references = 0
+    for items in lists:
+        references += len(items)
+        for item in items:
+            seen[id(item)] = sys.getsizeof(item)
+    return references, len(seen), sum(seen.values())
+
+
+def main():
+    reader = CSVDataReader(DEFAULT_CSV_PATH)
+    rows = list(reader._parse_rows())
+    recipes = [reader.build_recipe(row) for row in rows]
+    print(f"{len(recipes)} recipes; vocabularies: {len(reader.ingredient_vocabulary)} ingredients, "
+          f"{len(reader.quantity_vocabulary)} quantities")
+    print(f"{'':>12} {'references':>11} {'objects':>9} {'parsed':>10} {'interned':>10}")
+    for label, parsed, built in (
+            ('ingredients', (row[11] for row in rows), (recipe.ingredients for recipe in recipes)),
+            ('quantities', (row[10] for row in rows), (recipe.ingredient_quantities for recipe in recipes))):
+        references, _, before = string_bytes(parsed)
+        _, objects, after = string_bytes(built)
+        print(f"{label:>12} {references:>11} {objects:>9} {before / 1024:>7.0f} KiB {after / 1024:>7.0f} KiB")
+
+
+if __name__ == '__main__':
+    main()
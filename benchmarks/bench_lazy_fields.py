@@ -0,0 +1,50 @@
+"""Startup time and retained memory of eager vs lazy CSVDataReader loads.
+
+Usage: python benchmarks/bench_lazy_fields.py [path/to/recipes.csv]
+"""
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from recipe.adapters.datareader.csvdatareader import CSVDataReader
+from recipe.adapters.memory_repo import DEFAULT_CSV_PATH
+
+
+def load(csv_path, lazy):
+    gc.collect()
+    start = time.perf_counter()
+    reader = CSVDataReader(csv_path, lazy=lazy)
+    reader.csv_reader()
+    elapsed = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    reader = CSVDataReader(csv_path, lazy=lazy)
+    reader.csv_reader()
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return elapsed, retained, reader
+
+
+def main():
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else str(DEFAULT_CSV_PATH)
+    eager_time, eager_mem, _ = load(csv_path, lazy=False)
+    lazy_time, lazy_mem, reader = load(csv_path, lazy=True)
+
+    start = time.perf_counter()
+    for recipe in reader.recipes[:10]:
+        recipe.ingredients, recipe.ingredient_quantities, recipe.instructions
+    first_view = (time.perf_counter() - start) / 10
+
+    print(f"recipes:          {len(reader.recipes)}")
+    print(f"eager load:       {eager_time * 1000:8.1f} ms  {eager_mem / 1e6:6.1f} MB retained")
+    print(f"lazy load:        {lazy_time * 1000:8.1f} ms  {lazy_mem / 1e6:6.1f} MB retained")
+    print(f"first detail view decode: {first_view * 1e6:.0f} us per recipe")
+
+
+if __name__ == '__main__':
+    main()
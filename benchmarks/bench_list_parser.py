@@ -0,0 +1,54 @@
+"""ast.literal_eval vs parse_string_list on the list columns of recipes.csv.
+
+Usage: python benchmarks/bench_list_parser.py [path/to/recipes.csv] [repeats]
+"""
+import ast
+import csv
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from recipe.adapters.datareader.csvdatareader import CSVDataReader
+from recipe.adapters.datareader.literals import parse_string_list
+from recipe.adapters.memory_repo import DEFAULT_CSV_PATH
+
+LIST_COLUMNS = ['Images', 'RecipeIngredientQuantities', 'RecipeIngredientParts', 'RecipeInstructions']
+
+
+def best_of(repeats, fn):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def decode_all(decoder, cells):
+    for cell in cells:
+        try:
+            decoder(cell)
+        except Exception:
+            pass
+
+
+def main():
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else str(DEFAULT_CSV_PATH)
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    with open(csv_path, encoding='utf-8') as csv_file:
+        cells = [row[column] for row in csv.DictReader(csv_file) for column in LIST_COLUMNS]
+
+    literal_time = best_of(repeats, lambda: decode_all(ast.literal_eval, cells))
+    fast_time = best_of(repeats, lambda: decode_all(parse_string_list, cells))
+    load_time = best_of(repeats, lambda: CSVDataReader(csv_path).csv_reader())
+
+    print(f"cells decoded:     {len(cells)}")
+    print(f"ast.literal_eval:  {literal_time * 1000:8.1f} ms")
+    print(f"parse_string_list: {fast_time * 1000:8.1f} ms ({literal_time / fast_time:.1f}x faster)")
+    print(f"full CSV load now: {load_time * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""get_recipe / get_user latency with hash indexes vs the old linear scan.
+
+Usage: python benchmarks/bench_lookups.py [sizes...]   (default 10000 100000 1000000)
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from recipe.adapters.memory_repo import MemoryRepository
+from recipe.domainmodel.author import Author
+from recipe.domainmodel.recipe import Recipe
+from recipe.domainmodel.user import User
+
+
+def per_call(fn, args):
+    start = time.perf_counter()
+    for arg in args:
+        fn(arg)
+    return (time.perf_counter() - start) / len(args) * 1e6
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    author = Author(1, "Bench Author")
+    print(f"{'recipes':>9} {'get_recipe':>12} {'get_user':>10} {'linear scan':>13}")
+    for size in sizes:
+        repo = MemoryRepository(csv_path=None)
+        for i in range(1, size + 1):
+            repo.add_recipe(Recipe(i, f"Recipe {i}", author))
+            repo.add_user(User(f"user{i}", "hash", i))
+
+        recipe_ids = [random.randint(1, size) for _ in range(10_000)]
+        usernames = [f"user{random.randint(1, size)}" for _ in range(10_000)]
+        indexed_recipe = per_call(repo.get_recipe, recipe_ids)
+        indexed_user = per_call(repo.get_user, usernames)
+        linear = per_call(lambda rid: next((r for r in repo._recipes if r.id == rid), None), recipe_ids[:20])
+        print(f"{size:>9} {indexed_recipe:>9.2f} us {indexed_user:>7.2f} us {linear:>10.0f} us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""Retained memory and lookup latency: MemoryRepository vs MmapRepository.
+
+Usage: python benchmarks/bench_mmap_repo.py [path/to/recipes.csv] [cache_size]
+"""
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from recipe.adapters.memory_repo import DEFAULT_CSV_PATH, MemoryRepository
+from recipe.adapters.mmap_repo import MmapRepository
+
+
+def measure(name, factory, lookups):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    repo = factory()
+    load_time = time.perf_counter() - start
+    gc.collect()
+    loaded = tracemalloc.get_traced_memory()[0]
+
+    start = time.perf_counter()
+    for recipe_id in lookups:
+        repo.get_recipe(recipe_id)
+    lookup_time = (time.perf_counter() - start) / len(lookups)
+    gc.collect()
+    working = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{name:<8} load {load_time * 1000:7.1f} ms  retained {loaded / 1e6:6.1f} MB  "
+          f"after {len(lookups)} lookups {working / 1e6:6.1f} MB  get_recipe {lookup_time * 1e6:6.1f} us")
+    return repo
+
+
+def main():
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else str(DEFAULT_CSV_PATH)
+    cache_size = int(sys.argv[2]) if len(sys.argv) > 2 else 256
+
+    ids = [r.id for r in MemoryRepository(csv_path).get_all_recipes()]
+    hot = random.sample(ids, k=min(cache_size, len(ids)))
+    lookups = [random.choice(hot) for _ in range(10_000)]
+
+    measure("memory", lambda: MemoryRepository(csv_path), lookups)
+    MmapRepository(csv_path, cache_size=cache_size)  # build and persist the offset index
+    measure("mmap", lambda: MmapRepository(csv_path, cache_size=cache_size), lookups)
+
+
+if __name__ == '__main__':
+    main()
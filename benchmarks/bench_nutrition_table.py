@@ -0,0 +1,73 @@
+"""Nutrition as per-recipe objects vs the columnar NutritionTable.
+
+Reports the time and traced memory to build every recipe's nutrition, and
+the latency of a per-category calorie average computed by looping over
+objects vs with the table.
+
+Usage: python benchmarks/bench_nutrition_table.py [copies]   (default 20)
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from recipe.adapters.datareader.csvdatareader import CSVDataReader
+from recipe.adapters.memory_repo import DEFAULT_CSV_PATH
+from recipe.domainmodel.nutrition import Nutrition
+from recipe.domainmodel.nutrition_table import NutritionTable
+
+
+def build(rows, columnar):
+    table = NutritionTable() if columnar else None
+    # Rows hold the CSV's strings, so both sides pay for creating the floats.
+    if columnar:
+        nutritions = [table.append(recipe_id, tuple(map(float, values))) for recipe_id, values in rows]
+        table.freeze()
+    else:
+        nutritions = [Nutrition(recipe_id, *map(float, values)) for recipe_id, values in rows]
+    return nutritions, table
+
+
+def measure(rows, columnar):
+    tracemalloc.start()
+    start = time.perf_counter()
+    nutritions, table = build(rows, columnar)
+    elapsed = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return nutritions, table, elapsed, memory
+
+
+def main():
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    reader = CSVDataReader(DEFAULT_CSV_PATH)
+    parsed = list(reader._parse_rows())
+    rows = [(i + 1, tuple(map(repr, p[12]))) for i, p in enumerate(parsed * copies)]
+    categories = [p[4] for p in parsed * copies]
+    print(f"{len(rows)} recipes")
+
+    objects, _, object_time, object_memory = measure(rows, columnar=False)
+    views, table, table_time, table_memory = measure(rows, columnar=True)
+    print(f"{'':>10} {'build':>9} {'memory':>10}")
+    print(f"{'objects':>10} {object_time * 1000:>6.0f} ms {object_memory / 2**20:>6.1f} MiB")
+    print(f"{'table':>10} {table_time * 1000:>6.0f} ms {table_memory / 2**20:>6.1f} MiB")
+
+    names = sorted(set(categories))
+    codes = np.array([names.index(name) for name in categories])
+    start = time.perf_counter()
+    totals, counts = {}, {}
+    for category, nutrition in zip(categories, objects):
+        totals[category] = totals.get(category, 0.0) + nutrition.calories
+        counts[category] = counts.get(category, 0) + 1
+    loop = time.perf_counter() - start
+    start = time.perf_counter()
+    table.mean_by_group('calories', codes)
+    vectorised = time.perf_counter() - start
+    print(f"mean calories per category: loop {loop * 1000:.1f} ms, table {vectorised * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
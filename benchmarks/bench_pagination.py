@@ -0,0 +1,62 @@
+"""/browse and /search latency for page 1 vs page 1000.
+
+Compares the old sort-and-slice browse, offset pages and ``after`` cursors
+from the pre-sorted orderings, and search pages. The bundled catalogue is
+replicated to the requested size.
+
+Usage: python benchmarks/bench_pagination.py [size]   (default 100000)
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from recipe.adapters.memory_repo import MemoryRepository
+from recipe.domainmodel.recipe import Recipe
+
+PER_PAGE = 10
+
+
+def per_call(fn, rounds=20):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    template = MemoryRepository().get_all_recipes()
+    repo = MemoryRepository(csv_path=None)
+    repo._recipes = [Recipe(i + 1, f"{source.name} {i // len(template)}", source.author,
+                            cook_time=source.cook_time, category=source.category)
+                     for i, source in enumerate(template[i % len(template)] for i in range(size))]
+
+    def old_browse(page):
+        recipes = repo.get_all_recipes()
+        recipes.sort(key=lambda r: r.name.lower())
+        offset = (page - 1) * PER_PAGE
+        return recipes[offset:offset + PER_PAGE]
+
+    def cursor_for(fetch, page):
+        # Token that a reader clicking "Next" would hold when reaching ``page``.
+        return fetch((page - 2) * PER_PAGE, None).next_cursor if page > 1 else None
+
+    browse = lambda offset, after: repo.get_recipes_page('name', offset, PER_PAGE, after=after)
+    search = lambda offset, after: repo.search_recipes('name', 'chicken', offset, PER_PAGE, after=after)
+    matches = repo.search_recipes('name', 'chicken').total
+    print(f"{size} recipes, {matches} matching 'chicken'")
+    print(f"{'':>22} {'page 1':>10} {'page 1000':>10}")
+    rows = [("browse (sort + slice)", lambda page: old_browse(page))]
+    for label, fetch in (("browse", browse), ("search", search)):
+        rows.append((f"{label} offset", lambda page, fetch=fetch: fetch((page - 1) * PER_PAGE, None)))
+        tokens = {page: cursor_for(fetch, page) for page in (1, 1000)}
+        rows.append((f"{label} cursor", lambda page, fetch=fetch, tokens=tokens: fetch(0, tokens[page])))
+    for label, fetch in rows:
+        first = per_call(lambda: fetch(1), rounds=3 if 'sort' in label else 200)
+        deep = per_call(lambda: fetch(1000), rounds=3 if 'sort' in label else 200)
+        print(f"{label:>22} {first:>7.3f} ms {deep:>7.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
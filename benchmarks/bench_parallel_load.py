@@ -0,0 +1,56 @@
+"""Serial vs multi-process CSV ingestion on a synthetic large catalogue.
+
+The bundled recipes.csv is replicated (with fresh RecipeIds) until it holds
+the requested number of rows, then loaded with 1, 2, 4, ... workers.
+
+Usage: python benchmarks/bench_parallel_load.py [rows] [max_workers]
+"""
+import csv
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from recipe.adapters.datareader.csvdatareader import CSVDataReader
+from recipe.adapters.memory_repo import DEFAULT_CSV_PATH
+
+
+def write_catalogue(path, rows):
+    with open(DEFAULT_CSV_PATH, encoding='utf-8') as source:
+        reader = csv.DictReader(source)
+        fieldnames = reader.fieldnames
+        template = list(reader)
+    with open(path, 'w', encoding='utf-8', newline='') as target:
+        writer = csv.DictWriter(target, fieldnames=fieldnames)
+        writer.writeheader()
+        for i in range(rows):
+            row = dict(template[i % len(template)])
+            row['RecipeId'] = str(i + 1)
+            writer.writerow(row)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = os.path.join(tmp_dir, 'recipes.csv')
+        write_catalogue(csv_path, rows)
+        print(f"{rows} rows, {os.path.getsize(csv_path) / 1e6:.0f} MB, {os.cpu_count()} CPUs")
+
+        baseline = None
+        workers = 1
+        while workers <= max_workers:
+            start = time.perf_counter()
+            reader = CSVDataReader(csv_path)
+            reader.csv_reader(workers=workers)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"workers={workers:<3} {elapsed:7.2f} s  speed-up {baseline / elapsed:4.1f}x  "
+                  f"({len(reader.recipes)} recipes, {len(reader.authors)} authors)")
+            workers *= 2
+
+
+if __name__ == '__main__':
+    main()
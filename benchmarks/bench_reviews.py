@@ -0,0 +1,46 @@
+"""Reading the first page of a recipe's reviews as its review count grows.
+
+Compares re-sorting every review by date on each read (the previous
+get_reviews_for_recipe) with get_reviews_page on the date-ordered store,
+and times adding the reviews.
+
+Usage: python benchmarks/bench_reviews.py [counts...]   (default 100 10000 100000)
+"""
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from recipe.adapters.memory_repo import MemoryRepository
+from recipe.domainmodel.review import Review
+
+
+def per_call(fn, rounds=50):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [100, 10_000, 100_000]
+    rng = random.Random(23)
+    base = datetime(2020, 1, 1)
+    print(f"{'reviews':>9} {'add':>10} {'re-sort':>10} {'page':>10}")
+    for count in counts:
+        reviews = [Review(i, "user", 1, rng.choice([3, 4, 5]), "", base + timedelta(minutes=rng.randrange(10**6)))
+                   for i in range(count)]
+        repo = MemoryRepository(csv_path=None)
+        start = time.perf_counter()
+        for review in reviews:
+            repo.add_review(review)
+        add = (time.perf_counter() - start) / count * 1e6
+        resort = per_call(lambda: sorted(reviews, key=lambda r: r.date_submitted, reverse=True)[:10])
+        page = per_call(lambda: repo.get_reviews_page(1, 0, 10))
+        print(f"{count:>9} {add:>7.2f} us {resort:>7.3f} ms {page:>7.4f} ms")
+
+
+if __name__ == '__main__':
+    main()
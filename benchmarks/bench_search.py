@@ -0,0 +1,63 @@
+"""find_by_name latency with the trigram index vs a full substring scan, and
+find_similar (typo-tolerant) latency vs scoring every name.
+
+The bundled catalogue is replicated (with fresh ids and a numeric suffix on
+each name) to the requested sizes.
+
+Usage: python benchmarks/bench_search.py [sizes...]   (default 10000 100000 500000)
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from recipe.adapters.memory_repo import MemoryRepository
+from recipe.adapters.search_index import ngrams
+from recipe.domainmodel.recipe import Recipe
+
+QUERIES = ["chocolate cake", "chicken", "banana bread", "soup", "lemonade", "xyzzy"]
+TYPOS = ["choclate cake", "chiken", "banan bread", "suop", "lemonaid", "xyzzy"]
+
+
+def per_query(fn, queries=QUERIES, rounds=5):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for query in queries:
+            fn(query)
+    return (time.perf_counter() - start) / (rounds * len(queries)) * 1000
+
+
+def score_all(recipes, query):
+    grams = ngrams(query.lower())
+    scored = []
+    for recipe in recipes:
+        shared = len(grams & ngrams(recipe.name.lower()))
+        if shared >= 0.6 * len(grams):
+            scored.append((-shared, recipe.id))
+    return sorted(scored)
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 500_000]
+    template = MemoryRepository().get_all_recipes()
+    print(f"{'recipes':>9} {'build':>9} {'indexed':>10} {'scan':>10} {'fuzzy':>10} {'fuzzy scan':>11}")
+    for size in sizes:
+        repo = MemoryRepository(csv_path=None)
+        start = time.perf_counter()
+        for i in range(size):
+            source = template[i % len(template)]
+            repo.add_recipe(Recipe(i + 1, f"{source.name} {i // len(template)}", source.author,
+                                   category=source.category))
+        build = time.perf_counter() - start
+        recipes = repo.get_all_recipes()
+        indexed = per_query(repo.find_by_name)
+        scan = per_query(lambda q: [r for r in recipes if q.lower() in r.name.lower()])
+        # Fresh queries each round so the search cache is not measured.
+        repo.FUZZY_BUDGET = None
+        fuzzy = per_query(lambda q: (repo._search_cache.clear(), repo.find_similar(q)), TYPOS)
+        fuzzy_scan = per_query(lambda q: score_all(recipes, q), TYPOS, rounds=1)
+        print(f"{size:>9} {build:>7.1f} s {indexed:>7.2f} ms {scan:>7.1f} ms {fuzzy:>7.2f} ms {fuzzy_scan:>8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""SQLite vs in-memory repository.
+
+Reports the time to build the database from the CSV and to reopen it, then
+the per-query latency of name, ingredient, faceted and fuzzy searches and
+of deep catalogue pages on both backends.
+
+Usage: python benchmarks/bench_sqlite_repo.py [repeats]   (default 200)
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from recipe.adapters.memory_repo import MemoryRepository
+from recipe.adapters.sqlite_repo import SQLiteRepository
+
+QUERIES = [
+    ('name search', lambda repo: repo.search_recipes('name', 'chicken', limit=12)),
+    ('ingredient boolean', lambda repo: repo.search_recipes('ingredient', 'eggs AND flour AND NOT milk', limit=12)),
+    ('faceted, by rating', lambda repo: repo.search_recipes('category', 'dessert', sort='rating', descending=True,
+                                                           facets=(('cook_time', 'Under 15 min'),), limit=12)),
+    ('fuzzy name', lambda repo: repo.search_recipes('name', 'choclate cake', fuzzy=True, limit=12)),
+    ('page 500 by date', lambda repo: repo.get_recipes_page('date', offset=6000, limit=12)),
+    ('suggest', lambda repo: repo.suggest('name', 'chi')),
+]
+
+
+def per_query_ms(repo, query, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        query(repo)
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    memory = MemoryRepository(search_cache_size=0)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'recipes.sqlite3')
+        start = time.perf_counter()
+        SQLiteRepository(path=path).close()
+        print(f"build database: {time.perf_counter() - start:.2f} s "
+              f"({os.path.getsize(path) / 2**20:.0f} MiB)")
+        start = time.perf_counter()
+        sqlite = SQLiteRepository(path=path, search_cache_size=0)
+        print(f"reopen:         {time.perf_counter() - start:.3f} s")
+
+        print(f"{'query':<22} {'memory ms':>10} {'sqlite ms':>10}")
+        for label, query in QUERIES:
+            print(f"{label:<22} {per_query_ms(memory, query, repeats):>10.3f} "
+                  f"{per_query_ms(sqlite, query, repeats):>10.3f}")
+        sqlite.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""Cold CSV parse vs warm snapshot load of the recipe catalogue.
+
+Usage: python benchmarks/bench_startup.py [path/to/recipes.csv] [repeats]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from recipe.adapters.datareader import snapshot
+from recipe.adapters.datareader.csvdatareader import CSVDataReader
+from recipe.adapters.memory_repo import DEFAULT_CSV_PATH
+
+
+def best_of(repeats, fn):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else str(DEFAULT_CSV_PATH)
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        snapshot_path = os.path.join(tmp_dir, 'recipes.snapshot')
+
+        def cold():
+            CSVDataReader(csv_path).csv_reader()
+
+        def write():
+            reader = CSVDataReader(csv_path)
+            reader.csv_reader()
+            snapshot.save_snapshot(reader, snapshot_path)
+
+        def warm():
+            reader = CSVDataReader(csv_path)
+            assert snapshot.load_snapshot(reader, snapshot_path)
+
+        cold_time = best_of(repeats, cold)
+        write()
+        warm_time = best_of(repeats, warm)
+        size = os.path.getsize(snapshot_path)
+
+    print(f"catalogue:      {csv_path} ({os.path.getsize(csv_path) / 1e6:.1f} MB)")
+    print(f"cold CSV parse: {cold_time * 1000:8.1f} ms")
+    print(f"snapshot load:  {warm_time * 1000:8.1f} ms ({size / 1e6:.1f} MB snapshot)")
+    print(f"speed-up:       {cold_time / warm_time:8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,13 @@
+"""Gunicorn configuration."""
+import gc
+
+# Build the app (and its recipe repository) once in the master process so
+# workers share the parsed catalogue copy-on-write instead of each re-reading
+# recipes.csv after the fork.
+preload_app = True
+
+
+def when_ready(server):
+    # Move everything allocated while loading into the permanent generation so
+    # the collector in each worker never writes to (and un-shares) those pages.
+    gc.freeze()
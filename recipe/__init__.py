@@ -5,9 +5,14 @@ from flask import Flask
 def create_app(test_config=None):
     app = Flask(__name__)
     app.config['SECRET_KEY'] = 'dev'
+    # e.g. FLASK_RECIPE_LOAD_WORKERS=4 -> app.config['RECIPE_LOAD_WORKERS'] = 4
+    app.config.from_prefixed_env()
     if test_config is not None:
         app.config.update(test_config)
 
+    from .adapters import repository
+    repository.init_repository(app.config)
+
     from .home import home
     app.register_blueprint(home.home_bp)
 
@@ -0,0 +1,50 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import NamedTuple
+
+from recipe.domainmodel.recipe import Recipe
+
+
+class Page(NamedTuple):
+    recipes: list[Recipe]
+    total: int
+    offset: int
+    next_cursor: str | None
+
+
+def _dump(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    if isinstance(value, tuple):
+        return {'t': [_dump(item) for item in value]}
+    return value
+
+
+def _load(value):
+    if isinstance(value, dict):
+        if 'dt' in value:
+            return datetime.fromisoformat(value['dt'])
+        return tuple(_load(item) for item in value['t'])
+    return value
+
+
+def encode_cursor(ordering: str, key, recipe_id: int) -> str:
+    """Opaque ``after`` token for the entry ``(key, recipe_id)`` of ``ordering``."""
+    payload = json.dumps([ordering, _dump(key), recipe_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token: str, ordering: str) -> tuple:
+    """Return ``(key, recipe_id)``; raises ValueError for malformed tokens or
+    tokens issued for a different ordering."""
+    try:
+        payload = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        token_ordering, key, recipe_id = json.loads(payload)
+        key = _load(key)
+    except (binascii.Error, UnicodeDecodeError, TypeError, KeyError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {token!r}") from e
+    if token_ordering != ordering or not isinstance(recipe_id, int):
+        raise ValueError(f"Cursor {token!r} does not belong to ordering {ordering!r}")
+    return key, recipe_id
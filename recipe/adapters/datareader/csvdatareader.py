@@ -1,96 +1,290 @@
 import os
+import io
 import csv
-import ast
+import mmap
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import partial
+from recipe.adapters.datareader.literals import parse_string_list
+from recipe.adapters.datareader.vocabulary import Vocabulary
 from recipe.domainmodel.author import Author
 from recipe.domainmodel.category import Category
+from recipe.domainmodel.deferred import DeferredField
 from recipe.domainmodel.nutrition import Nutrition
+from recipe.domainmodel.nutrition_table import NutritionTable
 from recipe.domainmodel.recipe import Recipe
 
+# Chunks handed to each worker in parallel mode; more than one per worker keeps
+# the pool busy when rows are unevenly sized.
+CHUNKS_PER_WORKER = 4
+
+
+def decode_list_cell(cell: str) -> list[str]:
+    try:
+        return parse_string_list(cell)
+    except Exception:
+        return []
+
+
+def decode_interned_list(vocabulary: Vocabulary, cell: str) -> list[str]:
+    return vocabulary.intern_all(decode_list_cell(cell))
+
+
+def interned(vocabulary: Vocabulary, value):
+    """``value`` (a decoded list or a DeferredField) with its items interned."""
+    if type(value) is DeferredField:
+        return DeferredField(value.raw, partial(decode_interned_list, vocabulary))
+    return vocabulary.intern_all(value)
+
+
+def parse_row(row: dict, lazy: bool = False) -> tuple:
+    """Turn one CSV row into plain values.
+
+    Kept free of Author/Category objects so it can run in a worker process;
+    the reader links recipes to shared authors and categories afterwards.
+    Nutrition is a tuple of floats in ``NUTRIENT_COLUMNS`` order.
+    With ``lazy`` the quantity, ingredient and instruction cells are kept raw
+    and only decoded when the recipe's property is first read.
+    """
+    #nutrition
+    nutrition = (
+        float(row['Calories']),
+        float(row['FatContent']),
+        float(row['SaturatedFatContent']),
+        float(row['CholesterolContent']),
+        float(row['SodiumContent']),
+        float(row['CarbohydrateContent']),
+        float(row['FiberContent']),
+        float(row['SugarContent']),
+        float(row['ProteinContent']),
+    )
+    # Parse optional fields
+    try:
+        created_date = datetime.strptime(row['DatePublished'], "%dth %b %Y")
+    except Exception:
+        created_date = None
+    images = decode_list_cell(row['Images'])
+    if lazy:
+        ingredient_quantities = DeferredField(row['RecipeIngredientQuantities'], decode_list_cell)
+        ingredients = DeferredField(row['RecipeIngredientParts'], decode_list_cell)
+        instructions = DeferredField(row['RecipeInstructions'], decode_list_cell)
+    else:
+        ingredient_quantities = decode_list_cell(row['RecipeIngredientQuantities'])
+        ingredients = decode_list_cell(row['RecipeIngredientParts'])
+        instructions = decode_list_cell(row['RecipeInstructions'])
+
+    return (
+        int(row['RecipeId']),
+        row['Name'],
+        int(row['AuthorId']),
+        row['AuthorName'],
+        row['RecipeCategory'],
+        int(row['CookTime']) if row['CookTime'] else 0,
+        int(row['PrepTime']) if row['PrepTime'] else 0,
+        created_date,
+        row['Description'],
+        images,
+        ingredient_quantities,
+        ingredients,
+        nutrition,
+        row.get('RecipeServings', None),
+        row.get('RecipeYield', None),
+        instructions,
+    )
+
+
+def parse_records(raw: bytes, fieldnames: list[str], lazy: bool = False) -> list[tuple]:
+    # Same newline translation as the serial reader's text-mode open().
+    text = io.TextIOWrapper(io.BytesIO(raw), encoding='utf-8')
+    return [parse_row(row, lazy) for row in csv.DictReader(text, fieldnames=fieldnames)]
+
+
+def parse_chunk(csv_path, start: int, end: int, fieldnames: list[str], lazy: bool = False) -> list[tuple]:
+    with open(csv_path, 'rb') as csvfile:
+        csvfile.seek(start)
+        raw = csvfile.read(end - start)
+    return parse_records(raw, fieldnames, lazy)
+
+
+def iter_record_spans(data, start: int = 0):
+    """Yield ``(start, end)`` byte spans of the CSV records in ``data``.
+
+    ``data`` is a bytes-like object (typically an mmap) positioned at a
+    record boundary; blank lines are skipped like csv.DictReader does.
+    """
+    size = len(data)
+    pos = start
+    while pos < size:
+        record_start = pos
+        in_quotes = 0
+        while True:
+            newline = data.find(b'\n', pos)
+            if newline == -1:
+                pos = size
+                break
+            in_quotes ^= data[pos:newline].count(b'"') % 2
+            pos = newline + 1
+            if not in_quotes:
+                break
+        if data[record_start:pos].strip():
+            yield record_start, pos
+
+
+def record_boundaries(csv_path, chunks: int) -> list[int]:
+    """Byte offsets splitting the data rows into ``chunks`` ranges.
+
+    A newline only ends a record when it is outside quotes, i.e. when the
+    number of '"' seen since the start of the file is even.
+    """
+    size = os.path.getsize(csv_path)
+    if size == 0:
+        return [0, 0]
+    with open(csv_path, 'rb') as csvfile, \
+            mmap.mmap(csvfile.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        header_end = data.find(b'\n') + 1 or size
+        boundaries = [header_end]
+        pos = header_end
+        in_quotes = data[:header_end].count(b'"') % 2
+        for i in range(1, chunks):
+            target = max(pos, size * i // chunks)
+            in_quotes ^= data[pos:target].count(b'"') % 2
+            pos = target
+            while True:
+                newline = data.find(b'\n', pos)
+                if newline == -1:
+                    pos = size
+                    break
+                in_quotes ^= data[pos:newline].count(b'"') % 2
+                pos = newline + 1
+                if not in_quotes:
+                    break
+            if pos >= size:
+                break
+            boundaries.append(pos)
+        boundaries.append(size)
+    return boundaries
+
 
 class CSVDataReader:
-    def __init__(self, csv_path):
+    def __init__(self, csv_path, lazy: bool = False):
         self.csv_path = csv_path
+        self.lazy = lazy
         self.recipes = []
         self.authors = {}
         self.categories = {}
         self.nutritions = []
+        self.nutrition_table = None
+        # Shared by every recipe the reader builds (see build_recipe).
+        self.ingredient_vocabulary = Vocabulary()
+        self.quantity_vocabulary = Vocabulary()
+
+    def csv_reader(self, workers: int = 1):
+        self.nutrition_table = NutritionTable()
+        for parsed in self._parse_rows(workers):
+            recipe = self.build_recipe(parsed, self.nutrition_table)
+            self.nutritions.append(recipe.nutrition)
+            self.recipes.append(recipe)
+            recipe.author.add_recipe(recipe)
+        # Validates the catalogue's nutrition and rates it in one pass.
+        self.nutrition_table.freeze()
+
+    def iter_recipes(self, batch_size: int | None = None):
+        """Stream recipes (or lists of ``batch_size`` recipes) as they are parsed.
+
+        Nothing is kept on the reader except the author and category lookups:
+        ingredients and quantities are not interned into the vocabularies and
+        recipes are not added to ``Author.recipes``, so memory stays bounded
+        however large the file is.
+        """
+        recipes = (self.build_recipe(parsed, intern=False) for parsed in self._parse_rows())
+        if not batch_size:
+            yield from recipes
+            return
+
+        batch = []
+        for recipe in recipes:
+            batch.append(recipe)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _parse_rows(self, workers: int = 1):
+        if workers > 1:
+            yield from self._parse_parallel(workers)
+            return
 
-    def csv_reader(self):
         with open(self.csv_path, encoding='utf-8') as csvfile:
             reader = csv.DictReader(csvfile)
             for row in reader:
+                yield parse_row(row, self.lazy)
+
+    def _parse_parallel(self, workers: int):
+        with open(self.csv_path, encoding='utf-8') as csvfile:
+            fieldnames = next(csv.reader(csvfile), [])
+        boundaries = record_boundaries(self.csv_path, workers * CHUNKS_PER_WORKER)
+        starts, ends = boundaries[:-1], boundaries[1:]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # map() yields chunks in file order, so merged output matches the
+            # serial reader row for row.
+            for rows in pool.map(parse_chunk, [self.csv_path] * len(starts), starts, ends,
+                                 [fieldnames] * len(starts), [self.lazy] * len(starts)):
+                yield from rows
+
+    def build_recipe(self, parsed: tuple, nutrition_table: NutritionTable | None = None,
+                     intern: bool = True) -> Recipe:
+        """Link a ``parse_row`` tuple to shared Author/Category objects.
+
+        With a ``nutrition_table`` the recipe's nutrition becomes a view of a
+        new row in it, otherwise a standalone Nutrition. Ingredient names and
+        quantities are interned through the reader's vocabularies (when they
+        are decoded, for lazy rows) unless ``intern`` is False.
+        """
+        (recipe_id, name, author_id, author_name, category_name, cook_time,
+         preparation_time, created_date, description, images,
+         ingredient_quantities, ingredients, nutrition, servings,
+         recipe_yield, instructions) = parsed
+
+        #nutrition
+        if nutrition_table is not None:
+            nutrition = nutrition_table.append(recipe_id, nutrition)
+        else:
+            nutrition = Nutrition(recipe_id, *nutrition)
+
+        #author
+        if author_id not in self.authors:
+            author = Author(author_id, author_name)
+            self.authors[author_id] = author
+        else:
+            author = self.authors[author_id]
+
+        #category
+        if category_name not in self.categories:
+            category = Category(category_name)
+            self.categories[category_name] = category
+        else:
+            category = self.categories[category_name]
+
+        if intern:
+            ingredient_quantities = interned(self.quantity_vocabulary, ingredient_quantities)
+            ingredients = interned(self.ingredient_vocabulary, ingredients)
 
-                #author
-                author_id = int(row['AuthorId'])
-                author_name = row['AuthorName']
-                if author_id not in self.authors:
-                    author = Author(author_id, author_name)
-                    self.authors[author_id] = author
-                else:
-                    author = self.authors[author_id]
-
-                #category
-                category_name = row['RecipeCategory']
-                if category_name not in self.categories:
-                    category = Category(category_name)
-                    self.categories[category_name] = category
-                else:
-                    category = self.categories[category_name]
-
-                #nutrition
-                nutrition = Nutrition(
-                    recipe_id = int(row['RecipeId']),
-                    calories = float(row['Calories']),
-                    fat = float(row['FatContent']),
-                    saturated_fat = float(row['SaturatedFatContent']),
-                    cholesterol = float(row['CholesterolContent']),
-                    sodium = float(row['SodiumContent']),
-                    carbohydrates = float(row['CarbohydrateContent']),
-                    fiber = float(row['FiberContent']),
-                    sugar = float(row['SugarContent']),
-                    protein = float(row['ProteinContent']),
-                )
-                self.nutritions.append(nutrition)
-                # Parse optional fields
-                try:
-                    created_date = datetime.strptime(row['DatePublished'], "%dth %b %Y")
-                except Exception:
-                    created_date = None
-                try:
-                    images = ast.literal_eval(row['Images'])
-                except Exception:
-                    images = []
-                try:
-                    ingredient_quantities = ast.literal_eval(row['RecipeIngredientQuantities'])
-                except Exception:
-                    ingredient_quantities = []
-                try:
-                    ingredients = ast.literal_eval(row['RecipeIngredientParts'])
-                except Exception:
-                    ingredients = []
-                try:
-                    instructions = ast.literal_eval(row['RecipeInstructions'])
-                except Exception:
-                    instructions = []
-
-                #recipe
-                recipe = Recipe(
-                    int(row['RecipeId']),
-                    row['Name'],
-                    author=author,
-                    cook_time=int(row['CookTime']) if row['CookTime'] else 0,
-                    preparation_time=int(row['PrepTime']) if row['PrepTime'] else 0,
-                    created_date=created_date,
-                    description=row['Description'],
-                    images=images,
-                    category=category,
-                    ingredient_quantities=ingredient_quantities,
-                    ingredients=ingredients,
-                    nutrition=nutrition,
-                    servings=row.get('RecipeServings', None),
-                    recipe_yield=row.get('RecipeYield', None),
-                    instructions=instructions
-                )
-                self.recipes.append(recipe)
-                author.add_recipe(recipe)
+        #recipe
+        return Recipe(
+            recipe_id,
+            name,
+            author=author,
+            cook_time=cook_time,
+            preparation_time=preparation_time,
+            created_date=created_date,
+            description=description,
+            images=images,
+            category=category,
+            ingredient_quantities=ingredient_quantities,
+            ingredients=ingredients,
+            nutrition=nutrition,
+            servings=servings,
+            recipe_yield=recipe_yield,
+            instructions=instructions
+        )
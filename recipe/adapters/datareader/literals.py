@@ -0,0 +1,44 @@
+import ast
+import re
+
+# One quoted item of a Python/R-style list literal followed by its separator.
+# Items containing escapes, newlines or NUL bytes are left to literal_eval.
+_ITEM = re.compile(r"""[ \t]*(?:'([^'\\\n\r\x00]*)'|"([^"\\\n\r\x00]*)")[ \t]*([,\]])""")
+
+_NOT_LISTS = frozenset(('', 'NA', 'character(0)'))
+
+
+def parse_string_list(cell: str):
+    """Decode a list-of-strings cell exactly as ``ast.literal_eval`` would.
+
+    The cells in recipes.csv are almost always ``['a', 'b']`` with no escapes,
+    which is split directly; anything unusual falls back to ``literal_eval``
+    so the result is always identical and rejected cells still raise.
+    """
+    if cell in _NOT_LISTS:
+        raise ValueError(f"not a list literal: {cell!r}")
+
+    if (cell.startswith("['") and cell.endswith("']")
+            and '"' not in cell and '\\' not in cell
+            and '\n' not in cell and '\r' not in cell and '\x00' not in cell):
+        items = cell[2:-2].split("', '")
+        if cell.count("'") == 2 * len(items):
+            return items
+
+    if not (cell.startswith('[') and cell.endswith(']')):
+        return ast.literal_eval(cell)
+    if not cell[1:-1].strip(' \t'):
+        return []
+
+    items = []
+    pos = 1
+    end = len(cell)
+    while True:
+        match = _ITEM.match(cell, pos)
+        if match is None:
+            return ast.literal_eval(cell)
+        item = match.group(1)
+        items.append(item if item is not None else match.group(2))
+        pos = match.end()
+        if match.group(3) == ']':
+            return items if pos == end else ast.literal_eval(cell)
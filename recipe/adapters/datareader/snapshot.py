@@ -0,0 +1,102 @@
+import hashlib
+import logging
+import os
+import pickle
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the pickled domain objects change shape so stale snapshots
+# written by an older build are re-parsed instead of unpickled.
+SNAPSHOT_VERSION = 7
+
+
+def default_snapshot_path(csv_path) -> str:
+    return f"{csv_path}.snapshot"
+
+
+def csv_fingerprint(csv_path) -> dict:
+    stat = os.stat(csv_path)
+    digest = hashlib.sha256()
+    with open(csv_path, 'rb') as csv_file:
+        for chunk in iter(lambda: csv_file.read(1 << 20), b''):
+            digest.update(chunk)
+    return {
+        'version': SNAPSHOT_VERSION,
+        'path': os.path.abspath(csv_path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': digest.hexdigest(),
+    }
+
+
+def is_fresh(header, csv_path) -> bool:
+    if not isinstance(header, dict) or header.get('version') != SNAPSHOT_VERSION:
+        return False
+    stat = os.stat(csv_path)
+    if (header.get('path') != os.path.abspath(csv_path)
+            or header.get('size') != stat.st_size
+            or header.get('mtime_ns') != stat.st_mtime_ns):
+        return False
+    # Only hash the CSV once the cheap checks pass.
+    return header.get('sha256') == csv_fingerprint(csv_path)['sha256']
+
+
+def load_snapshot(reader, snapshot_path=None, indexes=None) -> bool:
+    """Fill ``reader`` from its snapshot; returns False if missing or stale.
+
+    A repository's derived indexes saved alongside the recipes are copied
+    into ``indexes`` when a dict is passed.
+    """
+    snapshot_path = snapshot_path or default_snapshot_path(reader.csv_path)
+    try:
+        with open(snapshot_path, 'rb') as snapshot_file:
+            header = pickle.load(snapshot_file)
+            if not is_fresh(header, reader.csv_path):
+                return False
+            payload = pickle.load(snapshot_file)
+    except FileNotFoundError:
+        return False
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable snapshot {snapshot_path}: {e}")
+        return False
+
+    reader.recipes = payload['recipes']
+    reader.authors = payload['authors']
+    reader.categories = payload['categories']
+    reader.nutritions = payload['nutritions']
+    reader.nutrition_table = payload['nutrition_table']
+    reader.ingredient_vocabulary = payload['ingredient_vocabulary']
+    reader.quantity_vocabulary = payload['quantity_vocabulary']
+    if indexes is not None:
+        indexes.update(payload['indexes'] or {})
+    return True
+
+
+def save_snapshot(reader, snapshot_path=None, indexes=None) -> bool:
+    snapshot_path = snapshot_path or default_snapshot_path(reader.csv_path)
+    payload = {
+        'recipes': reader.recipes,
+        'authors': reader.authors,
+        'categories': reader.categories,
+        'nutritions': reader.nutritions,
+        'nutrition_table': reader.nutrition_table,
+        'ingredient_vocabulary': reader.ingredient_vocabulary,
+        'quantity_vocabulary': reader.quantity_vocabulary,
+        # Pickled with the recipes so one fingerprint covers both.
+        'indexes': indexes,
+    }
+    tmp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as snapshot_file:
+            pickle.dump(csv_fingerprint(reader.csv_path), snapshot_file, pickle.HIGHEST_PROTOCOL)
+            pickle.dump(payload, snapshot_file, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, snapshot_path)
+    except OSError as e:
+        # Read-only deployments simply keep parsing the CSV on every boot.
+        logger.warning(f"Could not write snapshot {snapshot_path}: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return False
+    return True
@@ -0,0 +1,33 @@
+class Vocabulary:
+    """One canonical ``str`` per distinct term, with dense integer ids.
+
+    Recipes repeat the same ingredient names ("salt", "butter") and
+    quantities ("1", "1/2") thousands of times; interning every occurrence
+    through the vocabulary makes all of them share a single object. Ids are
+    assigned in first-seen order and never change, so indexes can refer to
+    terms by id.
+    """
+
+    def __init__(self):
+        self._ids = {}
+        self.terms = []
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def __contains__(self, term: str) -> bool:
+        return term in self._ids
+
+    def intern(self, term: str) -> str:
+        term_id = self._ids.get(term)
+        if term_id is None:
+            self._ids[term] = len(self.terms)
+            self.terms.append(term)
+            return term
+        return self.terms[term_id]
+
+    def intern_all(self, terms: list[str]) -> list[str]:
+        return [self.intern(term) for term in terms]
+
+    def id_of(self, term: str) -> int | None:
+        return self._ids.get(term)
@@ -0,0 +1,128 @@
+from array import array
+
+from recipe.adapters.ingredient_index import intersect, union
+from recipe.domainmodel.recipe import Recipe
+
+# (upper bound in minutes, label); the last bucket has no upper bound.
+COOK_TIME_BUCKETS = (
+    (1, 'No cooking'),
+    (15, 'Under 15 min'),
+    (30, '15-30 min'),
+    (60, '30-60 min'),
+    (120, '1-2 hours'),
+    (None, 'Over 2 hours'),
+)
+
+
+def cook_time_bucket(minutes: int) -> str:
+    for bound, label in COOK_TIME_BUCKETS:
+        if bound is None or minutes < bound:
+            return label
+
+
+def _category(recipe: Recipe) -> str | None:
+    return recipe.category.name if recipe.category is not None else None
+
+
+def _health_rating(recipe: Recipe) -> str:
+    rating = recipe.nutrition.health_rating if recipe.nutrition is not None else None
+    return 'Unrated' if rating is None else str(rating)
+
+
+FACETS = {
+    'category': _category,
+    'author': lambda recipe: recipe.author.name,
+    'cook_time': lambda recipe: cook_time_bucket(recipe.cook_time),
+    'health_rating': _health_rating,
+}
+
+# Position code for recipes without a value for a facet (e.g. no category).
+NO_VALUE = 0xFFFFFFFF
+
+
+def _most_common(counts: dict[str, int]) -> list[tuple[str, int]]:
+    return sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+
+
+class Facet:
+    """Values of one facet with the ascending catalogue positions of each,
+    plus every position's value id for counting a result set."""
+
+    def __init__(self):
+        self._value_ids = {}
+        self._values = []
+        self._postings = []
+        self._codes = array('I')
+
+    def add(self, position: int, value: str | None):
+        if len(self._codes) <= position:
+            self._codes.extend([NO_VALUE] * (position + 1 - len(self._codes)))
+        if value is None:
+            return
+        value_id = self._value_ids.get(value)
+        if value_id is None:
+            value_id = self._value_ids[value] = len(self._values)
+            self._values.append(value)
+            self._postings.append(array('I'))
+        self._postings[value_id].append(position)
+        self._codes[position] = value_id
+
+    def postings(self, value: str):
+        value_id = self._value_ids.get(value)
+        return () if value_id is None else self._postings[value_id]
+
+    def counts(self, positions=None) -> dict[str, int]:
+        if positions is None:
+            return {value: len(postings) for value, postings in zip(self._values, self._postings)}
+        counts = [0] * len(self._values)
+        codes = self._codes
+        for position in positions:
+            code = codes[position]
+            if code != NO_VALUE:
+                counts[code] += 1
+        return {value: count for value, count in zip(self._values, counts) if count}
+
+
+class FacetIndex:
+    """Per-facet position lists for facet counts and drill-down.
+
+    Counting a result set costs O(len(result)) per facet (one array lookup
+    per position). The whole catalogue's counts are sorted once and kept
+    until the next ``add``. Drilling down intersects the selected values'
+    posting lists.
+    """
+
+    def __init__(self):
+        self._facets = {name: Facet() for name in FACETS}
+        self._catalogue_counts = None
+
+    def add(self, position: int, recipe: Recipe):
+        self._catalogue_counts = None
+        for name, facet in self._facets.items():
+            facet.add(position, FACETS[name](recipe))
+
+    def counts(self, positions=None, limit: int | None = 10) -> dict[str, list[tuple[str, int]]]:
+        """``{facet: [(value, count), ...]}``, most common values first."""
+        if positions is None:
+            catalogue_counts = self._catalogue_counts
+            if catalogue_counts is None:
+                catalogue_counts = self._catalogue_counts = {
+                    name: _most_common(facet.counts()) for name, facet in self._facets.items()}
+            return {name: counts[:limit] for name, counts in catalogue_counts.items()}
+        return {name: _most_common(facet.counts(positions))[:limit] for name, facet in self._facets.items()}
+
+    def select(self, selections, positions=None) -> list[int]:
+        """Positions having every selected facet value.
+
+        ``selections`` are ``(facet, value)`` pairs; values of the same facet
+        are OR-ed, different facets AND-ed.
+        """
+        by_facet = {}
+        for name, value in selections:
+            by_facet.setdefault(name, []).append(self._facets[name].postings(value))
+        for posting_lists in sorted(by_facet.values(), key=lambda lists: sum(map(len, lists))):
+            selected = posting_lists[0] if len(posting_lists) == 1 else union(posting_lists)
+            positions = list(selected) if positions is None else intersect(positions, selected)
+            if not positions:
+                return []
+        return list(positions) if positions is not None else []
@@ -0,0 +1,154 @@
+import heapq
+import re
+from array import array
+from bisect import bisect_left
+
+# Operators are upper-case words (or symbols) because commas and a lower-case
+# "and" occur inside ingredient names, e.g. "lemon, juice and zest of".
+_OR = re.compile(r'\s+OR\s+|\|')
+_AND = re.compile(r'\s+AND\s+|;')
+_NOT = re.compile(r'^(?:NOT\s+|-)')
+
+
+def normalise_ingredient(text: str) -> str:
+    return ' '.join(text.lower().split())
+
+
+def parse_ingredient_query(query: str) -> tuple[tuple[tuple[str, ...], tuple[str, ...]], ...]:
+    """Split ``query`` into OR-ed clauses of ``(required, excluded)`` ingredients.
+
+    AND binds tighter than OR: ``"eggs AND flour OR tofu AND NOT peanuts"``
+    means (eggs AND flour) OR (tofu AND NOT peanuts). ``;`` may be used for
+    AND, ``|`` for OR and a leading ``-`` for NOT. The result is hashable and
+    canonical, so it doubles as a cache key.
+    """
+    clauses = []
+    for clause in _OR.split(query):
+        required, excluded = set(), set()
+        for term in _AND.split(clause):
+            term = term.strip()
+            negated = _NOT.match(term)
+            if negated:
+                term = term[negated.end():]
+            term = normalise_ingredient(term)
+            if term:
+                (excluded if negated else required).add(term)
+        if required or excluded:
+            clauses.append((tuple(sorted(required)), tuple(sorted(excluded))))
+    return tuple(sorted(set(clauses)))
+
+
+def intersect(a, b) -> list[int]:
+    """Intersection of two sorted position lists.
+
+    Walks the shorter list and gallops through the longer one with
+    bisection, so the cost is O(short * log(long)) rather than O(long).
+    """
+    if len(a) > len(b):
+        a, b = b, a
+    result = []
+    lo = 0
+    for position in a:
+        lo = bisect_left(b, position, lo)
+        if lo == len(b):
+            break
+        if b[lo] == position:
+            result.append(position)
+    return result
+
+
+def difference(a, b) -> list[int]:
+    """Positions of sorted ``a`` that are not in sorted ``b``."""
+    if len(b) < len(a):
+        excluded = set(b)
+        return [position for position in a if position not in excluded]
+    result = []
+    lo = 0
+    for position in a:
+        lo = bisect_left(b, position, lo)
+        if lo == len(b) or b[lo] != position:
+            result.append(position)
+    return result
+
+
+def union(lists) -> list[int]:
+    result = []
+    for position in heapq.merge(*lists):
+        if not result or result[-1] != position:
+            result.append(position)
+    return result
+
+
+class IngredientIndex:
+    """Ingredient -> ascending catalogue positions of the recipes using it.
+
+    Ingredients are matched exactly after lower-casing and collapsing
+    whitespace. Boolean queries only touch the posting lists they name,
+    except clauses made purely of exclusions, which start from the whole
+    catalogue.
+    """
+
+    def __init__(self):
+        self._postings = {}
+        self._count = 0
+        # Distinct ingredients per position, for pantry coverage.
+        self._sizes = array('H')
+
+    def __len__(self) -> int:
+        return len(self._postings)
+
+    def add(self, position: int, ingredients: list[str]):
+        self._count = max(self._count, position + 1)
+        ingredients = set(map(normalise_ingredient, ingredients))
+        if len(self._sizes) <= position:
+            self._sizes.extend([0] * (position + 1 - len(self._sizes)))
+        self._sizes[position] = min(len(ingredients), 0xFFFF)
+        for ingredient in ingredients:
+            postings = self._postings.get(ingredient)
+            if postings is None:
+                postings = self._postings[ingredient] = array('I')
+            postings.append(position)
+
+    def postings(self, ingredient: str):
+        return self._postings.get(normalise_ingredient(ingredient), ())
+
+    def frequency(self, ingredient: str) -> int:
+        return len(self.postings(ingredient))
+
+    def search(self, query: str) -> list[int]:
+        matches = []
+        for required, excluded in parse_ingredient_query(query):
+            if required:
+                posting_lists = sorted((self.postings(term) for term in required), key=len)
+                positions = list(posting_lists[0])
+                for postings in posting_lists[1:]:
+                    if not positions:
+                        break
+                    positions = intersect(positions, postings)
+            else:
+                positions = range(self._count)
+            for term in excluded:
+                if not positions:
+                    break
+                positions = difference(positions, self.postings(term))
+            matches.append(positions)
+        if len(matches) == 1:
+            return list(matches[0])
+        return union(matches)
+
+    def coverage(self, pantry: list[str], k: int = 10) -> list[tuple[int, int, int]]:
+        """Top ``k`` ``(position, covered, missing)`` for a pantry of ingredients.
+
+        Recipes are ranked by fewest missing ingredients, then most covered,
+        then catalogue position. Only recipes sharing at least one ingredient
+        with the pantry are counted, so the work is proportional to the
+        pantry's posting lists plus O(candidates * log k) for the heap.
+        """
+        covered = {}
+        for ingredient in set(map(normalise_ingredient, pantry)):
+            for position in self._postings.get(ingredient, ()):
+                covered[position] = covered.get(position, 0) + 1
+        sizes = self._sizes
+        best = heapq.nsmallest(k, covered.items(),
+                               key=lambda item: (sizes[item[0]] - item[1], -item[1], item[0]))
+        return [(position, count, sizes[position] - count) for position, count in best]
@@ -1,63 +1,494 @@
+import random
+import threading
+from bisect import bisect_left, bisect_right, insort_left
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple
+
+from recipe.adapters.datareader import snapshot
 from recipe.adapters.datareader.csvdatareader import CSVDataReader
+from recipe.adapters.cursor import Page, decode_cursor, encode_cursor
+from recipe.adapters.facet_index import FacetIndex
+from recipe.adapters.ingredient_index import IngredientIndex, normalise_ingredient, parse_ingredient_query
+from recipe.adapters.nutrition_index import NutritionIndex
+from recipe.adapters.prefix_index import PrefixIndex
+from recipe.adapters.result_cache import ResultCache
+from recipe.adapters.search_index import NGramIndex
+from recipe.adapters.sorted_index import SORT_KEYS, SortedOrder
+from recipe.adapters.write_log import WriteAheadLog
 
 from recipe.domainmodel.user import User
 from recipe.domainmodel.recipe import Recipe
 from recipe.domainmodel.review import Review
 from recipe.domainmodel.favourite import Favourite
 
+DEFAULT_CSV_PATH = Path(__file__).parent / 'data' / 'recipes.csv'
+
+
+class NameNotUniqueException(Exception):
+    pass
+
+
+class PantryMatch(NamedTuple):
+    recipe: Recipe
+    covered: int
+    missing: int
+
+
+class ReviewPage(NamedTuple):
+    reviews: list[Review]
+    total: int
+    offset: int
+
+
+def _review_date(review: Review):
+    return review.date_submitted
+
+
+def _user_ref(user) -> tuple:
+    # Reviews posted through the web app name their user by username.
+    return ('user', user.username) if isinstance(user, User) else ('value', user)
+
 
 class MemoryRepository:
-    def __init__(self):
+    # Structures derived from the catalogue. Recipes are referred to by their
+    # position in it, so backends that do not hold every Recipe object can
+    # share the same indexes (and persist them by these attribute names).
+    _INDEX_ATTRIBUTES = ('_positions_by_id', '_name_index', '_category_index', '_author_index',
+                         '_sorted_orders', '_ingredient_index', '_nutrition_index',
+                         '_facet_index', '_prefix_indexes')
+
+    SORT_KEYS = tuple(SORT_KEYS)
+    SEARCH_CRITERIA = ('name', 'category', 'author', 'ingredient')
+    FUZZY_CRITERIA = ('name', 'category', 'author')
+
+    # Fuzzy matches must share this fraction of the query's trigrams; ranking
+    # stops verifying candidates after FUZZY_BUDGET seconds.
+    FUZZY_THRESHOLD = 0.6
+    FUZZY_BUDGET = 0.05
+
+    # Bumped on every catalogue change; cached search results are only served
+    # for the version they were computed against.
+    _catalogue_version = 0
+
+    def __init__(self, csv_path=DEFAULT_CSV_PATH, workers: int = 1,
+                 search_cache_size: int = 256, search_cache_ttl: float | None = None,
+                 data_dir=None, compact_bytes: int = 64 << 20):
+        self._search_cache = ResultCache(search_cache_size, search_cache_ttl)
         self._users = []
+        self._users_by_name = {}
         self._recipes = []
         self._reviews = {}
         self._favourites = []
-        self.read_all_recipes('recipe/adapters/data/recipes.csv')
+        self._write_lock = threading.RLock()
+        self._write_log = None
+        if csv_path is not None:
+            self.read_all_recipes(csv_path, workers=workers)
+        if data_dir is not None:
+            # Users, reviews and favourites are kept in a write-ahead log under
+            # data_dir; replaying it needs the catalogue for favourites.
+            self._write_log = WriteAheadLog(data_dir, compact_bytes=compact_bytes)
+            self._replay_writes()
+
+    @property
+    def _recipes(self) -> list[Recipe]:
+        return self.__recipes
+
+    @_recipes.setter
+    def _recipes(self, recipes: list[Recipe]):
+        # Replacing the catalogue wholesale (read_all_recipes, tests) rebuilds
+        # every index derived from it.
+        self.__recipes = recipes
+        self._index_recipes()
+
+    def _reset_indexes(self):
+        self._positions_by_id = {}
+        self._name_index = NGramIndex()
+        self._category_index = NGramIndex()
+        self._author_index = NGramIndex()
+        self._sorted_orders = {sort_key: SortedOrder(sort_key) for sort_key in SORT_KEYS}
+        self._ingredient_index = IngredientIndex()
+        self._nutrition_index = NutritionIndex()
+        self._facet_index = FacetIndex()
+        self._prefix_indexes = {criteria: PrefixIndex() for criteria in self.SEARCH_CRITERIA}
+
+    def _index_recipes(self):
+        self._catalogue_version += 1
+        self._reset_indexes()
+        for position, recipe in enumerate(self._iter_recipes()):
+            self._index_recipe(position, recipe, bulk=True)
+        for order in self._sorted_orders.values():
+            order.sort()
+        self._nutrition_index.sort()
+        for prefix_index in self._prefix_indexes.values():
+            prefix_index.sort()
+
+    def _index_recipe(self, position: int, recipe: Recipe, bulk: bool = False):
+        if not bulk:
+            self._catalogue_version += 1
+        self._positions_by_id.setdefault(recipe.id, position)
+        self._name_index.add(position, recipe.name)
+        if recipe.category is not None:
+            self._category_index.add(position, recipe.category.name)
+        self._author_index.add(position, recipe.author.name)
+        ingredients = recipe.peek_ingredients()
+        self._ingredient_index.add(position, ingredients)
+        self._nutrition_index.add(position, recipe.nutrition, bulk)
+        self._facet_index.add(position, recipe)
+        suggestions = self._prefix_indexes
+        suggestions['name'].add(recipe.name, recipe.rating, bulk)
+        if recipe.category is not None:
+            suggestions['category'].add(recipe.category.name, recipe.rating, bulk)
+        suggestions['author'].add(recipe.author.name, recipe.rating, bulk)
+        for ingredient in set(map(normalise_ingredient, ingredients)):
+            suggestions['ingredient'].add(ingredient, recipe.rating, bulk)
+        for order in self._sorted_orders.values():
+            if bulk:
+                order.append(position, recipe)
+            else:
+                order.insert(position, recipe)
+
+    def _iter_recipes(self):
+        return iter(self.__recipes)
+
+    def _recipe_count(self) -> int:
+        return len(self.__recipes)
+
+    def _recipe_at(self, position: int) -> Recipe:
+        return self.__recipes[position]
+
+    def _recipes_at(self, positions) -> list[Recipe]:
+        return [self._recipe_at(position) for position in positions]
     
+    def _log_write(self, record: tuple):
+        if self._write_log is not None:
+            self._write_log.append(record)
+
+    def _replay_writes(self):
+        """Apply the logged writes not seen yet: the whole log on startup,
+        afterwards whatever other worker processes appended."""
+        if self._write_log is None:
+            return
+        self._apply_records(self._write_log.read_new())
+
+    def _apply_records(self, records: list):
+        if records:
+            with self._write_lock:
+                for record in records:
+                    self._apply_record(record)
+
+    def _apply_record(self, record: tuple):
+        kind = record[0]
+        if kind == 'user':
+            _, username, password, user_id = record
+            self._store_user(User(username, password, user_id))
+        elif kind == 'review':
+            _, review_id, user_ref, recipe_id, rating, review_text, date_submitted = record
+            self._store_review(Review(review_id, self._resolve_user(user_ref), recipe_id, rating, review_text,
+                                      datetime.fromisoformat(date_submitted)))
+        elif kind == 'favourite':
+            _, favourite_id, user_ref, recipe_id = record
+            recipe = self.get_recipe(recipe_id)
+            # Favourites of recipes no longer in the catalogue are dropped.
+            if recipe is not None:
+                self._store_favourite(Favourite(favourite_id, self._resolve_user(user_ref), recipe))
+        else:
+            raise ValueError(f"Unknown write log record: {kind!r}")
+
+    def _resolve_user(self, user_ref: tuple):
+        kind, value = user_ref
+        if kind == 'user':
+            return self._users_by_name.get(value) or User(value, None)
+        return value
+
+    def _store_user(self, user: User):
+        with self._write_lock:
+            self._users.append(user)
+            self._users_by_name.setdefault(user.username, user)
+
     def add_user(self, user : User):
-        self._users.append(user)
+        def check_name(records):
+            self._apply_records(records)
+            if user.username in self._users_by_name:
+                raise NameNotUniqueException(user.username)
+
+        # Checking the name and logging the user happen under the log's lock,
+        # so two workers cannot both register the same name.
+        with self._write_lock:
+            if self._write_log is None:
+                check_name([])
+            else:
+                self._write_log.append_exclusive(check_name, ('user', user.username, user.password, user.id))
+            self._store_user(user)
     
     def get_user(self, username: str):
-        return next((u for u in self._users if u.username == username), None)
+        self._replay_writes()
+        return self._users_by_name.get(username)
     
     def add_recipe(self, recipe : Recipe):
-        self._recipes.append(recipe)
+        self.__recipes.append(recipe)
+        self._index_recipe(len(self.__recipes) - 1, recipe)
     
     def get_recipe(self, recipe_id : int):
-        return next((r for r in self._recipes if r.id == recipe_id), None)
+        position = self._positions_by_id.get(recipe_id)
+        return None if position is None else self._recipe_at(position)
 
-    def read_all_recipes(self, csv_path : str):
-        reader = CSVDataReader(csv_path)
-        reader.csv_reader()
+    def read_all_recipes(self, csv_path : str, use_snapshot: bool = True, workers: int = 1):
+        reader = CSVDataReader(csv_path, lazy=True)
+        indexes = {}
+        if use_snapshot and snapshot.load_snapshot(reader, indexes=indexes):
+            if indexes:
+                # Warm boot: the snapshot already holds every derived index.
+                self.__recipes = reader.recipes
+                self._catalogue_version += 1
+                for name in self._INDEX_ATTRIBUTES:
+                    setattr(self, name, indexes[name])
+                return
+        else:
+            reader.csv_reader(workers=workers)
         self._recipes = reader.recipes
+        if use_snapshot:
+            snapshot.save_snapshot(reader, indexes={name: getattr(self, name) for name in self._INDEX_ATTRIBUTES})
 
     def get_all_recipes(self):
         return list(self._recipes)
 
+    def count_recipes(self) -> int:
+        return self._recipe_count()
+
+    def get_recipes_page(self, sort: str = 'name', offset: int = 0, limit: int = 10,
+                         descending: bool = False, after: str | None = None) -> Page:
+        """One page of the catalogue in ``sort`` order (one of ``SORT_KEYS``).
+
+        With an ``after`` cursor (a previous page's ``next_cursor``) the page
+        starts right after that entry and ``offset`` is ignored.
+        """
+        order = self._sorted_orders.get(sort)
+        if order is None:
+            raise ValueError(f"Unknown sort key: {sort}")
+        if after is not None:
+            key, recipe_id = decode_cursor(after, sort)
+            try:
+                offset = order.offset_after(key, recipe_id, descending)
+            except TypeError as e:
+                raise ValueError(f"Invalid cursor: {after!r}") from e
+        entries = order.entries(offset, limit, descending)
+        next_cursor = None
+        if entries and offset + len(entries) < len(order):
+            key, recipe_id, _ = entries[-1]
+            next_cursor = encode_cursor(sort, key, recipe_id)
+        return Page(self._recipes_at(entry[2] for entry in entries), len(order), offset, next_cursor)
+
+    def get_random_recipes(self, k: int):
+        count = self._recipe_count()
+        return self._recipes_at(random.sample(range(count), k=min(k, count)))
+
+    def _store_review(self, review: Review):
+        # Each recipe's reviews are kept oldest first; a review goes before
+        # any with the same date, so newest-first reads list equal dates in
+        # the order they were added.
+        with self._write_lock:
+            reviews = self._reviews.setdefault(review.recipe_id, [])
+            if not reviews or review.date_submitted > reviews[-1].date_submitted:
+                reviews.append(review)
+            else:
+                insort_left(reviews, review, key=_review_date)
+
     def add_review(self, review : Review):
-        recipe_id = review.recipe_id
-        if recipe_id not in self._reviews:
-            self._reviews[recipe_id] = []
-        self._reviews[recipe_id].append(review)
-    
+        self._log_write(('review', review.id, _user_ref(review.user), review.recipe_id, review.rating,
+                         review.review_text, review.date_submitted.isoformat()))
+        self._store_review(review)
+
+    def count_reviews_for_recipe(self, recipe_id: int) -> int:
+        self._replay_writes()
+        return len(self._reviews.get(recipe_id, ()))
+
     def get_reviews_for_recipe(self, recipe_id : int):
-        return sorted(self._reviews.get(recipe_id, []), key=lambda r: r.date_submitted, reverse=True)
+        self._replay_writes()
+        return self._reviews.get(recipe_id, [])[::-1]
+
+    def get_reviews_page(self, recipe_id: int, offset: int = 0, limit: int = 10) -> ReviewPage:
+        """One page of a recipe's reviews, newest first."""
+        self._replay_writes()
+        reviews = self._reviews.get(recipe_id, [])
+        end = max(len(reviews) - offset, 0)
+        return ReviewPage(reviews[max(end - limit, 0):end][::-1], len(reviews), offset)
     
+    def _store_favourite(self, favourite: Favourite):
+        with self._write_lock:
+            self._favourites.append(favourite)
+
     def add_favourite(self, favourite : Favourite):
-        self._favourites.append(favourite)
+        self._log_write(('favourite', favourite.id, _user_ref(favourite.user), favourite.recipe.id))
+        self._store_favourite(favourite)
 
     def get_favourites_for_user(self, user_id : int):
+        self._replay_writes()
         return [f for f in self._favourites if f.user.id == user_id]
     
+    def _search_positions(self, criteria: str | None, query: str) -> list[int]:
+        if criteria is None:
+            return list(range(self._recipe_count()))
+        index = {
+            'name': self._name_index,
+            'category': self._category_index,
+            'author': self._author_index,
+            'ingredient': self._ingredient_index,
+        }.get(criteria)
+        return [] if index is None else index.search(query)
+
+    def _similar_positions(self, criteria: str, query: str) -> list[int]:
+        """Positions of recipes whose ``criteria`` field resembles ``query``,
+        most similar first (ties in catalogue order)."""
+        index = {
+            'name': self._name_index,
+            'category': self._category_index,
+            'author': self._author_index,
+        }.get(criteria)
+        if index is None:
+            return []
+        positions = []
+        for value_id, _ in index.similar(query, self.FUZZY_THRESHOLD, self.FUZZY_BUDGET):
+            positions.extend(index.value_positions(value_id))
+        return positions
+
+    def _cached_search(self, criteria: str | None, query: str, sort: str | None = None,
+                       filters: tuple = (), facets: tuple = (), fuzzy: bool = False) -> tuple[list, list]:
+        """``(positions, keys)`` of the matches, in result order.
+
+        ``criteria=None`` matches the whole catalogue. ``filters`` are
+        nutrition range filters (see ``parse_nutrition_filters``) and
+        ``facets`` ``(facet, value)`` drill-down selections. ``keys``
+        are what the results are ordered by: the positions themselves for
+        catalogue order, ranks for ``fuzzy`` relevance order, otherwise
+        ``(sort key, recipe id)`` pairs. Both lists are shared with the cache
+        and must not be modified.
+        """
+        normalised = parse_ingredient_query(query) if criteria == 'ingredient' else query.lower()
+        cache_key = (criteria, normalised, sort, tuple(filters), tuple(facets), fuzzy)
+        version = self._catalogue_version
+        result = self._search_cache.get(cache_key, version)
+        if result is None:
+            ranked = None
+            if fuzzy and criteria is not None:
+                # Facets and filters expect ascending positions; the ranking
+                # is restored afterwards.
+                ranked = self._similar_positions(criteria, query)
+                positions = sorted(ranked)
+            else:
+                # None stands for the whole catalogue until something narrows it.
+                positions = None if criteria is None else self._search_positions(criteria, query)
+            if facets:
+                positions = self._facet_index.select(facets, positions)
+            if filters:
+                positions = self._nutrition_index.filter(filters, positions)
+            if positions is None:
+                positions = list(range(self._recipe_count()))
+            keys = positions
+            if ranked is not None and sort is None:
+                if len(positions) < len(ranked):
+                    kept = set(positions)
+                    positions = [position for position in ranked if position in kept]
+                else:
+                    positions = ranked
+                keys = range(len(positions))
+            if sort is not None:
+                key = SORT_KEYS[sort]
+                entries = sorted((key(recipe), recipe.id, position)
+                                 for position, recipe in zip(positions, self._recipes_at(positions)))
+                positions = [entry[2] for entry in entries]
+                keys = [entry[:2] for entry in entries]
+            result = (positions, keys)
+            self._search_cache.put(cache_key, version, result)
+        return result
+
+    def search_cache_stats(self) -> dict:
+        return self._search_cache.stats()
+
+    def search_recipes(self, criteria: str | None, query: str, offset: int = 0, limit: int = 10,
+                       after: str | None = None, sort: str | None = None, descending: bool = False,
+                       filters: tuple = (), facets: tuple = (), fuzzy: bool = False) -> Page:
+        """One page of ``find_by_<criteria>(query)`` (the whole catalogue if
+        ``criteria`` is None) narrowed by nutrition ``filters`` and facet
+        selections, in catalogue order or by one of ``SORT_KEYS``. With
+        ``fuzzy`` the matches are those of ``find_similar`` and the default
+        order is by similarity.
+
+        The full match list is cached, so later pages are a slice of it. In
+        catalogue order cursors encode the position of the last recipe shown,
+        which never changes, so later pages do not shift when recipes are
+        added.
+        """
+        if sort is not None and sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort}")
+        if fuzzy and criteria not in self.FUZZY_CRITERIA:
+            raise ValueError(f"Fuzzy search is not supported for: {criteria}")
+        positions, keys = self._cached_search(criteria, query, sort, filters, facets, fuzzy)
+        ordering = ('fuzzy' if fuzzy else 'search') if sort is None else f'search:{sort}'
+        if after is not None:
+            key, recipe_id = decode_cursor(after, ordering)
+            cursor_key = key if sort is None else (key, recipe_id)
+            try:
+                if descending:
+                    offset = len(keys) - bisect_left(keys, cursor_key)
+                else:
+                    offset = bisect_right(keys, cursor_key)
+            except TypeError as e:
+                raise ValueError(f"Invalid cursor: {after!r}") from e
+        if descending:
+            indices = range(len(positions) - 1 - offset, max(len(positions) - 1 - offset - limit, -1), -1)
+        else:
+            indices = range(offset, min(offset + limit, len(positions)))
+        recipes = self._recipes_at(positions[i] for i in indices)
+        next_cursor = None
+        if indices and offset + len(indices) < len(positions):
+            last = indices[-1]
+            if sort is None:
+                next_cursor = encode_cursor(ordering, keys[last], recipes[-1].id)
+            else:
+                next_cursor = encode_cursor(ordering, *keys[last])
+        return Page(recipes, len(positions), offset, next_cursor)
+
+    def facet_counts(self, criteria: str | None = None, query: str = '', filters: tuple = (),
+                     facets: tuple = (), limit: int | None = 10,
+                     fuzzy: bool = False) -> dict[str, list[tuple[str, int]]]:
+        """Category, author, cook-time bucket and health rating counts of the
+        recipes ``search_recipes`` would return for the same arguments."""
+        if criteria is None and not filters and not facets:
+            return self._facet_index.counts(None, limit)
+        positions, _ = self._cached_search(criteria, query, None, filters, facets, fuzzy)
+        return self._facet_index.counts(positions, limit)
+
+    def suggest(self, criteria: str, prefix: str, limit: int = 10) -> list[str]:
+        """Up to ``limit`` values of ``criteria`` starting with ``prefix``,
+        those shared by most recipes (then best rated) first."""
+        prefix_index = self._prefix_indexes.get(criteria)
+        if prefix_index is None:
+            raise ValueError(f"Unknown search criteria: {criteria}")
+        return prefix_index.suggest(prefix, limit)
+
     def find_by_name(self, query: str):
-        return [r for r in self._recipes if query.lower() in r.name.lower()]
+        return self._recipes_at(self._cached_search('name', query)[0])
 
     def find_by_category(self, query: str):
-        return [r for r in self._recipes if query.lower() in r.category.name.lower()]
+        return self._recipes_at(self._cached_search('category', query)[0])
     
     def find_by_author(self, query: str):
-        return [r for r in self._recipes if query.lower() in r.author.name.lower()]
-    
-        
+        return self._recipes_at(self._cached_search('author', query)[0])
+
+    def find_similar(self, query: str, criteria: str = 'name'):
+        """Recipes whose ``criteria`` field is a close match for ``query``
+        despite typos (``"choclate cake"``), most similar first."""
+        if criteria not in self.FUZZY_CRITERIA:
+            raise ValueError(f"Fuzzy search is not supported for: {criteria}")
+        return self._recipes_at(self._cached_search(criteria, query, fuzzy=True)[0])
 
+    def find_by_pantry(self, pantry: list[str], k: int = 12) -> list[PantryMatch]:
+        """The ``k`` recipes best covered by the ingredients in ``pantry``."""
+        return [PantryMatch(self._recipe_at(position), covered, missing)
+                for position, covered, missing in self._ingredient_index.coverage(pantry, k)]
 
+    def find_by_ingredient(self, query: str):
+        """Recipes matching a boolean ingredient query such as
+        ``"eggs AND flour AND NOT milk"`` (see ``parse_ingredient_query``)."""
+        return self._recipes_at(self._cached_search('ingredient', query)[0])
@@ -0,0 +1,151 @@
+import csv
+import logging
+import mmap
+import os
+import pickle
+import threading
+from array import array
+from collections import OrderedDict
+
+from recipe.adapters.datareader import snapshot
+from recipe.adapters.datareader.csvdatareader import CSVDataReader, iter_record_spans, parse_records
+from recipe.adapters.memory_repo import DEFAULT_CSV_PATH, MemoryRepository
+from recipe.domainmodel.recipe import Recipe
+
+logger = logging.getLogger(__name__)
+
+# Bump when the persisted offset index or the repository's search indexes
+# change layout.
+INDEX_VERSION = 9
+
+
+class MmapRepository(MemoryRepository):
+    """MemoryRepository that leaves the catalogue in recipes.csv.
+
+    The CSV is memory-mapped and indexed by RecipeId; recipes are parsed on
+    demand and only a bounded LRU of recently used ones is kept, so memory
+    follows the working set rather than the catalogue size. The search
+    indexes inherited from MemoryRepository only hold catalogue positions and
+    are persisted together with the byte offsets.
+    """
+
+    def __init__(self, csv_path=DEFAULT_CSV_PATH, cache_size: int = 1024, index_path=None,
+                 search_cache_size: int = 256, search_cache_ttl: float | None = None,
+                 data_dir=None, compact_bytes: int = 64 << 20):
+        self._cache_size = cache_size
+        self._index_path = index_path
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._added_recipes = []
+        self._offsets = array('q')
+        self._file = None
+        self._data = b''
+        super().__init__(csv_path, search_cache_size=search_cache_size, search_cache_ttl=search_cache_ttl,
+                         data_dir=data_dir, compact_bytes=compact_bytes)
+
+    def read_all_recipes(self, csv_path : str, use_snapshot: bool = True, workers: int = 1):
+        self.close()
+        self._csv_path = csv_path
+        self._file = open(csv_path, 'rb')
+        if os.path.getsize(csv_path):
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        with open(csv_path, encoding='utf-8') as csvfile:
+            self._fieldnames = next(csv.reader(csvfile), [])
+        self._builder = CSVDataReader(csv_path, lazy=True)
+        self._cache.clear()
+        self._added_recipes = []
+
+        index_path = self._index_path or f"{csv_path}.idx"
+        if use_snapshot and self._load_index(index_path):
+            self._catalogue_version += 1
+        else:
+            self._build_index()
+            self._index_recipes()
+            if use_snapshot:
+                self._save_index(index_path)
+
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._data = b''
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _build_index(self):
+        spans = iter_record_spans(self._data)
+        next(spans, None)  # header
+        self._offsets = array('q')
+        self._ends = array('q')
+        for start, end in spans:
+            self._offsets.append(start)
+            self._ends.append(end)
+
+    def _load_index(self, index_path) -> bool:
+        try:
+            with open(index_path, 'rb') as index_file:
+                header = pickle.load(index_file)
+                if header.get('index_version') != INDEX_VERSION \
+                        or not snapshot.is_fresh(header.get('fingerprint'), self._csv_path):
+                    return False
+                self._offsets, self._ends, indexes = pickle.load(index_file)
+                for name in self._INDEX_ATTRIBUTES:
+                    setattr(self, name, indexes[name])
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable recipe index {index_path}: {e}")
+            return False
+        return True
+
+    def _save_index(self, index_path):
+        header = {'index_version': INDEX_VERSION, 'fingerprint': snapshot.csv_fingerprint(self._csv_path)}
+        tmp_path = f"{index_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as index_file:
+                pickle.dump(header, index_file, pickle.HIGHEST_PROTOCOL)
+                indexes = {name: getattr(self, name) for name in self._INDEX_ATTRIBUTES}
+                pickle.dump((self._offsets, self._ends, indexes), index_file, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, index_path)
+        except OSError as e:
+            logger.warning(f"Could not write recipe index {index_path}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def _materialise(self, row: int) -> Recipe:
+        raw = self._data[self._offsets[row]:self._ends[row]]
+        parsed = parse_records(raw, self._fieldnames, lazy=True)[0]
+        return self._builder.build_recipe(parsed)
+
+    def _recipe_count(self) -> int:
+        return len(self._offsets) + len(self._added_recipes)
+
+    def _recipe_at(self, row: int, cache: bool = True) -> Recipe:
+        if row >= len(self._offsets):
+            return self._added_recipes[row - len(self._offsets)]
+        with self._cache_lock:
+            recipe = self._cache.get(row)
+            if recipe is not None:
+                self._cache.move_to_end(row)
+                return recipe
+        recipe = self._materialise(row)
+        if cache:
+            with self._cache_lock:
+                self._cache[row] = recipe
+                while len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+        return recipe
+
+    def _iter_recipes(self):
+        # Full scans bypass the LRU so they do not evict the hot set.
+        for row in range(self._recipe_count()):
+            yield self._recipe_at(row, cache=False)
+
+    def add_recipe(self, recipe : Recipe):
+        self._added_recipes.append(recipe)
+        self._index_recipe(self._recipe_count() - 1, recipe)
+
+    def get_all_recipes(self):
+        return list(self._iter_recipes())
@@ -0,0 +1,155 @@
+import math
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from urllib.parse import unquote_plus
+
+from recipe.domainmodel.nutrition import BaseNutrition
+
+NUTRIENTS = ('calories', 'fat', 'saturated_fat', 'cholesterol', 'sodium', 'carbohydrates',
+             'fiber', 'sugar', 'protein', 'health_rating')
+
+_FILTER = re.compile(r'(?<!\w)(' + '|'.join(NUTRIENTS) + r')\s*(<=|>=|==|<|>|=)\s*(\d+(?:\.\d*)?|\.\d+)')
+
+
+def _filters_in(text: str) -> tuple[tuple[str, str, float], ...]:
+    filters = set()
+    for name, op, value in _FILTER.findall(text):
+        filters.add((name, '=' if op == '==' else op, float(value)))
+    return tuple(sorted(filters))
+
+
+def parse_nutrition_filters(text: str) -> tuple[tuple[str, str, float], ...]:
+    """Find filters such as ``calories<500`` or ``protein>=20`` in ``text``
+    (URL-encoded or not).
+
+    Returns a canonical (sorted, de-duplicated) tuple of
+    ``(nutrient, op, value)`` usable as a cache key.
+    """
+    return _filters_in(unquote_plus(text))
+
+
+def nutrition_filters_from_args(args) -> tuple[tuple[str, str, float], ...]:
+    """The filters in request ``args``: the ``filters`` argument, plus
+    filters written as arguments of their own. Flask turns ``calories<500``
+    into a key with an empty value and ``protein>=20`` into the key
+    ``protein>`` with the value ``20``, so those are joined back up. Other
+    arguments' values (the search text, facets) are never read as filters.
+    """
+    parts = args.getlist('filters')
+    for key, value in args.items(multi=True):
+        if key.startswith(NUTRIENTS):
+            parts.append(f'{key}={value}' if value else key)
+    return _filters_in(' '.join(parts))
+
+
+def format_nutrition_filters(filters) -> str:
+    return ' '.join(f"{name}{op}{value:g}" for name, op, value in filters)
+
+
+def nutrient_value(nutrition: BaseNutrition | None, name: str) -> float | None:
+    if nutrition is None:
+        return None
+    return getattr(nutrition, name)
+
+
+class NutrientColumn:
+    """One nutrient's values, sorted (with their positions) for range lookups
+    and by position for checking a single recipe."""
+
+    def __init__(self):
+        self.values = array('d')
+        self.positions = array('I')
+        self.by_position = array('d')
+        self._pending = []
+
+    def add(self, position: int, value: float | None, bulk: bool = False):
+        if len(self.by_position) <= position:
+            self.by_position.extend([math.nan] * (position + 1 - len(self.by_position)))
+        if value is None:
+            return
+        self.by_position[position] = value
+        if bulk:
+            self._pending.append((value, position))
+        else:
+            i = bisect_right(self.values, value)
+            self.values.insert(i, value)
+            self.positions.insert(i, position)
+
+    def sort(self):
+        if self._pending:
+            entries = sorted(self._pending + list(zip(self.values, self.positions)))
+            self.values = array('d', (value for value, _ in entries))
+            self.positions = array('I', (position for _, position in entries))
+            self._pending = []
+
+    def range(self, op: str, value: float) -> tuple[int, int]:
+        """Index range of ``values`` satisfying ``<op> value``."""
+        if op == '<':
+            return 0, bisect_left(self.values, value)
+        if op == '<=':
+            return 0, bisect_right(self.values, value)
+        if op == '>':
+            return bisect_right(self.values, value), len(self.values)
+        if op == '>=':
+            return bisect_left(self.values, value), len(self.values)
+        return bisect_left(self.values, value), bisect_right(self.values, value)
+
+
+class NutritionIndex:
+    """Range filters over every nutrient (and the health rating).
+
+    A query bisects each filter's range, expands only the most selective one
+    and checks the surviving positions against the other nutrients' columns,
+    so its cost follows the smallest matching range rather than the
+    catalogue size.
+    """
+
+    def __init__(self):
+        self._columns = {name: NutrientColumn() for name in NUTRIENTS}
+
+    def add(self, position: int, nutrition: BaseNutrition | None, bulk: bool = False):
+        for name, column in self._columns.items():
+            column.add(position, nutrient_value(nutrition, name), bulk)
+
+    def sort(self):
+        for column in self._columns.values():
+            column.sort()
+
+    def filter(self, filters, candidates=None) -> list[int]:
+        """Ascending positions matching every filter (and in ``candidates``,
+        an ascending position list, when given)."""
+        if not filters:
+            return list(range(len(self._columns['calories'].by_position)) if candidates is None else candidates)
+        ranges = {}
+        for name, op, value in filters:
+            start, end = self._columns[name].range(op, value)
+            previous = ranges.get(name)
+            if previous is not None:
+                start, end = max(start, previous[0]), min(end, previous[1])
+            if start >= end:
+                return []
+            ranges[name] = (start, end)
+
+        checks = []
+        for name, (start, end) in ranges.items():
+            column = self._columns[name]
+            checks.append((end - start, name, column.by_position, column.values[start], column.values[end - 1]))
+        checks.sort()
+
+        def matches(position):
+            for _, _, by_position, low, high in checks:
+                if not low <= by_position[position] <= high:
+                    return False
+            return True
+
+        if candidates is not None and len(candidates) <= checks[0][0]:
+            return [position for position in candidates if matches(position)]
+
+        _, name, _, _, _ = checks[0]
+        start, end = ranges[name]
+        positions = sorted(self._columns[name].positions[start:end])
+        if candidates is not None:
+            allowed = set(candidates)
+            positions = [position for position in positions if position in allowed]
+        return [position for position in positions if matches(position)]
@@ -0,0 +1,75 @@
+import heapq
+from bisect import bisect_left, insort
+
+# Prefixes up to this length match large ranges, so their suggestions are
+# kept once computed (until the index changes).
+MEMO_PREFIX_LENGTH = 2
+MAX_SUGGESTIONS = 20
+
+
+class PrefixIndex:
+    """Distinct values of one field in sorted order, for autocompletion.
+
+    The values starting with a prefix are one contiguous range of the sorted
+    keys, found by bisection; the best ``limit`` of them are picked by
+    weight: how many recipes share the value, then the best recipe rating
+    among them. Ties are suggested alphabetically.
+    """
+
+    def __init__(self):
+        self._keys = []
+        # key -> [display value, recipe count, best rating (-1 if unrated)]
+        self._entries = {}
+        self._unsorted = False
+        self._memo = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, value: str, rating: float | None = None, bulk: bool = False):
+        value = value.strip()
+        if not value:
+            return
+        key = value.lower()
+        entry = self._entries.get(key)
+        if entry is None:
+            self._entries[key] = [value, 1, -1 if rating is None else rating]
+            if bulk:
+                self._keys.append(key)
+                self._unsorted = True
+            else:
+                insort(self._keys, key)
+        else:
+            entry[1] += 1
+            if rating is not None and rating > entry[2]:
+                entry[2] = rating
+        self._memo.clear()
+
+    def sort(self):
+        if self._unsorted:
+            self._keys.sort()
+            self._unsorted = False
+
+    def _weight(self, key: str):
+        _, count, rating = self._entries[key]
+        return -count, -rating, key
+
+    def suggest(self, prefix: str, limit: int = 10) -> list[str]:
+        # A trailing space is kept: "light " should not suggest "lightly".
+        prefix = prefix.lstrip().lower()
+        limit = min(limit, MAX_SUGGESTIONS)
+        if not prefix or limit <= 0:
+            return []
+        if len(prefix) <= MEMO_PREFIX_LENGTH and prefix in self._memo:
+            return self._memo[prefix][:limit]
+        lo = bisect_left(self._keys, prefix)
+        hi = bisect_left(self._keys, prefix + '\uffff', lo)
+        size = MAX_SUGGESTIONS if len(prefix) <= MEMO_PREFIX_LENGTH else limit
+        if hi - lo <= size:
+            best = sorted(self._keys[lo:hi], key=self._weight)
+        else:
+            best = heapq.nsmallest(size, (self._keys[i] for i in range(lo, hi)), key=self._weight)
+        suggestions = [self._entries[key][0] for key in best]
+        if len(prefix) <= MEMO_PREFIX_LENGTH:
+            self._memo[prefix] = suggestions
+        return suggestions[:limit]
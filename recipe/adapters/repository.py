@@ -0,0 +1,80 @@
+import threading
+
+from recipe.adapters.memory_repo import DEFAULT_CSV_PATH, MemoryRepository
+from recipe.adapters.mmap_repo import MmapRepository
+from recipe.adapters.sqlite_repo import SQLiteRepository
+
+# Process-wide repository shared by every blueprint. It is built once by
+# create_app (in the gunicorn master when the app is preloaded) so workers
+# inherit the parsed catalogue copy-on-write instead of re-reading the CSV;
+# a later create_app with different repository settings replaces it.
+repo_instance = None
+
+_lock = threading.Lock()
+
+# The config keys create_repository reads besides REPOSITORY and
+# RECIPE_DATA_PATH; _settings holds all of their values for the current
+# repo_instance (None after set_repository).
+SETTINGS = ('RECIPE_LOAD_WORKERS', 'RECIPE_CACHE_SIZE', 'SEARCH_CACHE_SIZE', 'SEARCH_CACHE_TTL', 'DATA_DIR',
+            'WRITE_LOG_COMPACT_BYTES', 'SQLITE_PATH')
+_settings = None
+
+
+def _settings_of(config) -> tuple:
+    return (config.get('REPOSITORY', 'memory'), str(config.get('RECIPE_DATA_PATH') or DEFAULT_CSV_PATH),
+            *(config.get(key) for key in SETTINGS))
+
+
+def init_repository(config=None):
+    """The shared repository for ``config``: the existing one if it was built
+    from the same settings (or installed with ``set_repository``), otherwise
+    a new one replacing it."""
+    global repo_instance, _settings
+    config = config or {}
+    settings = _settings_of(config)
+    with _lock:
+        if repo_instance is None or (_settings is not None and _settings != settings):
+            repo_instance = create_repository(config)
+            _settings = settings
+    return repo_instance
+
+
+def create_repository(config):
+    csv_path = config.get('RECIPE_DATA_PATH') or DEFAULT_CSV_PATH
+    backend = config.get('REPOSITORY', 'memory')
+    ttl = config.get('SEARCH_CACHE_TTL')
+    search_cache = {
+        'search_cache_size': int(config.get('SEARCH_CACHE_SIZE') or 256),
+        'search_cache_ttl': float(ttl) if ttl else None,
+    }
+    cache_size = int(config.get('RECIPE_CACHE_SIZE') or 1024)
+    if backend == 'sqlite':
+        # Users, reviews and favourites are tables in the same database, which
+        # every worker opens (SQLITE_PATH defaults to next to the CSV).
+        return SQLiteRepository(csv_path, path=config.get('SQLITE_PATH') or None, cache_size=cache_size,
+                                **search_cache)
+    options = {
+        **search_cache,
+        # With a DATA_DIR, users, reviews and favourites survive restarts and
+        # are shared by the workers through a write-ahead log kept there.
+        'data_dir': config.get('DATA_DIR') or None,
+        'compact_bytes': int(config.get('WRITE_LOG_COMPACT_BYTES') or 64 << 20),
+    }
+    if backend == 'memory':
+        return MemoryRepository(csv_path, workers=int(config.get('RECIPE_LOAD_WORKERS') or 1), **options)
+    if backend == 'mmap':
+        return MmapRepository(csv_path, cache_size=cache_size, **options)
+    raise ValueError(f"Unknown repository backend: {backend}")
+
+
+def get_repository():
+    if repo_instance is None:
+        return init_repository()
+    return repo_instance
+
+
+def set_repository(repo):
+    global repo_instance, _settings
+    with _lock:
+        repo_instance = repo
+        _settings = None
@@ -0,0 +1,127 @@
+import math
+import time
+from array import array
+from bisect import bisect_left
+
+
+def ngrams(text: str, n: int = 3) -> set[str]:
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class NGramIndex:
+    """Inverted trigram index over one text field of the catalogue.
+
+    Answers ``query.lower() in value.lower()`` for every indexed value by
+    intersecting the posting lists of the query's trigrams and verifying the
+    few surviving candidates. Identical values share one entry, so fields
+    like category and author only hold as many postings as distinct names.
+    Results are catalogue positions in ascending (catalogue) order.
+
+    ``similar`` reuses the same postings for typo-tolerant matching.
+    """
+
+    def __init__(self, n: int = 3):
+        self._n = n
+        self._value_ids = {}
+        self._values = []
+        self._positions = []
+        self._postings = {}
+        self._gram_counts = array('H')
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def add(self, position: int, text: str):
+        key = text.lower()
+        value_id = self._value_ids.get(key)
+        if value_id is None:
+            value_id = len(self._values)
+            self._value_ids[key] = value_id
+            self._values.append(key)
+            self._positions.append(array('I'))
+            grams = ngrams(key, self._n)
+            self._gram_counts.append(min(len(grams), 0xFFFF))
+            for gram in grams:
+                postings = self._postings.get(gram)
+                if postings is None:
+                    postings = self._postings[gram] = array('I')
+                postings.append(value_id)
+        self._positions[value_id].append(position)
+
+    def matching_values(self, query: str) -> list[int]:
+        query = query.lower()
+        if len(query) < self._n:
+            # Too short to have a trigram: check each distinct value.
+            return [value_id for value_id, value in enumerate(self._values) if query in value]
+
+        posting_lists = []
+        for gram in ngrams(query, self._n):
+            postings = self._postings.get(gram)
+            if postings is None:
+                return []
+            posting_lists.append(postings)
+        posting_lists.sort(key=len)
+
+        candidates = set(posting_lists[0])
+        for postings in posting_lists[1:]:
+            candidates.intersection_update(postings)
+            if not candidates:
+                return []
+        return sorted(value_id for value_id in candidates if query in self._values[value_id])
+
+    def search(self, query: str) -> list[int]:
+        value_ids = self.matching_values(query)
+        if len(value_ids) == 1:
+            return list(self._positions[value_ids[0]])
+        positions = []
+        for value_id in value_ids:
+            positions.extend(self._positions[value_id])
+        positions.sort()
+        return positions
+
+    def value_positions(self, value_id: int):
+        return self._positions[value_id]
+
+    def similar(self, query: str, threshold: float = 0.6, budget: float | None = None) -> list[tuple[int, float]]:
+        """``(value_id, score)`` of values containing at least ``threshold`` of
+        the query's trigrams, best first.
+
+        The score is the fraction of query trigrams found in the value; ties
+        are ranked by trigram Jaccard similarity. A value sharing ``m`` of the
+        query's ``q`` trigrams must contain one of its ``q - m + 1`` rarest
+        ones, so only those posting lists are expanded into candidates, and
+        the rest are probed by bisection. Candidates hitting most rare
+        trigrams are verified first; with a ``budget`` (seconds) verification
+        stops when it runs out and the best matches found so far are returned.
+        """
+        query = query.lower()
+        grams = ngrams(query, self._n)
+        if not grams:
+            return [(value_id, 1.0) for value_id in self.matching_values(query)]
+
+        posting_lists = sorted((self._postings.get(gram, ()) for gram in grams), key=len)
+        required = max(1, math.ceil(threshold * len(grams)))
+        prefix = len(grams) - required + 1
+        hits = {}
+        for postings in posting_lists[:prefix]:
+            for value_id in postings:
+                hits[value_id] = hits.get(value_id, 0) + 1
+        rest = posting_lists[prefix:]
+
+        deadline = None if budget is None else time.perf_counter() + budget
+        scored = []
+        candidates = sorted(hits.items(), key=lambda item: -item[1])
+        for i, (value_id, shared) in enumerate(candidates):
+            if deadline is not None and i % 256 == 0 and i and time.perf_counter() > deadline:
+                break
+            if shared + len(rest) < required:
+                continue
+            for postings in rest:
+                j = bisect_left(postings, value_id)
+                if j < len(postings) and postings[j] == value_id:
+                    shared += 1
+            if shared >= required:
+                union = len(grams) + self._gram_counts[value_id] - shared
+                scored.append((-shared / len(grams), -shared / union, value_id))
+        scored.sort()
+        return [(value_id, -coverage) for coverage, _, value_id in scored]
@@ -0,0 +1,74 @@
+from bisect import bisect_left, bisect_right, insort
+
+from recipe.domainmodel.recipe import Recipe
+
+
+def _optional(value):
+    # None sorts before every real value (so it comes last when descending).
+    return (0, 0) if value is None else (1, value)
+
+
+def _health_rating(recipe: Recipe):
+    return _optional(recipe.nutrition.health_rating if recipe.nutrition is not None else None)
+
+
+SORT_KEYS = {
+    'name': lambda recipe: recipe.name.lower(),
+    'cook_time': lambda recipe: recipe.cook_time,
+    'prep_time': lambda recipe: recipe.preparation_time,
+    'date': lambda recipe: recipe.date,
+    'rating': lambda recipe: _optional(recipe.rating),
+    'health_rating': _health_rating,
+}
+
+
+class SortedOrder:
+    """Catalogue positions kept sorted by one of ``SORT_KEYS``.
+
+    Entries are ``(key, recipe_id, position)`` tuples, so ties are broken by
+    recipe id. Single inserts go in by bisection; bulk loads append and sort
+    once at the end.
+    """
+
+    def __init__(self, sort_key: str):
+        self.sort_key = sort_key
+        self._entries = []
+        self._unsorted = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def entry_for(self, recipe: Recipe, position: int) -> tuple:
+        return SORT_KEYS[self.sort_key](recipe), recipe.id, position
+
+    def insert(self, position: int, recipe: Recipe):
+        entry = self.entry_for(recipe, position)
+        if not self._entries or entry >= self._entries[-1]:
+            self._entries.append(entry)
+        else:
+            insort(self._entries, entry)
+
+    def append(self, position: int, recipe: Recipe):
+        self._entries.append(self.entry_for(recipe, position))
+        self._unsorted = True
+
+    def sort(self):
+        if self._unsorted:
+            self._entries.sort()
+            self._unsorted = False
+
+    def entries(self, offset: int, limit: int, descending: bool = False) -> list[tuple]:
+        if descending:
+            end = max(len(self._entries) - offset, 0)
+            return self._entries[max(end - limit, 0):end][::-1]
+        return self._entries[offset:offset + limit]
+
+    def page(self, offset: int, limit: int, descending: bool = False) -> list[int]:
+        return [entry[2] for entry in self.entries(offset, limit, descending)]
+
+    def offset_after(self, key, recipe_id: int, descending: bool = False) -> int:
+        """Number of entries that come at or before ``(key, recipe_id)`` in
+        the given direction, i.e. the offset of the page following it."""
+        if descending:
+            return len(self._entries) - bisect_left(self._entries, (key, recipe_id))
+        return bisect_right(self._entries, (key, recipe_id, float('inf')))
@@ -0,0 +1,813 @@
+import json
+import logging
+import math
+import os
+import pickle
+import random
+import sqlite3
+import threading
+import time
+import weakref
+from bisect import bisect_left, bisect_right
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+
+from recipe.adapters.cursor import Page, decode_cursor, encode_cursor
+from recipe.adapters.datareader import snapshot
+from recipe.adapters.datareader.csvdatareader import CSVDataReader
+from recipe.adapters.facet_index import FACETS
+from recipe.adapters.ingredient_index import normalise_ingredient, parse_ingredient_query
+from recipe.adapters.memory_repo import (DEFAULT_CSV_PATH, MemoryRepository, NameNotUniqueException, PantryMatch,
+                                         ReviewPage)
+from recipe.adapters.nutrition_index import NUTRIENTS, nutrient_value
+from recipe.adapters.prefix_index import MAX_SUGGESTIONS, MEMO_PREFIX_LENGTH
+from recipe.adapters.result_cache import ResultCache
+from recipe.adapters.search_index import ngrams
+from recipe.adapters.sorted_index import SORT_KEYS
+from recipe.domainmodel.author import Author
+from recipe.domainmodel.category import Category
+from recipe.domainmodel.favourite import Favourite
+from recipe.domainmodel.nutrition import Nutrition
+from recipe.domainmodel.nutrition_table import NUTRIENT_COLUMNS
+from recipe.domainmodel.recipe import Recipe
+from recipe.domainmodel.review import Review
+from recipe.domainmodel.user import User
+
+logger = logging.getLogger(__name__)
+
+# Bump when the catalogue tables change; the catalogue is then reloaded from
+# the CSV (users, reviews and favourites are kept).
+SCHEMA_VERSION = 2
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value);
+CREATE TABLE IF NOT EXISTS recipes (
+    position INTEGER PRIMARY KEY,
+    id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    name_key TEXT NOT NULL,
+    category TEXT,
+    category_key TEXT,
+    author TEXT NOT NULL,
+    author_key TEXT NOT NULL,
+    cook_time INTEGER,
+    prep_time INTEGER,
+    created TEXT,
+    rating REAL,
+    cook_time_bucket TEXT,
+    health_facet TEXT,
+    ingredient_count INTEGER NOT NULL,
+    {', '.join(f'{name} REAL' for name in NUTRIENTS)},
+    payload BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ingredients (
+    ingredient TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (ingredient, position)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS suggestions (
+    criteria TEXT NOT NULL,
+    key TEXT NOT NULL,
+    display TEXT NOT NULL,
+    recipes INTEGER NOT NULL,
+    rating REAL NOT NULL,
+    PRIMARY KEY (criteria, key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS facet_values (
+    facet TEXT NOT NULL,
+    value TEXT NOT NULL,
+    recipes INTEGER NOT NULL,
+    PRIMARY KEY (facet, value)
+) WITHOUT ROWID;
+CREATE VIRTUAL TABLE IF NOT EXISTS recipe_text USING fts5(
+    name, category, author, content='recipes', content_rowid='position', tokenize='trigram');
+CREATE VIRTUAL TABLE IF NOT EXISTS recipe_text_vocab USING fts5vocab(recipe_text, 'col');
+CREATE TABLE IF NOT EXISTS users (
+    seq INTEGER PRIMARY KEY,
+    username TEXT NOT NULL UNIQUE,
+    password TEXT,
+    user_id INTEGER
+);
+CREATE TABLE IF NOT EXISTS reviews (
+    seq INTEGER PRIMARY KEY,
+    review_id INTEGER,
+    user_name,
+    user_is_object INTEGER NOT NULL,
+    recipe_id INTEGER,
+    rating REAL,
+    review_text TEXT,
+    submitted TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reviews_by_recipe ON reviews (recipe_id, submitted DESC, seq);
+CREATE TABLE IF NOT EXISTS favourites (
+    seq INTEGER PRIMARY KEY,
+    favourite_id INTEGER,
+    user_name,
+    user_is_object INTEGER NOT NULL,
+    recipe_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS favourites_by_user ON favourites (user_name, seq);
+"""
+
+# Built after a bulk load rather than maintained row by row during it.
+_CATALOGUE_INDEXES = {
+    'recipes_by_id': 'recipes (id)',
+    'recipes_by_category': 'recipes (category)',
+    'recipes_by_author': 'recipes (author)',
+    'recipes_by_name': 'recipes (name_key, id)',
+    'recipes_by_cook_time': 'recipes (cook_time, id)',
+    'recipes_by_prep_time': 'recipes (prep_time, id)',
+    'recipes_by_date': 'recipes (created, id)',
+    'recipes_by_rating': 'recipes (rating, id)',
+    'recipes_by_health_rating': 'recipes (health_rating, id)',
+}
+_CATALOGUE_TABLES = ('recipe_text_vocab', 'recipe_text', 'recipes', 'ingredients', 'suggestions', 'facet_values')
+
+# SORT_KEYS -> column. Unrated recipes hold NULL, which SQLite orders first
+# like sorted_index's (0, 0) key does.
+SORT_COLUMNS = {
+    'name': 'name_key',
+    'cook_time': 'cook_time',
+    'prep_time': 'prep_time',
+    'date': 'created',
+    'rating': 'rating',
+    'health_rating': 'health_rating',
+}
+_OPTIONAL_SORTS = ('rating', 'health_rating')
+# Stands in for NULL when comparing against a cursor.
+_NULL_KEY = -1e308
+
+FACET_COLUMNS = {
+    'category': 'category',
+    'author': 'author',
+    'cook_time': 'cook_time_bucket',
+    'health_rating': 'health_facet',
+}
+
+_FILTER_OPS = ('<', '<=', '>', '>=', '=')
+_LOAD_BATCH = 1000
+
+
+class _ThreadConnection:
+    """A thread's connection, closed as soon as the thread exits and its
+    thread-local storage is dropped (rather than whenever a GC pass finds
+    the connection)."""
+
+    __slots__ = ('connection', '__weakref__')
+
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+
+    def __del__(self):
+        self.connection.close()
+
+
+def _timestamp(value: datetime) -> str:
+    # Fixed width, so the text sorts like the datetimes.
+    return value.isoformat(sep=' ', timespec='microseconds')
+
+
+def _cursor_value(sort: str, key):
+    """SQL value of a ``SORT_KEYS`` key taken from a cursor."""
+    if sort in _OPTIONAL_SORTS:
+        present, value = key
+        return value if present else _NULL_KEY
+    if sort == 'date':
+        return _timestamp(key)
+    return key
+
+
+def _fts_phrase(text: str) -> str:
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _ingredient_sql(clauses) -> tuple[str, list]:
+    """Positions matching a ``parse_ingredient_query`` result."""
+    selects, params = [], []
+    for required, excluded in clauses:
+        parts = ['SELECT position FROM ingredients WHERE ingredient = ?'] * len(required) \
+            or ['SELECT position FROM recipes']
+        sql = ' INTERSECT '.join(parts)
+        if excluded:
+            sql += ''.join(' EXCEPT SELECT position FROM ingredients WHERE ingredient = ?' for _ in excluded)
+        selects.append(f'SELECT position FROM ({sql})')
+        params.extend(required)
+        params.extend(excluded)
+    if not selects:
+        return 'SELECT position FROM recipes WHERE 0', []
+    return ' UNION '.join(selects), params
+
+
+class SQLiteRepository:
+    """The MemoryRepository interface over an on-disk SQLite database.
+
+    ``read_all_recipes`` bulk loads recipes.csv into it once (it is reloaded
+    only when the CSV changes). Searches are SQL over indexed columns: a
+    trigram FTS5 table narrows name, category and author substring matches,
+    an ``(ingredient, position)`` table answers ingredient queries, and the
+    browse orderings each have an index. Users, reviews and favourites are
+    tables too, so they persist and every worker process sees them.
+
+    Only an LRU of ``cache_size`` materialised recipes and a few cached
+    rankings live in memory. Each thread (and forked process) gets its own
+    connection; the database runs in WAL mode so readers never wait for a
+    writer.
+    """
+
+    SORT_KEYS = MemoryRepository.SORT_KEYS
+    SEARCH_CRITERIA = MemoryRepository.SEARCH_CRITERIA
+    FUZZY_CRITERIA = MemoryRepository.FUZZY_CRITERIA
+    FUZZY_THRESHOLD = MemoryRepository.FUZZY_THRESHOLD
+    FUZZY_BUDGET = MemoryRepository.FUZZY_BUDGET
+
+    def __init__(self, csv_path=DEFAULT_CSV_PATH, path=None, cache_size: int = 1024,
+                 search_cache_size: int = 256, search_cache_ttl: float | None = None):
+        if path is None:
+            if csv_path is None:
+                raise ValueError("path is required when there is no csv_path")
+            path = f"{csv_path}.sqlite3"
+        self.path = os.fspath(path)
+        self._cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_version = None
+        self._search_cache = ResultCache(search_cache_size, search_cache_ttl)
+        # (catalogue version, every facet's values by descending count)
+        self._all_facet_counts = (None, None)
+        self._authors = {}
+        self._categories = {}
+        # Each thread's connection lives in its thread-local and is closed
+        # when the thread exits; _connections only tracks them for close().
+        self._local = threading.local()
+        self._connections = weakref.WeakSet()
+        self._connections_lock = threading.Lock()
+        self._pid = os.getpid()
+        self._inherited = []
+        self._create_schema()
+        if csv_path is not None:
+            self.read_all_recipes(csv_path)
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._pid != os.getpid():
+            self._after_fork()
+        holder = getattr(self._local, 'holder', None)
+        if holder is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            holder = self._local.holder = _ThreadConnection(connection)
+            with self._connections_lock:
+                self._connections.add(holder)
+        return holder.connection
+
+    def _after_fork(self):
+        with self._connections_lock:
+            if self._pid == os.getpid():
+                return
+            # Connections opened before fork() must be neither used nor
+            # closed in the child; keep them referenced so they never are.
+            self._inherited.extend(self._connections)
+            self._connections = weakref.WeakSet()
+            self._local = threading.local()
+            self._pid = os.getpid()
+
+    def close(self):
+        """Close the connections of every thread in this process."""
+        if self._pid != os.getpid():
+            self._after_fork()
+        with self._connections_lock:
+            for holder in list(self._connections):
+                holder.connection.close()
+            self._connections = weakref.WeakSet()
+        self._local = threading.local()
+
+    @contextmanager
+    def _transaction(self):
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield connection
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+
+    def _meta(self, connection, key: str):
+        row = connection.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def _set_meta(self, connection, key: str, value):
+        connection.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+    def _create_schema(self):
+        with self._transaction() as connection:
+            tables = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            if 'meta' in tables and self._meta(connection, 'schema_version') != SCHEMA_VERSION:
+                for table in _CATALOGUE_TABLES:
+                    connection.execute(f'DROP TABLE IF EXISTS {table}')
+                connection.execute("DELETE FROM meta WHERE key = 'fingerprint'")
+            for statement in _SCHEMA.split(';'):
+                if statement.strip():
+                    connection.execute(statement)
+            for name, columns in _CATALOGUE_INDEXES.items():
+                connection.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {columns}')
+            self._set_meta(connection, 'schema_version', SCHEMA_VERSION)
+            if self._meta(connection, 'catalogue_version') is None:
+                self._set_meta(connection, 'catalogue_version', 0)
+
+    def _catalogue_version(self) -> int:
+        return self._meta(self._connection(), 'catalogue_version')
+
+    def _bump_catalogue_version(self, connection):
+        connection.execute("UPDATE meta SET value = value + 1 WHERE key = 'catalogue_version'")
+
+    def _recipe_row(self, position: int, recipe: Recipe) -> tuple:
+        category = recipe.category.name if recipe.category is not None else None
+        ingredients = list(recipe.ingredients)
+        nutrition = recipe.nutrition
+        payload = (
+            recipe.id, recipe.name, recipe.author.id, recipe.author.name, category, recipe.cook_time,
+            recipe.preparation_time, recipe.date, recipe.description, list(recipe.images),
+            list(recipe.ingredient_quantities), ingredients,
+            None if nutrition is None else tuple(getattr(nutrition, name) for name in NUTRIENT_COLUMNS),
+            recipe.servings, recipe.recipe_yield, list(recipe.instructions), recipe.rating,
+        )
+        return (
+            position, recipe.id, recipe.name, recipe.name.lower(), category,
+            category.lower() if category is not None else None, recipe.author.name, recipe.author.name.lower(),
+            recipe.cook_time, recipe.preparation_time, _timestamp(recipe.date), recipe.rating,
+            FACETS['cook_time'](recipe), FACETS['health_rating'](recipe),
+            len(set(map(normalise_ingredient, ingredients))),
+            *(nutrient_value(nutrition, name) for name in NUTRIENTS),
+            pickle.dumps(payload, pickle.HIGHEST_PROTOCOL),
+        )
+
+    def _insert_recipes(self, connection, rows: list[tuple], recipes: list[Recipe]):
+        placeholders = ', '.join('?' * len(rows[0]))
+        connection.executemany(f'INSERT INTO recipes VALUES ({placeholders})', rows)
+        connection.executemany('INSERT OR IGNORE INTO ingredients (ingredient, position) VALUES (?, ?)',
+                               [(ingredient, row[0]) for row, recipe in zip(rows, recipes)
+                                for ingredient in set(map(normalise_ingredient, recipe.ingredients))])
+        suggestions = []
+        for recipe in recipes:
+            values = [('name', recipe.name), ('author', recipe.author.name)]
+            if recipe.category is not None:
+                values.append(('category', recipe.category.name))
+            values.extend(('ingredient', ingredient)
+                          for ingredient in set(map(normalise_ingredient, recipe.ingredients)))
+            for criteria, value in values:
+                value = value.strip()
+                if value:
+                    rating = -1 if recipe.rating is None else recipe.rating
+                    suggestions.append((criteria, value.lower(), value, rating))
+        connection.executemany(
+            'INSERT INTO suggestions (criteria, key, display, recipes, rating) VALUES (?, ?, ?, 1, ?) '
+            'ON CONFLICT (criteria, key) DO UPDATE SET recipes = recipes + 1, rating = max(rating, excluded.rating)',
+            suggestions)
+        # Unfiltered facet counts, so browsing the whole catalogue does not
+        # group every recipe on each request.
+        facet_values = Counter((name, value) for recipe in recipes for name, facet in FACETS.items()
+                               if (value := facet(recipe)) is not None)
+        connection.executemany(
+            'INSERT INTO facet_values (facet, value, recipes) VALUES (?, ?, ?) '
+            'ON CONFLICT (facet, value) DO UPDATE SET recipes = recipes + excluded.recipes',
+            [(name, value, count) for (name, value), count in facet_values.items()])
+
+    def read_all_recipes(self, csv_path : str, use_snapshot: bool = True, workers: int = 1):
+        """Bulk load ``csv_path``, unless the database already holds this
+        exact file (``use_snapshot``). ``workers`` is accepted for interface
+        compatibility; the load streams the CSV in one pass."""
+        with self._transaction() as connection:
+            fingerprint = self._meta(connection, 'fingerprint')
+            if use_snapshot and fingerprint is not None and snapshot.is_fresh(pickle.loads(fingerprint), csv_path):
+                return
+            for table in ('recipes', 'ingredients', 'suggestions', 'facet_values'):
+                connection.execute(f'DELETE FROM {table}')
+            for name in _CATALOGUE_INDEXES:
+                connection.execute(f'DROP INDEX IF EXISTS {name}')
+            position = 0
+            for recipes in CSVDataReader(csv_path).iter_recipes(batch_size=_LOAD_BATCH):
+                rows = [self._recipe_row(position + i, recipe) for i, recipe in enumerate(recipes)]
+                self._insert_recipes(connection, rows, recipes)
+                position += len(recipes)
+            for name, columns in _CATALOGUE_INDEXES.items():
+                connection.execute(f'CREATE INDEX {name} ON {columns}')
+            connection.execute("INSERT INTO recipe_text (recipe_text) VALUES ('rebuild')")
+            connection.execute('ANALYZE')
+            self._set_meta(connection, 'fingerprint', pickle.dumps(snapshot.csv_fingerprint(csv_path)))
+            self._bump_catalogue_version(connection)
+
+    def add_recipe(self, recipe : Recipe):
+        with self._transaction() as connection:
+            position = connection.execute('SELECT ifnull(max(position) + 1, 0) FROM recipes').fetchone()[0]
+            row = self._recipe_row(position, recipe)
+            self._insert_recipes(connection, [row], [recipe])
+            connection.execute('INSERT INTO recipe_text (rowid, name, category, author) VALUES (?, ?, ?, ?)',
+                               (position, row[2], row[4], row[6]))
+            self._bump_catalogue_version(connection)
+
+    def _materialise(self, payload: bytes) -> Recipe:
+        (recipe_id, name, author_id, author_name, category_name, cook_time, preparation_time, created_date,
+         description, images, ingredient_quantities, ingredients, nutrition, servings, recipe_yield,
+         instructions, rating) = pickle.loads(payload)
+        author = self._authors.get(author_id)
+        if author is None:
+            author = self._authors.setdefault(author_id, Author(author_id, author_name))
+        category = None
+        if category_name is not None:
+            category = self._categories.get(category_name)
+            if category is None:
+                category = self._categories.setdefault(category_name, Category(category_name))
+        return Recipe(recipe_id, name, author, cook_time=cook_time, preparation_time=preparation_time,
+                      created_date=created_date, description=description, images=images, category=category,
+                      ingredient_quantities=ingredient_quantities, ingredients=ingredients, rating=rating,
+                      nutrition=None if nutrition is None else Nutrition(recipe_id, *nutrition),
+                      servings=servings, recipe_yield=recipe_yield, instructions=instructions)
+
+    def _recipes_at(self, positions, cache: bool = True) -> list[Recipe]:
+        positions = list(positions)
+        version = self._catalogue_version()
+        found, missing = {}, []
+        with self._cache_lock:
+            if version != self._cache_version:
+                self._cache.clear()
+                self._cache_version = version
+            for position in positions:
+                recipe = self._cache.get(position)
+                if recipe is None:
+                    missing.append(position)
+                else:
+                    self._cache.move_to_end(position)
+                    found[position] = recipe
+        if missing:
+            rows = self._connection().execute(
+                'SELECT position, payload FROM recipes WHERE position IN (SELECT value FROM json_each(?))',
+                (json.dumps(missing),))
+            loaded = {position: self._materialise(payload) for position, payload in rows}
+            found.update(loaded)
+            if cache:
+                with self._cache_lock:
+                    self._cache.update(loaded)
+                    while len(self._cache) > self._cache_size:
+                        self._cache.popitem(last=False)
+        return [found[position] for position in positions if position in found]
+
+    def get_recipe(self, recipe_id : int):
+        row = self._connection().execute(
+            'SELECT position FROM recipes WHERE id = ? ORDER BY position LIMIT 1', (recipe_id,)).fetchone()
+        return None if row is None else self._recipes_at([row[0]])[0]
+
+    def get_all_recipes(self):
+        # Full scans bypass the LRU so they do not evict the hot set.
+        rows = self._connection().execute('SELECT payload FROM recipes ORDER BY position')
+        return [self._materialise(payload) for payload, in rows]
+
+    def count_recipes(self) -> int:
+        return self._connection().execute('SELECT ifnull(max(position) + 1, 0) FROM recipes').fetchone()[0]
+
+    def get_random_recipes(self, k: int):
+        count = self.count_recipes()
+        return self._recipes_at(random.sample(range(count), k=min(k, count)))
+
+    def _where(self, criteria: str | None, query: str, filters: tuple = (), facets: tuple = ()) -> tuple[str, list]:
+        """SQL condition on ``recipes`` (and its parameters) matching what
+        MemoryRepository._cached_search would for the same arguments."""
+        conditions, params = [], []
+        if criteria in ('name', 'category', 'author'):
+            key = query.lower()
+            if len(key) >= 3:
+                conditions.append('position IN (SELECT rowid FROM recipe_text WHERE recipe_text MATCH ?)')
+                params.append(f'{criteria} : {_fts_phrase(key)}')
+            # Checks the FTS candidates with the same case folding as
+            # NGramIndex (and scans for queries shorter than a trigram).
+            conditions.append(f'instr({criteria}_key, ?) > 0')
+            params.append(key)
+        elif criteria == 'ingredient':
+            sql, ingredient_params = _ingredient_sql(parse_ingredient_query(query))
+            conditions.append(f'position IN ({sql})')
+            params.extend(ingredient_params)
+        elif criteria is not None:
+            conditions.append('0')
+        by_facet = {}
+        for name, value in facets:
+            by_facet.setdefault(FACET_COLUMNS[name], []).append(value)
+        for column, values in by_facet.items():
+            conditions.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+        for name, op, value in filters:
+            if name not in NUTRIENTS or op not in _FILTER_OPS:
+                raise ValueError(f"Invalid nutrition filter: {name}{op}{value}")
+            conditions.append(f'{name} {op} ?')
+            params.append(value)
+        return ' AND '.join(conditions) or '1', params
+
+    def _similar_positions(self, criteria: str, query: str) -> list[int]:
+        """Positions of recipes whose ``criteria`` field resembles ``query``,
+        most similar first (ties in catalogue order), as NGramIndex.similar
+        ranks them. Candidates come from the FTS table: only values holding
+        one of the query's ``q - m + 1`` rarest trigrams can reach the
+        threshold."""
+        query = query.lower()
+        cache_key = ('similar', criteria, query)
+        version = self._catalogue_version()
+        ranked = self._search_cache.get(cache_key, version)
+        if ranked is not None:
+            return ranked
+        connection = self._connection()
+        grams = ngrams(query)
+        values = {}
+        if not grams:
+            rows = connection.execute(
+                f'SELECT position, {criteria}_key FROM recipes WHERE instr({criteria}_key, ?) > 0 ORDER BY position',
+                (query,))
+            for position, value in rows:
+                values.setdefault(value, []).append(position)
+            ranked = [position for positions in values.values() for position in positions]
+            self._search_cache.put(cache_key, version, ranked)
+            return ranked
+
+        frequency = dict.fromkeys(grams, 0)
+        rows = connection.execute(
+            f"SELECT term, doc FROM recipe_text_vocab WHERE col = ? AND term IN ({', '.join('?' * len(grams))})",
+            (criteria, *grams))
+        frequency.update(rows)
+        required = max(1, math.ceil(self.FUZZY_THRESHOLD * len(grams)))
+        rare = sorted(grams, key=lambda gram: (frequency[gram], gram))[:len(grams) - required + 1]
+        rare = [gram for gram in rare if frequency[gram]]
+        if rare:
+            match = f"{criteria} : ({' OR '.join(map(_fts_phrase, rare))})"
+            rows = connection.execute(
+                f'SELECT position, {criteria}_key FROM recipes '
+                f'WHERE position IN (SELECT rowid FROM recipe_text WHERE recipe_text MATCH ?) ORDER BY position',
+                (match,))
+            for position, value in rows:
+                values.setdefault(value, []).append(position)
+
+        deadline = None if self.FUZZY_BUDGET is None else time.perf_counter() + self.FUZZY_BUDGET
+        scored = []
+        for i, (value, positions) in enumerate(values.items()):
+            if deadline is not None and i % 256 == 0 and i and time.perf_counter() > deadline:
+                break
+            value_grams = ngrams(value)
+            shared = len(grams & value_grams)
+            if shared >= required:
+                union = len(grams | value_grams)
+                scored.append((-shared / len(grams), -shared / union, positions[0], positions))
+        scored.sort(key=lambda entry: entry[:3])
+        ranked = [position for *_, positions in scored for position in positions]
+        self._search_cache.put(cache_key, version, ranked)
+        return ranked
+
+    def _ordered(self, where: str, params: list, ordering: str, sort: str | None, offset: int, limit: int,
+                 after: str | None, descending: bool) -> Page:
+        connection = self._connection()
+        if where == '1':
+            total = self.count_recipes()
+        else:
+            total = connection.execute(f'SELECT COUNT(*) FROM recipes WHERE {where}', params).fetchone()[0]
+        direction = 'DESC' if descending else 'ASC'
+        comparison = '>=' if descending else '<='
+        if sort is None:
+            order_by = f'position {direction}'
+            cursor_sql = f'position {comparison} ?'
+        else:
+            column = SORT_COLUMNS[sort]
+            order_by = f'{column} {direction}, id {direction}, position {direction}'
+            cursor_sql = f'(ifnull({column}, {_NULL_KEY}), id) {comparison} (?, ?)'
+        if after is not None:
+            key, recipe_id = decode_cursor(after, ordering)
+            try:
+                cursor_params = [key] if sort is None else [_cursor_value(sort, key), recipe_id]
+            except (TypeError, ValueError, AttributeError) as e:
+                raise ValueError(f"Invalid cursor: {after!r}") from e
+            offset = connection.execute(f'SELECT COUNT(*) FROM recipes WHERE {where} AND {cursor_sql}',
+                                        params + cursor_params).fetchone()[0]
+        rows = connection.execute(f'SELECT position FROM recipes WHERE {where} ORDER BY {order_by} LIMIT ? OFFSET ?',
+                                  params + [limit, offset])
+        positions = [position for position, in rows]
+        recipes = self._recipes_at(positions)
+        next_cursor = None
+        if recipes and offset + len(recipes) < total:
+            last = recipes[-1]
+            if sort is None:
+                next_cursor = encode_cursor(ordering, positions[-1], last.id)
+            else:
+                next_cursor = encode_cursor(ordering, SORT_KEYS[sort](last), last.id)
+        return Page(recipes, total, offset, next_cursor)
+
+    def get_recipes_page(self, sort: str = 'name', offset: int = 0, limit: int = 10,
+                         descending: bool = False, after: str | None = None) -> Page:
+        """One page of the catalogue in ``sort`` order (one of ``SORT_KEYS``)."""
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort}")
+        return self._ordered('1', [], sort, sort, offset, limit, after, descending)
+
+    def search_cache_stats(self) -> dict:
+        return self._search_cache.stats()
+
+    def search_recipes(self, criteria: str | None, query: str, offset: int = 0, limit: int = 10,
+                       after: str | None = None, sort: str | None = None, descending: bool = False,
+                       filters: tuple = (), facets: tuple = (), fuzzy: bool = False) -> Page:
+        """Same results and cursors as MemoryRepository.search_recipes."""
+        if sort is not None and sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort}")
+        if fuzzy and criteria not in self.FUZZY_CRITERIA:
+            raise ValueError(f"Fuzzy search is not supported for: {criteria}")
+        ordering = ('fuzzy' if fuzzy else 'search') if sort is None else f'search:{sort}'
+        if not fuzzy:
+            where, params = self._where(criteria, query, filters, facets)
+            return self._ordered(where, params, ordering, sort, offset, limit, after, descending)
+
+        ranked = self._similar_positions(criteria, query)
+        where, params = self._where(None, '', filters, facets)
+        where = f'position IN (SELECT value FROM json_each(?)) AND {where}'
+        params = [json.dumps(ranked)] + params
+        if sort is not None:
+            return self._ordered(where, params, ordering, sort, offset, limit, after, descending)
+        kept = {position for position, in self._connection().execute(
+            f'SELECT position FROM recipes WHERE {where}', params)}
+        positions = [position for position in ranked if position in kept]
+        if after is not None:
+            rank, _ = decode_cursor(after, ordering)
+            if not isinstance(rank, int):
+                raise ValueError(f"Invalid cursor: {after!r}")
+            ranks = range(len(positions))
+            offset = len(ranks) - bisect_left(ranks, rank) if descending else bisect_right(ranks, rank)
+        if descending:
+            indices = range(len(positions) - 1 - offset, max(len(positions) - 1 - offset - limit, -1), -1)
+        else:
+            indices = range(offset, min(offset + limit, len(positions)))
+        recipes = self._recipes_at(positions[i] for i in indices)
+        next_cursor = None
+        if indices and offset + len(indices) < len(positions):
+            next_cursor = encode_cursor(ordering, indices[-1], recipes[-1].id)
+        return Page(recipes, len(positions), offset, next_cursor)
+
+    def facet_counts(self, criteria: str | None = None, query: str = '', filters: tuple = (),
+                     facets: tuple = (), limit: int | None = 10,
+                     fuzzy: bool = False) -> dict[str, list[tuple[str, int]]]:
+        """Category, author, cook-time bucket and health rating counts of the
+        recipes ``search_recipes`` would return for the same arguments."""
+        if criteria is None and not filters and not facets:
+            return {name: counts[:limit] for name, counts in self._facet_counts_of_catalogue().items()}
+        if fuzzy and criteria is not None:
+            where, params = self._where(None, '', filters, facets)
+            where = f'position IN (SELECT value FROM json_each(?)) AND {where}'
+            params = [json.dumps(self._similar_positions(criteria, query))] + params
+        else:
+            where, params = self._where(criteria, query, filters, facets)
+        connection = self._connection()
+        counts = {}
+        for name in FACETS:
+            column = FACET_COLUMNS[name]
+            rows = connection.execute(
+                f'SELECT {column}, COUNT(*) AS n FROM recipes WHERE {where} AND {column} IS NOT NULL '
+                f'GROUP BY {column} ORDER BY n DESC, {column} LIMIT ?', params + [-1 if limit is None else limit])
+            counts[name] = [tuple(row) for row in rows]
+        return counts
+
+    def _facet_counts_of_catalogue(self) -> dict[str, list[tuple[str, int]]]:
+        version = self._catalogue_version()
+        cached_version, counts = self._all_facet_counts
+        if cached_version != version:
+            rows = self._connection().execute(
+                'SELECT facet, value, recipes FROM facet_values ORDER BY facet, recipes DESC, value')
+            counts = {name: [] for name in FACETS}
+            for name, value, recipes in rows:
+                counts[name].append((value, recipes))
+            self._all_facet_counts = (version, counts)
+        return counts
+
+    def suggest(self, criteria: str, prefix: str, limit: int = 10) -> list[str]:
+        """Up to ``limit`` values of ``criteria`` starting with ``prefix``,
+        those shared by most recipes (then best rated) first."""
+        if criteria not in self.SEARCH_CRITERIA:
+            raise ValueError(f"Unknown search criteria: {criteria}")
+        prefix = prefix.lstrip().lower()
+        limit = min(limit, MAX_SUGGESTIONS)
+        if not prefix or limit <= 0:
+            return []
+        # Short prefixes match large ranges; their suggestions are cached.
+        memo = len(prefix) <= MEMO_PREFIX_LENGTH
+        cache_key = ('suggest', criteria, prefix)
+        version = self._catalogue_version()
+        if memo:
+            suggestions = self._search_cache.get(cache_key, version)
+            if suggestions is not None:
+                return suggestions[:limit]
+        rows = self._connection().execute(
+            'SELECT display FROM suggestions WHERE criteria = ? AND key >= ? AND key < ? '
+            'ORDER BY recipes DESC, rating DESC, key LIMIT ?',
+            (criteria, prefix, prefix + '\uffff', MAX_SUGGESTIONS if memo else limit))
+        suggestions = [display for display, in rows]
+        if memo:
+            self._search_cache.put(cache_key, version, suggestions)
+        return suggestions[:limit]
+
+    def _find(self, criteria: str, query: str) -> list[Recipe]:
+        where, params = self._where(criteria, query)
+        rows = self._connection().execute(f'SELECT position FROM recipes WHERE {where} ORDER BY position', params)
+        return self._recipes_at([position for position, in rows], cache=False)
+
+    def find_by_name(self, query: str):
+        return self._find('name', query)
+
+    def find_by_category(self, query: str):
+        return self._find('category', query)
+
+    def find_by_author(self, query: str):
+        return self._find('author', query)
+
+    def find_by_ingredient(self, query: str):
+        """Recipes matching a boolean ingredient query such as
+        ``"eggs AND flour AND NOT milk"`` (see ``parse_ingredient_query``)."""
+        return self._find('ingredient', query)
+
+    def find_similar(self, query: str, criteria: str = 'name'):
+        """Recipes whose ``criteria`` field is a close match for ``query``
+        despite typos (``"choclate cake"``), most similar first."""
+        if criteria not in self.FUZZY_CRITERIA:
+            raise ValueError(f"Fuzzy search is not supported for: {criteria}")
+        return self._recipes_at(self._similar_positions(criteria, query), cache=False)
+
+    def find_by_pantry(self, pantry: list[str], k: int = 12) -> list[PantryMatch]:
+        """The ``k`` recipes best covered by the ingredients in ``pantry``."""
+        ingredients = sorted(set(map(normalise_ingredient, pantry)))
+        rows = self._connection().execute(
+            'SELECT position, covered, ingredient_count - covered AS missing FROM ('
+            '  SELECT position, COUNT(*) AS covered FROM ingredients'
+            f"  WHERE ingredient IN ({', '.join('?' * len(ingredients))}) GROUP BY position"
+            ') JOIN recipes USING (position) ORDER BY missing, covered DESC, position LIMIT ?',
+            (*ingredients, k)).fetchall()
+        recipes = self._recipes_at([position for position, _, _ in rows])
+        return [PantryMatch(recipe, covered, missing) for recipe, (_, covered, missing) in zip(recipes, rows)]
+
+    def add_user(self, user : User):
+        try:
+            with self._transaction() as connection:
+                connection.execute('INSERT INTO users (username, password, user_id) VALUES (?, ?, ?)',
+                                   (user.username, user.password, user.id))
+        except sqlite3.IntegrityError as e:
+            raise NameNotUniqueException(user.username) from e
+
+    def get_user(self, username: str):
+        row = self._connection().execute(
+            'SELECT username, password, user_id FROM users WHERE username = ?', (username,)).fetchone()
+        return None if row is None else User(*row)
+
+    def _user(self, name, is_object: bool):
+        # Reviews posted through the web app name their user by username.
+        if not is_object:
+            return name
+        return self.get_user(name) or User(name, None)
+
+    def add_review(self, review : Review):
+        user = review.user
+        is_object = isinstance(user, User)
+        with self._transaction() as connection:
+            connection.execute(
+                'INSERT INTO reviews (review_id, user_name, user_is_object, recipe_id, rating, review_text, submitted) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (review.id, user.username if is_object else user, is_object, review.recipe_id, review.rating,
+                 review.review_text, _timestamp(review.date_submitted)))
+
+    def count_reviews_for_recipe(self, recipe_id: int) -> int:
+        return self._connection().execute('SELECT COUNT(*) FROM reviews WHERE recipe_id = ?',
+                                          (recipe_id,)).fetchone()[0]
+
+    def _reviews(self, recipe_id: int, offset: int = 0, limit: int = -1) -> list[Review]:
+        # Newest first; equal dates in the order they were added.
+        rows = self._connection().execute(
+            'SELECT review_id, user_name, user_is_object, rating, review_text, submitted FROM reviews '
+            'WHERE recipe_id = ? ORDER BY submitted DESC, seq LIMIT ? OFFSET ?', (recipe_id, limit, offset))
+        return [Review(review_id, self._user(user_name, is_object), recipe_id, rating, review_text,
+                       datetime.fromisoformat(submitted))
+                for review_id, user_name, is_object, rating, review_text, submitted in rows]
+
+    def get_reviews_for_recipe(self, recipe_id : int):
+        return self._reviews(recipe_id)
+
+    def get_reviews_page(self, recipe_id: int, offset: int = 0, limit: int = 10) -> ReviewPage:
+        """One page of a recipe's reviews, newest first."""
+        return ReviewPage(self._reviews(recipe_id, offset, limit), self.count_reviews_for_recipe(recipe_id), offset)
+
+    def add_favourite(self, favourite : Favourite):
+        user = favourite.user
+        is_object = isinstance(user, User)
+        with self._transaction() as connection:
+            connection.execute(
+                'INSERT INTO favourites (favourite_id, user_name, user_is_object, recipe_id) VALUES (?, ?, ?, ?)',
+                (favourite.id, user.username if is_object else user, is_object, favourite.recipe.id))
+
+    def get_favourites_for_user(self, user_id : int):
+        rows = self._connection().execute(
+            'SELECT favourite_id, user_name, recipe_id FROM favourites WHERE user_is_object '
+            'AND user_name IN (SELECT username FROM users WHERE user_id IS ?) ORDER BY seq', (user_id,)).fetchall()
+        favourites = []
+        for favourite_id, user_name, recipe_id in rows:
+            recipe = self.get_recipe(recipe_id)
+            # Favourites of recipes no longer in the catalogue are dropped.
+            if recipe is not None:
+                favourites.append(Favourite(favourite_id, self._user(user_name, True), recipe))
+        return favourites
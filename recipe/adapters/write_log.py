@@ -0,0 +1,423 @@
+import fcntl
+import logging
+import os
+import pickle
+import re
+import struct
+import threading
+import uuid
+import zlib
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+LOG_NAME = 'writes.log'
+SNAPSHOT_NAME = 'writes.snapshot'
+LOCK_NAME = 'writes.lock'
+COMPACT_LOCK_NAME = 'writes.compact.lock'
+# Sealed logs waiting to be folded into the snapshot (or already folded and
+# kept a while for workers still reading them): writes.<generation>.log
+_SEGMENT = re.compile(r'writes\.(\d+)\.log$')
+
+# Bump when the record framing or the snapshot layout changes.
+WAL_VERSION = 1
+
+_MAGIC = b'RWAL'
+_HEADER = struct.Struct('<4sIQ')  # magic, version, generation
+_FRAME = struct.Struct('<II')  # payload length, crc32 of the payload
+
+
+class _Batch:
+    """Records waiting for the same write + fsync."""
+
+    __slots__ = ('chunks', 'done', 'error')
+
+    def __init__(self):
+        self.chunks = []
+        self.done = False
+        self.error = None
+
+
+class WriteAheadLog:
+    """Append-only log of repository writes under ``directory``.
+
+    Records are small picklable tuples; ``append`` returns once they are on
+    disk. Concurrent appends are group committed: one thread writes and
+    fsyncs everything queued so far while the others wait for that flush
+    instead of each paying for their own (``commit_delay`` seconds of extra
+    wait lets bigger batches form).
+
+    The history is ``writes.snapshot``, then any sealed segments
+    ``writes.<generation>.log``, then ``writes.log``. Once the log grows past
+    ``compact_bytes`` it is sealed, by renaming it to a segment and starting
+    ``writes.log`` with the next generation number. The segment is then folded
+    into a new snapshot. Only the rename holds up writers. Several processes
+    (forked gunicorn workers) may share a directory. Writes and seals hold an
+    exclusive ``flock``. ``read_new`` returns the records the other processes
+    added since the last call, so each process can apply them.
+    """
+
+    def __init__(self, directory, sync: bool = True, group_commit: bool = True,
+                 commit_delay: float = 0.0, compact_bytes: int = 64 << 20):
+        self.directory = os.fspath(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        self._log_path = os.path.join(self.directory, LOG_NAME)
+        self._snapshot_path = os.path.join(self.directory, SNAPSHOT_NAME)
+        self._lock_path = os.path.join(self.directory, LOCK_NAME)
+        self._compact_lock_path = os.path.join(self.directory, COMPACT_LOCK_NAME)
+        self._sync = sync
+        self._group_commit = group_commit
+        self._commit_delay = commit_delay
+        self._compact_bytes = compact_bytes
+        # Records tagged with any of these ids were applied by this process
+        # (or by its parent before a fork) and are skipped by read_new.
+        self._writers = set()
+        # How far into the history this process has read: a byte offset into
+        # the log (or segment) of _read_generation, and a record count.
+        self._read_generation = None
+        self._read_inode = None
+        self._offset = 0
+        self._consumed = 0
+        self._pid = None
+        self._start_process()
+        with self._file_lock, self._flock(fcntl.LOCK_EX):
+            self._recover()
+
+    def _start_process(self):
+        # Locks, flock handles and the writer id are per process; a forked
+        # child keeps the parent's read position and applied records.
+        self._pid = os.getpid()
+        self._writer = uuid.uuid4().hex
+        self._writers.add(self._writer)
+        self._lock = threading.Lock()
+        self._flushed = threading.Condition(self._lock)
+        self._pending = _Batch()
+        self._flushing = False
+        self._file_lock = threading.Lock()
+        self._compacting = False
+        self._compact_lock = threading.Lock()
+        self._lock_file = open(self._lock_path, 'a+b')
+        self._compact_lock_file = open(self._compact_lock_path, 'a+b')
+        self._file = None
+
+    def _check_fork(self):
+        if self._pid != os.getpid():
+            self._start_process()
+
+    def close(self):
+        with self._file_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._lock_file.close()
+            self._compact_lock_file.close()
+
+    @contextmanager
+    def _flock(self, mode, lock_file=None):
+        lock_file = lock_file or self._lock_file
+        fcntl.flock(lock_file, mode)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _frame(self, record) -> bytes:
+        payload = pickle.dumps((self._writer, record), pickle.HIGHEST_PROTOCOL)
+        return _FRAME.pack(len(payload), zlib.crc32(payload)) + payload
+
+    @staticmethod
+    def _payloads(data, pos: int):
+        """``(payload, end)`` for each record from ``pos`` on, stopping at the
+        first torn or corrupt one."""
+        size = len(data)
+        while pos + _FRAME.size <= size:
+            length, crc = _FRAME.unpack_from(data, pos)
+            start = pos + _FRAME.size
+            end = start + length
+            if end > size:
+                return
+            payload = data[start:end]
+            if zlib.crc32(payload) != crc:
+                return
+            yield payload, end
+            pos = end
+
+    def _load_snapshot(self, header_only: bool = False) -> tuple[int, list]:
+        """The snapshot's generation (every record of the logs before it is
+        in the snapshot) and, unless ``header_only``, those records."""
+        try:
+            with open(self._snapshot_path, 'rb') as snapshot_file:
+                header = pickle.load(snapshot_file)
+                if header.get('version') != WAL_VERSION:
+                    raise ValueError(f"unsupported write log snapshot version {header.get('version')}")
+                return header['generation'], [] if header_only else pickle.load(snapshot_file)
+        except FileNotFoundError:
+            return 0, []
+
+    @staticmethod
+    def _header_generation(log_file) -> int | None:
+        header = log_file.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            return None
+        magic, version, generation = _HEADER.unpack(header)
+        if magic != _MAGIC or version != WAL_VERSION:
+            return None
+        return generation
+
+    def _log_generation(self) -> int | None:
+        try:
+            with open(self._log_path, 'rb') as log_file:
+                return self._header_generation(log_file)
+        except FileNotFoundError:
+            return None
+
+    def _segment_path(self, generation: int) -> str:
+        return os.path.join(self.directory, f"writes.{generation}.log")
+
+    def _segment_generations(self) -> list[int]:
+        return sorted(int(match.group(1)) for match in map(_SEGMENT.match, os.listdir(self.directory)) if match)
+
+    def _sync_directory(self):
+        directory = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+
+    def _write_temporary(self, path: str, write) -> str:
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as tmp_file:
+            write(tmp_file)
+            tmp_file.flush()
+            os.fsync(tmp_file.fileno())
+        return tmp_path
+
+    def _new_log(self, generation: int):
+        tmp_path = self._write_temporary(self._log_path,
+                                         lambda f: f.write(_HEADER.pack(_MAGIC, WAL_VERSION, generation)))
+        os.replace(tmp_path, self._log_path)
+        self._sync_directory()
+
+    def _recover(self):
+        """Start a log if there is none (a seal interrupted between renaming
+        the log away and starting the next one leaves none) and cut off a
+        torn record at the end of the log."""
+        log_generation = self._log_generation()
+        if log_generation is None:
+            if os.path.exists(self._log_path):
+                raise ValueError(f"{self._log_path} is not a write-ahead log")
+            generation, _ = self._load_snapshot(header_only=True)
+            self._new_log(max([generation, *(segment + 1 for segment in self._segment_generations())]))
+            return
+        with open(self._log_path, 'r+b') as log_file:
+            data = log_file.read()
+            pos = _HEADER.size
+            for _, pos in self._payloads(data, pos):
+                pass
+            if pos < len(data):
+                logger.warning(f"Truncating {len(data) - pos} bytes of torn records from {self._log_path}")
+                log_file.truncate(pos)
+                log_file.flush()
+                os.fsync(log_file.fileno())
+
+    def _open_for_append(self):
+        # Reopen when another process compacted and replaced the log.
+        if self._file is not None and os.fstat(self._file.fileno()).st_ino == os.stat(self._log_path).st_ino:
+            return
+        if self._file is not None:
+            self._file.close()
+        self._file = open(self._log_path, 'ab', buffering=0)
+
+    def _append_locked(self, data: bytes):
+        self._open_for_append()
+        self._file.write(data)
+        if self._sync:
+            os.fsync(self._file.fileno())
+        return self._file.tell()
+
+    def _write(self, data: bytes):
+        with self._file_lock, self._flock(fcntl.LOCK_EX):
+            size = self._append_locked(data)
+        if size > self._compact_bytes and not self._compacting:
+            self._compacting = True
+            threading.Thread(target=self._compact_in_background, daemon=True).start()
+
+    def append(self, *records):
+        """Durably append ``records`` (in order, after everything appended
+        before this call returned)."""
+        self._check_fork()
+        data = b''.join(self._frame(record) for record in records)
+        if not self._group_commit:
+            self._write(data)
+            return
+        with self._lock:
+            batch = self._pending
+            batch.chunks.append(data)
+            while not batch.done:
+                if self._flushing:
+                    self._flushed.wait()
+                    continue
+                self._flushing = True
+                if self._commit_delay:
+                    # Nobody else notifies while we are the flusher, so this
+                    # just lets more appends join the batch.
+                    self._flushed.wait(self._commit_delay)
+                flushing, self._pending = self._pending, _Batch()
+                self._lock.release()
+                error = None
+                try:
+                    self._write(b''.join(flushing.chunks))
+                except Exception as e:
+                    error = e
+                finally:
+                    self._lock.acquire()
+                    flushing.done = True
+                    flushing.error = error
+                    self._flushing = False
+                    self._flushed.notify_all()
+        if batch.error is not None:
+            raise OSError(f"Could not write to {self._log_path}") from batch.error
+
+    def append_exclusive(self, prepare, *records):
+        """Durably append ``records`` with no other writer in between them and
+        the call ``prepare(new_records)`` made just before.
+
+        ``new_records`` is what ``read_new`` would return. ``prepare`` can
+        apply them and check ``records`` against the result, raising to cancel
+        the append. Used for writes that must be unique, such as usernames.
+        """
+        self._check_fork()
+        with self._file_lock, self._flock(fcntl.LOCK_EX):
+            records_read = []
+            self._read_locked(records_read)
+            prepare(records_read)
+            self._append_locked(b''.join(self._frame(record) for record in records))
+
+    def _read_records(self, data, pos: int, records: list) -> int:
+        """Append the records in ``data`` from ``pos`` on that other writers
+        added to ``records``; returns where the last complete one ends."""
+        writers = self._writers
+        for payload, pos in self._payloads(data, pos):
+            writer, record = pickle.loads(payload)
+            if writer not in writers:
+                records.append(record)
+            self._consumed += 1
+        return pos
+
+    def _catch_up(self, generation: int, records: list):
+        """Read up to the start of log ``generation``: the rest of the log we
+        were reading, now a segment, and any segments sealed after it."""
+        if self._read_generation is not None:
+            paths = [self._segment_path(sealed) for sealed in range(self._read_generation, generation)]
+            if all(os.path.exists(path) for path in paths):
+                offset = self._offset
+                for path in paths:
+                    with open(path, 'rb') as segment_file:
+                        self._read_records(segment_file.read(), offset, records)
+                    offset = _HEADER.size
+                return
+        # First read, or we fell so far behind that segments we had not read
+        # were folded into the snapshot and removed: skip the part of the
+        # snapshot already read, then read the segments not folded yet.
+        snapshot_generation, history = self._load_snapshot()
+        for writer, record in history[self._consumed:]:
+            if writer not in self._writers:
+                records.append(record)
+        self._consumed = max(self._consumed, len(history))
+        for sealed in range(snapshot_generation, generation):
+            with open(self._segment_path(sealed), 'rb') as segment_file:
+                self._read_records(segment_file.read(), _HEADER.size, records)
+
+    def read_new(self) -> list:
+        """Records in the history this process has not read yet, except the
+        ones it appended itself. The first call returns the whole history."""
+        self._check_fork()
+        try:
+            stat = os.stat(self._log_path)
+        except FileNotFoundError:
+            return []
+        if stat.st_ino == self._read_inode and stat.st_size == self._offset:
+            return []
+
+        records = []
+        with self._file_lock, self._flock(fcntl.LOCK_SH):
+            self._read_locked(records)
+        return records
+
+    def _read_locked(self, records: list):
+        with open(self._log_path, 'rb') as log_file:
+            generation = self._header_generation(log_file)
+            if generation != self._read_generation:
+                self._catch_up(generation, records)
+                self._read_generation = generation
+                self._offset = _HEADER.size
+            self._read_inode = os.fstat(log_file.fileno()).st_ino
+            log_file.seek(self._offset)
+            data = log_file.read()
+        self._offset += self._read_records(data, 0, records)
+
+    def _compact_in_background(self):
+        try:
+            self.compact(blocking=False)
+        except Exception as e:
+            logger.warning(f"Write log compaction failed: {e}")
+        finally:
+            self._compacting = False
+
+    def compact(self, blocking: bool = True):
+        """Seal the log and fold the sealed segments into a new snapshot.
+
+        Without ``blocking``, return at once if another thread or process is
+        already compacting.
+        """
+        self._check_fork()
+        if not self._compact_lock.acquire(blocking=blocking):
+            return
+        try:
+            try:
+                fcntl.flock(self._compact_lock_file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            except BlockingIOError:
+                return
+            try:
+                self._fold(self._seal())
+            finally:
+                fcntl.flock(self._compact_lock_file, fcntl.LOCK_UN)
+        finally:
+            self._compact_lock.release()
+
+    def _seal(self) -> int:
+        """Rename a non-empty log to a segment and start the next generation;
+        returns the generation of the log now being appended to."""
+        with self._file_lock, self._flock(fcntl.LOCK_EX):
+            generation = self._log_generation()
+            if os.path.getsize(self._log_path) > _HEADER.size:
+                os.replace(self._log_path, self._segment_path(generation))
+                generation += 1
+                self._new_log(generation)
+            return generation
+
+    def _fold(self, generation: int):
+        """Fold the segments before ``generation`` into the snapshot. Writers
+        and readers only wait for the final rename."""
+        snapshot_generation, history = self._load_snapshot()
+        if snapshot_generation >= generation:
+            return
+        for sealed in range(snapshot_generation, generation):
+            with open(self._segment_path(sealed), 'rb') as segment_file:
+                data = segment_file.read()
+            history.extend(pickle.loads(payload) for payload, _ in self._payloads(data, _HEADER.size))
+
+        def write_snapshot(snapshot_file):
+            header = {'version': WAL_VERSION, 'generation': generation, 'count': len(history)}
+            pickle.dump(header, snapshot_file, pickle.HIGHEST_PROTOCOL)
+            pickle.dump(history, snapshot_file, pickle.HIGHEST_PROTOCOL)
+
+        tmp_path = self._write_temporary(self._snapshot_path, write_snapshot)
+        with self._file_lock, self._flock(fcntl.LOCK_EX):
+            os.replace(tmp_path, self._snapshot_path)
+            # Segments just folded stay until the next fold, so workers that
+            # were part way through one finish it by offset.
+            for sealed in self._segment_generations():
+                if sealed < snapshot_generation:
+                    os.remove(self._segment_path(sealed))
+            self._sync_directory()
@@ -1,11 +1,8 @@
 from werkzeug.security import generate_password_hash, check_password_hash
 
-from recipe.adapters.memory_repo import MemoryRepository
+from recipe.adapters.memory_repo import MemoryRepository, NameNotUniqueException
 from recipe.domainmodel.user import User
 
-class NameNotUniqueException(Exception):
-    pass
-
 
 class UnknownUserException(Exception):
     pass
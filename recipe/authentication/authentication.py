@@ -1,5 +1,5 @@
 from flask import Blueprint, render_template, redirect, url_for, session, flash
-from recipe.adapters.memory_repo import MemoryRepository
+from recipe.adapters.repository import get_repository
 from flask_wtf import FlaskForm
 from wtforms import StringField, PasswordField, SubmitField
 from wtforms.validators import DataRequired
@@ -7,7 +7,6 @@ from functools import wraps
 import recipe.authentication.auth_services as auth_services
 
 authentication_bp = Blueprint('authentication', __name__)
-repo = MemoryRepository()
 
 
 def logout_required(view):
@@ -29,7 +28,7 @@ def register():
         user_name = form.user_name.data
         password = form.password.data
         try:
-            auth_services.add_user(user_name, password, repo)
+            auth_services.add_user(user_name, password, get_repository())
             flash('Registration successful. Please log in.', 'success')
             return redirect(url_for('authentication.login'))
         except auth_services.NameNotUniqueException:
@@ -56,7 +55,7 @@ def login():
         user_name = form.user_name.data
         password = form.password.data
         try:
-            auth_services.authenticate_user(user_name, password, repo)
+            auth_services.authenticate_user(user_name, password, get_repository())
             session.clear()
             session['user_name'] = user_name
             flash('Logged in successfully.', 'success')
@@ -1,48 +1,146 @@
-from flask import Blueprint, render_template, request
+import re
+
+import ujson
+from flask import Blueprint, Response, abort, render_template, request, url_for
 from flask_paginate import Pagination, get_page_parameter
-from recipe.adapters.memory_repo import MemoryRepository
+from recipe.adapters.facet_index import FACETS
+from recipe.adapters.nutrition_index import format_nutrition_filters, nutrition_filters_from_args
+from recipe.adapters.repository import get_repository
 
 browse_bp = Blueprint('browse', __name__)
-repo = MemoryRepository()
+
+PER_PAGE = 10
+AUTOCOMPLETE_LIMIT = 8
+
+FACET_LABELS = {'category': 'Category', 'author': 'Author', 'cook_time': 'Cook time',
+                'health_rating': 'Health rating'}
+
+
+def _pagination(result, per_page):
+    pagination = Pagination(page=result.offset // per_page + 1, total=result.total, per_page=per_page,
+                            css_framework='bootstrap5')
+    # Numbered links jump by offset, so they must not carry the cursor along.
+    pagination.args.pop('after', None)
+    return pagination
+
+
+def _nutrition_filters():
+    return nutrition_filters_from_args(request.args)
+
+
+def _facet_selections():
+    return tuple(sorted({(name, value) for name in FACETS for value in request.args.getlist(f'facet_{name}')}))
+
+
+def _url_with(**changes):
+    """The current URL with ``changes`` applied to its arguments (None
+    removes one). Paging state is dropped unless it is one of the changes."""
+    args = request.args.to_dict(flat=False)
+    args.pop(get_page_parameter(), None)
+    args.pop('after', None)
+    for key, value in changes.items():
+        if value is None:
+            args.pop(key, None)
+        else:
+            args[key] = value
+    return url_for(request.endpoint, **args)
+
+
+def _facet_url(name, value):
+    """Toggle drilling down into ``value`` of facet ``name``."""
+    key = f'facet_{name}'
+    values = request.args.getlist(key)
+    values = [v for v in values if v != value] if value in values else values + [value]
+    return _url_with(**{key: values or None})
+
+
+def _facet_context(facet_counts, selections):
+    return dict(facet_counts=facet_counts, facet_labels=FACET_LABELS, selected_facets=selections,
+                facet_url=_facet_url, url_with=_url_with)
+
 
 @browse_bp.route('/browse')
 def browse():
-    all_recipes = repo.get_all_recipes()
+    repo = get_repository()
     sort_by = request.args.get('sort', 'name')
-    # if sort_by == 'name':
-    #     all_recipes.sort(key=lambda r: r.name.lower())
-    # elif sort_by =='cooking_time':
-    #     all_recipes.sort(key=lambda r: r.created_date.)
-    all_recipes.sort(key=lambda r: r.name.lower())
+    if sort_by not in repo.SORT_KEYS:
+        sort_by = 'name'
+    descending = request.args.get('order') == 'desc'
     page = request.args.get(get_page_parameter(), type=int, default=1)
-    per_page = 10
-    offset = (page - 1) * per_page
-    paginated_recipes = all_recipes[offset:offset + per_page]
+    per_page = PER_PAGE
+    offset = max(page - 1, 0) * per_page
+    filters = _nutrition_filters()
+    selections = _facet_selections()
+    try:
+        if filters or selections:
+            result = repo.search_recipes(None, '', offset, per_page, after=request.args.get('after'),
+                                         sort=sort_by, descending=descending, filters=filters, facets=selections)
+        else:
+            result = repo.get_recipes_page(sort_by, offset, per_page, descending, after=request.args.get('after'))
+    except ValueError:
+        abort(400)
+    facet_counts = repo.facet_counts(None, '', filters, selections)
 
-    pagination = Pagination(page=page, total=len(all_recipes), per_page=per_page, css_framework='bootstrap5')
-    return render_template('browse.html', recipes=paginated_recipes, pagination=pagination)
+    return render_template('browse.html', recipes=result.recipes, pagination=_pagination(result, per_page),
+                           sort_by=sort_by, descending=descending, next_cursor=result.next_cursor,
+                           filters=format_nutrition_filters(filters) or None,
+                           **_facet_context(facet_counts, selections))
 
 @browse_bp.route('/search')
 def search():
     query = request.args.get('query', '')
     criteria = request.args.get('criteria', 'name')
-    
-    if criteria == 'name':
-        results = repo.find_by_name(query)
-    elif criteria == 'category':
-        results = repo.find_by_category(query)
-    elif criteria == 'author':
-        results = repo.find_by_author(query)
-    else:
-        results = []
+    repo = get_repository()
+    sort_by = request.args.get('sort')
+    if sort_by not in repo.SORT_KEYS:
+        sort_by = None
+    # Ingredient queries are boolean expressions; the checkbox is ignored there.
+    fuzzy = request.args.get('fuzzy') in ('1', 'on', 'true') and criteria in repo.FUZZY_CRITERIA
     
     back_url = '/browse'
 
-    
     page = request.args.get(get_page_parameter(), type=int, default=1)
-    per_page = 10
-    offset = (page - 1) * per_page
-    paginated_results = results[offset:offset + per_page]
+    per_page = PER_PAGE
+    offset = max(page - 1, 0) * per_page
+    filters = _nutrition_filters()
+    selections = _facet_selections()
+    try:
+        result = repo.search_recipes(criteria, query, offset, per_page, after=request.args.get('after'),
+                                     sort=sort_by, filters=filters, facets=selections, fuzzy=fuzzy)
+    except ValueError:
+        abort(400)
+    facet_counts = repo.facet_counts(criteria, query, filters, selections, fuzzy=fuzzy)
+    # Offer a typo-tolerant retry when an exact search finds nothing.
+    suggest_fuzzy = not fuzzy and result.total == 0 and criteria in repo.FUZZY_CRITERIA and bool(query)
+
+    return render_template('search_results.html', query=query, criteria=criteria, results=result.recipes,
+                           pagination=_pagination(result, per_page), back_url=back_url,
+                           sort_by=sort_by, next_cursor=result.next_cursor, fuzzy=fuzzy,
+                           suggest_fuzzy=suggest_fuzzy, filters=format_nutrition_filters(filters) or None,
+                           **_facet_context(facet_counts, selections))
+
+@browse_bp.route('/pantry')
+def pantry():
+    # One ingredient per line (or ';'-separated); commas occur inside
+    # ingredient names such as "lemon, juice of".
+    text = request.args.get('ingredients', '')
+    ingredients = [item.strip() for item in re.split(r'[;\n]', text) if item.strip()]
+    ingredients += request.args.getlist('ingredient')
+    limit = min(max(request.args.get('limit', type=int, default=12), 1), 50)
+    matches = get_repository().find_by_pantry(ingredients, limit) if ingredients else []
+    return render_template('pantry.html', ingredients=text, matches=matches)
 
-    pagination = Pagination(page=page, total=len(results), per_page=per_page, css_framework='bootstrap5')
-    return render_template('search_results.html', query=query, criteria=criteria, results=paginated_results, pagination=pagination, back_url=back_url)
\ No newline at end of file
+
+@browse_bp.route('/autocomplete')
+def autocomplete():
+    repo = get_repository()
+    prefix = request.args.get('prefix', '')
+    criteria = request.args.get('criteria', 'name')
+    limit = min(max(request.args.get('limit', type=int, default=AUTOCOMPLETE_LIMIT), 1), 20)
+    try:
+        suggestions = repo.suggest(criteria, prefix, limit)
+    except ValueError:
+        abort(400)
+    return Response(ujson.dumps({'prefix': prefix, 'criteria': criteria, 'suggestions': suggestions},
+                                ensure_ascii=False),
+                    mimetype='application/json')
@@ -1,10 +1,13 @@
+from recipe.domainmodel.ordered_set import OrderedSet
 from recipe.domainmodel.recipe import Recipe
 
 class Author:
+    __slots__ = ('__id', '__name', '__recipes')
+
     def __init__(self, author_id: int, name: str, recipes: list["Recipe"] = None):
         self.__id = author_id
         self.__name = name
-        self.__recipes = recipes if recipes is not None else []
+        self.__recipes = OrderedSet(recipes if recipes is not None else ())
 
     def __repr__(self) -> str:
         return f"<Author {self.id}: {self.name}>"
@@ -31,7 +34,7 @@ class Author:
         return self.__name
 
     @property
-    def recipes(self) -> list["Recipe"]:
+    def recipes(self) -> OrderedSet:
         return self.__recipes
 
     def add_recipe(self, recipe: "Recipe") -> None:
@@ -1,10 +1,13 @@
+from recipe.domainmodel.ordered_set import OrderedSet
 from recipe.domainmodel.recipe import Recipe
 
 class Category:
+    __slots__ = ('__id', '__name', '__recipes')
+
     def __init__(self, name: str, recipes: list[Recipe] = None, category_id: int = None):
         self.__id = category_id
         self.__name = name
-        self.__recipes = recipes if recipes is not None else []
+        self.__recipes = OrderedSet(recipes if recipes is not None else ())
 
     def __repr__(self) -> str:
         return f"<Category {self.id}: {self.name}>"
@@ -31,7 +34,7 @@ class Category:
         return self.__name
 
     @property
-    def recipes(self) -> list[Recipe]:
+    def recipes(self) -> OrderedSet:
         return self.__recipes
 
     def add_recipe(self, recipe: Recipe) -> None:
@@ -0,0 +1,14 @@
+class DeferredField:
+    """A raw value that is decoded the first time a domain object reads it."""
+
+    __slots__ = ('raw', 'decoder')
+
+    def __init__(self, raw, decoder):
+        self.raw = raw
+        self.decoder = decoder
+
+    def __repr__(self) -> str:
+        return f"<DeferredField {self.raw[:40]!r}>"
+
+    def decode(self):
+        return self.decoder(self.raw)
@@ -1,6 +1,8 @@
 from recipe.domainmodel.recipe import Recipe
 
 class Favourite:
+    __slots__ = ('__id', '__user', '__recipe')
+
     def __init__(self, id: int, user, recipe: Recipe):
         if not isinstance(id, int):
             raise ValueError("id must be an integer.")
@@ -1,4 +1,55 @@
-class Nutrition:
+class BaseNutrition:
+    """Identity, ordering and the health rating formula shared by
+    ``Nutrition`` and table-backed views; subclasses provide the values."""
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return f"<Nutrition {self.id}>"
+
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, BaseNutrition):
+            return False
+        return self.id == other.id
+    
+    
+    def __lt__(self, other) -> bool:
+        if not isinstance(other, BaseNutrition):
+            raise TypeError("Comparison must be between Nutrition instances")
+        return self.id < other.id
+
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+    
+
+    def create_health_rating(self):
+        if self.calories <= 0:
+            return None
+        
+        factor = 100 / self.calories
+        fat = self.fat * factor
+        sat_fat = self.saturated_fat * factor
+        chol = self.cholesterol * factor / 1000
+        sodium = self.sodium * factor / 1000
+        carbs = self.carbohydrates * factor
+        sugar = self.sugar * factor
+        protein = self.protein * factor
+        fiber = self.fiber * factor
+
+        unhealthy = 0.5 * fat + 1.0 * sat_fat + 0.5 * chol + 1.0 * sodium + 0.01 * carbs + 1.0 * sugar
+        healthy = 2.0 * protein + 3.0 * fiber
+        net = healthy - unhealthy
+        scaled = net / 5 + 2.5
+        stars = max(0, min(5, scaled))
+        return round(stars)
+
+
+class Nutrition(BaseNutrition):
+    __slots__ = ('__id', '__calories', '__fat', '__saturated_fat', '__cholesterol', '__sodium', '__carbohydrates',
+                 '__fiber', '__sugar', '__protein', '__health_rating')
+
     def __init__(self, recipe_id: int,
                  calories: float | None = None,
                  fat: float | None = None,
@@ -53,48 +104,6 @@ class Nutrition:
         self.__health_rating = self.create_health_rating()
 
 
-    def __repr__(self) -> str:
-        return f"<Nutrition {self.id}>"
-
-
-    def __eq__(self, other) -> bool:
-        if not isinstance(other, Nutrition):
-            return False
-        return self.id == other.id
-    
-    
-    def __lt__(self, other) -> bool:
-        if not isinstance(other, Nutrition):
-            raise TypeError("Comparison must be between Nutrition instances")
-        return self.id < other.id
-
-
-    def __hash__(self) -> int:
-        return hash(self.__id)
-    
-
-    def create_health_rating(self):
-        if self.calories <= 0:
-            return None
-        
-        factor = 100 / self.calories
-        fat = self.fat * factor
-        sat_fat = self.saturated_fat * factor
-        chol = self.cholesterol * factor / 1000
-        sodium = self.sodium * factor / 1000
-        carbs = self.carbohydrates * factor
-        sugar = self.sugar * factor
-        protein = self.protein * factor
-        fiber = self.fiber * factor
-
-        unhealthy = 0.5 * fat + 1.0 * sat_fat + 0.5 * chol + 1.0 * sodium + 0.01 * carbs + 1.0 * sugar
-        healthy = 2.0 * protein + 3.0 * fiber
-        net = healthy - unhealthy
-        scaled = net / 5 + 2.5
-        stars = max(0, min(5, scaled))
-        return round(stars)
-
-
     @property
     def id(self) -> int:
         return self.__id
@@ -0,0 +1,167 @@
+import numpy as np
+
+from recipe.domainmodel.nutrition import BaseNutrition
+
+NUTRIENT_COLUMNS = ('calories', 'fat', 'saturated_fat', 'cholesterol', 'sodium',
+                    'carbohydrates', 'fiber', 'sugar', 'protein')
+
+# Stored in the int8 health rating column for "no rating" (calories <= 0).
+NO_RATING = -1
+
+
+def health_ratings(calories, fat, saturated_fat, cholesterol, sodium,
+                   carbohydrates, fiber, sugar, protein) -> np.ndarray:
+    """Vectorised ``Nutrition.create_health_rating``.
+
+    Performs the same float64 operations in the same order, including
+    ``round``'s round-half-to-even and how ``max(0, min(5, x))`` treats NaN,
+    so every rating is identical to the per-object one. Returns int8 with
+    ``NO_RATING`` where calories <= 0.
+    """
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        factor = 100 / calories
+        fat = fat * factor
+        sat_fat = saturated_fat * factor
+        chol = cholesterol * factor / 1000
+        sodium = sodium * factor / 1000
+        carbs = carbohydrates * factor
+        sugar = sugar * factor
+        protein = protein * factor
+        fiber = fiber * factor
+
+        unhealthy = 0.5 * fat + 1.0 * sat_fat + 0.5 * chol + 1.0 * sodium + 0.01 * carbs + 1.0 * sugar
+        healthy = 2.0 * protein + 3.0 * fiber
+        net = healthy - unhealthy
+        scaled = net / 5 + 2.5
+        stars = np.where(scaled < 5, scaled, 5.0)
+        stars = np.where(stars > 0, stars, 0.0)
+        ratings = np.rint(stars).astype(np.int8)
+    return np.where(calories <= 0, NO_RATING, ratings).astype(np.int8)
+
+
+class NutritionTable:
+    """Nutrition of a whole catalogue as one float64 array per nutrient.
+
+    Rows are appended while the CSV is read and the table is frozen into
+    NumPy arrays once at the end, which also validates every value and
+    computes all health ratings in one vectorised pass. Recipes get
+    ``NutritionView`` objects pointing at their row.
+    """
+
+    def __init__(self):
+        self._pending = []
+        self.recipe_ids = np.empty(0, dtype=np.int64)
+        self.columns = {name: np.empty(0) for name in NUTRIENT_COLUMNS}
+        self.health_rating = np.empty(0, dtype=np.int8)
+
+    def __len__(self) -> int:
+        return len(self.recipe_ids) + len(self._pending)
+
+    def append(self, recipe_id: int, values: tuple) -> "NutritionView":
+        """Add a row of ``NUTRIENT_COLUMNS`` values; returns its view."""
+        if not isinstance(recipe_id, int) or recipe_id <= 0:
+            raise ValueError("id must be a positive int.")
+        self._pending.append((recipe_id, *values))
+        return NutritionView(self, len(self) - 1)
+
+    def freeze(self):
+        if not self._pending:
+            return
+        pending = np.array(self._pending, dtype=np.float64).reshape(-1, len(NUTRIENT_COLUMNS) + 1)
+        self._pending = []
+        for i, name in enumerate(NUTRIENT_COLUMNS, start=1):
+            column = pending[:, i]
+            if (column < 0).any():
+                raise ValueError(f"{name.replace('_', ' ')} must be a non-negative float, or None.")
+            self.columns[name] = np.concatenate((self.columns[name], column))
+        self.recipe_ids = np.concatenate((self.recipe_ids, pending[:, 0].astype(np.int64)))
+        self.health_rating = np.concatenate(
+            (self.health_rating, health_ratings(*(pending[:, i] for i in range(1, len(NUTRIENT_COLUMNS) + 1)))))
+
+    def value(self, name: str, row: int) -> float:
+        if row >= len(self.recipe_ids):
+            self.freeze()
+        return float(self.columns[name][row])
+
+    def rating(self, row: int) -> int | None:
+        if row >= len(self.recipe_ids):
+            self.freeze()
+        rating = int(self.health_rating[row])
+        return None if rating == NO_RATING else rating
+
+    def recipe_id(self, row: int) -> int:
+        if row >= len(self.recipe_ids):
+            self.freeze()
+        return int(self.recipe_ids[row])
+
+    def mean_by_group(self, name: str, groups: np.ndarray) -> np.ndarray:
+        """Mean of ``name`` per group, where ``groups`` gives each row's group
+        number (0..k-1); NaN for empty groups."""
+        self.freeze()
+        totals = np.bincount(groups, weights=self.columns[name])
+        counts = np.bincount(groups, minlength=len(totals))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return totals / counts
+
+    def percentiles(self, name: str, q, rows=None) -> np.ndarray:
+        self.freeze()
+        column = self.columns[name] if rows is None else self.columns[name][rows]
+        return np.percentile(column, q)
+
+
+class NutritionView(BaseNutrition):
+    """Nutrition that reads its values from a ``NutritionTable`` row; it
+    compares equal to the ``Nutrition`` with the same id."""
+
+    __slots__ = ('_table', '_row')
+
+    def __init__(self, table: NutritionTable, row: int):
+        self._table = table
+        self._row = row
+
+    def __reduce__(self):
+        return NutritionView, (self._table, self._row)
+
+    @property
+    def id(self) -> int:
+        return self._table.recipe_id(self._row)
+
+    @property
+    def calories(self) -> float:
+        return self._table.value('calories', self._row)
+
+    @property
+    def fat(self) -> float:
+        return self._table.value('fat', self._row)
+
+    @property
+    def saturated_fat(self) -> float:
+        return self._table.value('saturated_fat', self._row)
+
+    @property
+    def cholesterol(self) -> float:
+        return self._table.value('cholesterol', self._row)
+
+    @property
+    def sodium(self) -> float:
+        return self._table.value('sodium', self._row)
+
+    @property
+    def carbohydrates(self) -> float:
+        return self._table.value('carbohydrates', self._row)
+
+    @property
+    def fiber(self) -> float:
+        return self._table.value('fiber', self._row)
+
+    @property
+    def sugar(self) -> float:
+        return self._table.value('sugar', self._row)
+
+    @property
+    def protein(self) -> float:
+        return self._table.value('protein', self._row)
+
+    @property
+    def health_rating(self) -> int | None:
+        return self._table.rating(self._row)
@@ -0,0 +1,87 @@
+class OrderedSet:
+    """Insertion-ordered collection with O(1) membership, append and remove.
+
+    Backs the collections domain objects expose as lists: it iterates in
+    insertion order, supports ``len``, indexing and ``in``, compares equal
+    to a list of the same items, and ``append``/``remove`` behave like the
+    list methods (``remove`` raises ValueError for a missing item). Equal
+    items are only kept once: ``append`` returns whether the item was added
+    and ``remove`` returns the item that was stored.
+
+    Indexing other than ``[0]``/``[-1]`` uses a list of the items, built on
+    first use and kept until an item is removed, so indexing in a loop is
+    O(1) per item.
+    """
+
+    __slots__ = ('_items', '_list')
+
+    def __init__(self, items=()):
+        self._items = {item: item for item in items}
+        self._list = None
+
+    def __getstate__(self):
+        return list(self._dict())
+
+    def __setstate__(self, items):
+        # While a reference cycle is unpickled (a recipe in its author's
+        # recipes) the items may not be hashable yet, so they are only put
+        # into the dict on first use.
+        self._items = items
+        self._list = None
+
+    def _dict(self) -> dict:
+        items = self._items
+        if type(items) is list:
+            items = self._items = {item: item for item in items}
+        return items
+
+    def __repr__(self) -> str:
+        return repr(list(self._dict()))
+
+    def __len__(self) -> int:
+        return len(self._dict())
+
+    def __iter__(self):
+        return iter(self._dict())
+
+    def __reversed__(self):
+        return reversed(self._dict())
+
+    def __contains__(self, item) -> bool:
+        return item in self._dict()
+
+    def __getitem__(self, index):
+        items = self._dict()
+        if index == 0 and items:
+            return next(iter(items))
+        if index == -1 and items:
+            return next(reversed(items))
+        if self._list is None:
+            self._list = list(items)
+        return self._list[index]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, OrderedSet):
+            return list(self._dict()) == list(other._dict())
+        if isinstance(other, (list, tuple)):
+            return list(self._dict()) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def append(self, item) -> bool:
+        items = self._dict()
+        if item in items:
+            return False
+        items[item] = item
+        if self._list is not None:
+            self._list.append(item)
+        return True
+
+    def remove(self, item):
+        try:
+            stored = self._dict().pop(item)
+        except KeyError:
+            raise ValueError(f"{item!r} not in collection") from None
+        self._list = None
+        return stored
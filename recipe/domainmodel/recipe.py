@@ -7,10 +7,17 @@ if TYPE_CHECKING:
 
 from datetime import datetime
 
-from recipe.domainmodel.nutrition import Nutrition
+from recipe.domainmodel.deferred import DeferredField
+from recipe.domainmodel.nutrition import BaseNutrition
+from recipe.domainmodel.ordered_set import OrderedSet
 from recipe.domainmodel.review import Review
 
 class Recipe:
+    __slots__ = ('__id', '__name', '__author', '__cook_time', '__preparation_time', '__date', '__description',
+                 '__images', '__category', '__ingredient_quantities', '__ingredients', '__rating', '__nutrition',
+                 '__servings', '__recipe_yield', '__instructions', '__reviews', '__rating_sum',
+                 '__rating_count')
+
     def __init__(self, recipe_id: int, name: str, author: "Author",
                  cook_time: int = 0,
                  preparation_time: int = 0,
@@ -21,7 +28,7 @@ class Recipe:
                  ingredient_quantities: list[str] = None,
                  ingredients: list[str] = None,
                  rating: float | None = None,
-                 nutrition: "Nutrition" = None,
+                 nutrition: "BaseNutrition" = None,
                  servings: str | None = None,
                  recipe_yield: str | None = None,
                  instructions: list[str] = None):
@@ -49,7 +56,11 @@ class Recipe:
         self.__servings = servings if servings else "Not specified"
         self.__recipe_yield = recipe_yield if recipe_yield else "Not specified"
         self.__instructions = instructions if instructions else []
-        self.__reviews = []
+        self.__reviews = OrderedSet()
+        # Running totals of the reviews' ratings, so adding or removing a
+        # review updates the average in O(1).
+        self.__rating_sum = 0.0
+        self.__rating_count = 0
 
     def __repr__(self) -> str:
         return (f"<Recipe {self.__name} with id: {self.id} was created by {self.__author.name} "
@@ -138,12 +149,22 @@ class Recipe:
 
     @property
     def ingredient_quantities(self) -> list[str]:
+        if type(self.__ingredient_quantities) is DeferredField:
+            self.__ingredient_quantities = self.__ingredient_quantities.decode()
         return self.__ingredient_quantities
 
     @property
     def ingredients(self) -> list[str]:
+        if type(self.__ingredients) is DeferredField:
+            self.__ingredients = self.__ingredients.decode()
         return self.__ingredients
 
+    def peek_ingredients(self) -> list[str]:
+        """The ingredients, without keeping the decoded list if they are
+        still deferred (indexing reads every recipe's once)."""
+        ingredients = self.__ingredients
+        return ingredients.decode() if type(ingredients) is DeferredField else ingredients
+
     @property
     def rating(self) -> float | None:
         return self.__rating
@@ -155,11 +176,11 @@ class Recipe:
         self.__rating = value
 
     @property
-    def nutrition(self) -> "Nutrition":
+    def nutrition(self) -> "BaseNutrition":
         return self.__nutrition
 
     @nutrition.setter
-    def nutrition(self, value: "Nutrition"):
+    def nutrition(self, value: "BaseNutrition"):
         self.__nutrition = value
 
     @property
@@ -180,6 +201,8 @@ class Recipe:
 
     @property
     def instructions(self) -> list[str]:
+        if type(self.__instructions) is DeferredField:
+            self.__instructions = self.__instructions.decode()
         return self.__instructions
 
     @instructions.setter
@@ -189,31 +212,31 @@ class Recipe:
         self.__instructions = steps
 
     @property
-    def reviews(self) -> list[Review]:
+    def reviews(self) -> OrderedSet:
         return self.__reviews
 
     def add_review(self, review: Review) -> None:
         if isinstance(review, Review):
-            self.__reviews.append(review)
-            self.__update_rating()
+            # A review equal to one already kept (same id) is not added again.
+            if self.__reviews.append(review):
+                self.__update_rating(review, 1)
         else:
             raise TypeError("Expected a Review instance")
 
     def remove_review(self, review: Review) -> None:
         if review in self.__reviews:
-            self.__reviews.remove(review)
-            self.__update_rating()
+            # Take back the rating that was counted, i.e. the stored review's.
+            self.__update_rating(self.__reviews.remove(review), -1)
         else:
             raise ValueError("Review not found in recipe's reviews")
 
-    def __update_rating(self) -> None:
-        if self.__reviews:
-            ratings = [r.rating for r in self.__reviews if
-                       hasattr(r, "rating") and r.rating is not None]
-            if ratings:
-                average_rating = sum(ratings) / len(ratings)
-                self.__rating = round(average_rating, 1)
-            else:
-                self.__rating = None
+    def __update_rating(self, review: Review, sign: int) -> None:
+        rating = getattr(review, "rating", None)
+        if rating is not None:
+            self.__rating_sum += sign * rating
+            self.__rating_count += sign
+        if self.__rating_count:
+            self.__rating = round(self.__rating_sum / self.__rating_count, 1)
         else:
-            self.__rating = None
\ No newline at end of file
+            self.__rating_sum = 0.0
+            self.__rating = None
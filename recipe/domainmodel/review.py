@@ -1,6 +1,8 @@
 from datetime import datetime
 class Review:
 # TODO: Complete the implementation of the Review class.
+    __slots__ = ('__review_id', '__user', '__recipe_id', '__rating', '__review_text', '__date_submitted')
+
     def __init__(self, review_id: int, user, recipe_id, rating: float, review_text: str, date_submitted: datetime = None):
         if not (0 <= rating <= 5):
             raise ValueError("Rating must be between 0 and 5.")
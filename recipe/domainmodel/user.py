@@ -1,13 +1,16 @@
 from recipe.domainmodel.favourite import Favourite
+from recipe.domainmodel.ordered_set import OrderedSet
 from recipe.domainmodel.review import Review
 
 class User:
+    __slots__ = ('__id', '__username', '__password', '__favourite_recipes', '__reviews')
+
     def __init__(self, username: str, password: str, user_id: int = None):
         self.__id = user_id
         self.__username = username
         self.__password = password
-        self.__favourite_recipes = []
-        self.__reviews = []
+        self.__favourite_recipes = OrderedSet()
+        self.__reviews = OrderedSet()
 
     def __repr__(self) -> str:
         return f"<User {self.id}: {self.username}>"
@@ -38,11 +41,11 @@ class User:
         return self.__password
 
     @property
-    def favourite_recipes(self) -> list["Favourite"]:
+    def favourite_recipes(self) -> OrderedSet:
         return self.__favourite_recipes
 
     @property
-    def reviews(self) -> list["Review"]:
+    def reviews(self) -> OrderedSet:
         return self.__reviews
 
     def add_favourite_recipe(self, recipe: "Favourite") -> None:
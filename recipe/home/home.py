@@ -1,13 +1,11 @@
-import random
 from flask import Blueprint, render_template, request, jsonify, session, redirect, url_for
-from recipe.adapters.memory_repo import MemoryRepository
+from recipe.adapters.repository import get_repository
 from src.agents import RouterAgent, RetrievalAgent, GenerationAgent  # Import your agent classes
 import logging
 
 logger = logging.getLogger(__name__)
 
 home_bp = Blueprint('home', __name__)
-repo = MemoryRepository()
 
 # Initialize agents
 router_agent = RouterAgent()
@@ -16,8 +14,7 @@ generation_agent = GenerationAgent()
 
 @home_bp.route('/')
 def home():
-    all_recipes = repo.get_all_recipes()
-    featured_recipes = random.sample(all_recipes, k=4)
+    featured_recipes = get_repository().get_random_recipes(4)
     
     # Check if chatbot dialog should be shown
     show_chatbot = request.args.get('show_chatbot', '0') == '1'
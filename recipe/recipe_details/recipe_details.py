@@ -1,17 +1,18 @@
 from flask import Blueprint, render_template, request, session, flash, redirect, url_for
+from flask_paginate import Pagination
 from flask_wtf import FlaskForm
 from wtforms import TextAreaField, SelectField, SubmitField
 from wtforms.validators import DataRequired, NumberRange
 from recipe.adapters.datareader.csvdatareader import CSVDataReader
-from recipe.adapters.memory_repo import MemoryRepository
+from recipe.adapters.repository import get_repository
 from recipe.domainmodel.review import Review
 from recipe.authentication.authentication import login_required
 from datetime import datetime
-import random
 import uuid
 
 recipe_details_bp = Blueprint('recipe_details', __name__, template_folder='../templates')
-repo = MemoryRepository()
+
+REVIEWS_PER_PAGE = 10
 
 class ReviewForm(FlaskForm):
     comment = TextAreaField('Comment', validators=[DataRequired(message='Comment here.')])
@@ -19,42 +20,9 @@ class ReviewForm(FlaskForm):
     submit = SubmitField('Send Review')
     
 
-def seed_sample_reviews(repo, recipe_id):
-    
-    user_lists = ["Alice", "Bob", "Charlie", "David", "Eve"]
-    date_times = [
-        datetime(2024, 9, 12, 12, 0),
-        datetime(2025, 2, 1, 15, 30),
-        datetime(2025, 2, 15, 8, 45)
-    ]
-    review_texts = [
-        "This dish is incredibly tasty and satisfying.",
-        "The flavors blend together perfectly.",
-        "It's a bit too salty for my liking.",
-        "Absolutely delicious and worth trying again!",
-        "The texture is just right, not too chewy."
-    ]
-    ratings = [3, 4, 5, 3.5, 4.5]
-    
-    num_reviews = random.randint(1, 3)  
-    for i in range(num_reviews):
-        user = random.choice(user_lists)
-        rating = random.choice(ratings)
-        review_text = random.choice(review_texts)
-        date_submitted = random.choice(date_times)
-        
-        review_obj = Review(
-            review_id=str(uuid.uuid4()),  
-            user=user,
-            recipe_id=recipe_id,
-            rating=rating,
-            review_text=review_text,
-            date_submitted=date_submitted
-        )
-        repo.add_review(review_obj)
-
 @recipe_details_bp.route('/recipe_details/<int:recipe_id>', methods=['GET', 'POST'])
 def display_recipe(recipe_id):
+    repo = get_repository()
     recipe = repo.get_recipe(recipe_id)
     if recipe is None:
         return "Recipe not found", 404
@@ -63,10 +31,10 @@ def display_recipe(recipe_id):
     
     ingredient_pairs = zip(recipe.ingredient_quantities, recipe.ingredients)
     
-    if recipe_id not in repo._reviews or not repo._reviews[recipe_id]:
-       seed_sample_reviews(repo, recipe_id)
-       
-    reviews = repo.get_reviews_for_recipe(recipe_id=recipe_id)
+    reviews_page = max(request.args.get('reviews_page', type=int, default=1), 1)
+    result = repo.get_reviews_page(recipe_id, (reviews_page - 1) * REVIEWS_PER_PAGE, REVIEWS_PER_PAGE)
+    review_pagination = Pagination(page=reviews_page, total=result.total, per_page=REVIEWS_PER_PAGE,
+                                   page_parameter='reviews_page', css_framework='bootstrap5')
     
     is_authenticated = 'user_name' in session
     form = ReviewForm() if is_authenticated else None
@@ -82,11 +50,10 @@ def display_recipe(recipe_id):
                 rating=form.rating.data,
                 date_submitted=datetime.now()
             )
-            if recipe_id not in repo._reviews:
-                repo._reviews[recipe_id] = []
-            repo._reviews[recipe_id].append(new_review)
+            repo.add_review(new_review)
             flash('Your review have been added.', 'success')
             return redirect(url_for('recipe_details.display_recipe', recipe_id=recipe_id))
     else:
         redirect(url_for('recipe_details.display_recipe', recipe_id=recipe_id))
-    return render_template('recipe.html', recipe=recipe, ingredient_pairs=ingredient_pairs, back_url=back_url, reviews=reviews, form=form)
\ No newline at end of file
+    return render_template('recipe.html', recipe=recipe, ingredient_pairs=ingredient_pairs, back_url=back_url, reviews=result.reviews,
+                           review_pagination=review_pagination, form=form)
\ No newline at end of file
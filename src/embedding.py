@@ -1,13 +1,15 @@
 from pymilvus import connections, Collection, FieldSchema, CollectionSchema, DataType, utility
 import logging
 from sentence_transformers import SentenceTransformer
-import pandas as pd
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from recipe.adapters.memory_repo import MemoryRepository
+from recipe.adapters.datareader.csvdatareader import CSVDataReader
+from recipe.adapters.memory_repo import DEFAULT_CSV_PATH
 
-repo = MemoryRepository()
+# Recipes are streamed from the CSV in batches of this size, so memory use does
+# not grow with the catalogue.
+BATCH_SIZE = 1000
 model = SentenceTransformer('all-MiniLM-L6-v2')
 
 logger = logging.getLogger(__name__)
@@ -15,31 +17,13 @@ logging.basicConfig(level=logging.DEBUG)
 
 collection = None
 
-def text_prepare() -> list:
-    recipes = repo.get_all_recipes()
-    texts = []
-    quantities = [recipe.ingredient_quantities for recipe in recipes if recipe is not None]
-    ingredients = [recipe.ingredients for recipe in recipes if recipe is not None]
-    instructions = [recipe.instructions for recipe in recipes if recipe is not None]
-    ingrs = []
-    for qt, ig in zip(quantities, ingredients):
-        ingr = list(zip(qt, ig))
-        ingrs.append(ingr)
-    
-    formated_igrs = []
-    formated_instrs = []
-    for instr in instructions:
-        formated_instr = ', '.join(instr)
-        formated_instrs.append(formated_instr)
-    for ingr in ingrs:
-        formated_igr = ', '.join(f"{qty} {igr}" for qty, igr in ingr)
-        formated_igrs.append(formated_igr)
+def recipe_text(recipe) -> str:
+    formated_igr = ', '.join(f"{qty} {igr}" for qty, igr in zip(recipe.ingredient_quantities, recipe.ingredients))
+    formated_instr = ', '.join(recipe.instructions)
+    return f"Recipe: {recipe.id}, Description: {recipe.description}, Ingredients: {formated_igr}, Instructions: {formated_instr}"
 
-    for i, recipe in enumerate(recipes):
-        text = f"Recipe: {recipes[i].id}, Description: {recipes[i].description}, Ingredients: {formated_igrs[i]}, Instructions: {formated_instrs[i]}"
-        texts.append(text)
-    
-    return texts
+def text_prepare(recipes) -> list:
+    return [recipe_text(recipe) for recipe in recipes if recipe is not None]
 
 def init_milvus_collection(drop_existing: bool = False):
     try:
@@ -101,30 +85,29 @@ def embed_text(text: str) -> list:
     logger.debug(f"Generated embedding for text (length: {len(embedding)})")
     return embedding
 
-def insert_embeding(recipes: list):
+def insert_embeding(batches):
     global collection
     if collection is None:
         raise ValueError("Uninitialize collection")
     
-    df = pd.read_csv("recipe/adapters/data/recipes.csv")
-    texts = text_prepare()
-    if df.empty or not texts:
-        raise ValueError("No data or texts to insert")
-    
-    df['text'] = texts
-    entities = [[], [], [], [], []]  # recipe_id, text_dense_vector, name, timestamp, text
-    
-    for _, row in df.iterrows():
-        embedding = embed_text(row["text"])
-        entities[0].append(row["RecipeId"])          # recipe_id
-        entities[1].append(embedding)                # text_dense_vector
-        entities[2].append(row["Name"])              # name
-        entities[3].append(row["DatePublished"])     # timestamp
-        entities[4].append(row["text"])              # text
-    
+    inserted = 0
     try:
-        mr = collection.insert(entities)
-        logger.debug(f"Inserted {mr.insert_count} entities")
+        for recipes in batches:
+            texts = text_prepare(recipes)
+            if not texts:
+                continue
+            entities = [
+                [recipe.id for recipe in recipes],                          # recipe_id
+                model.encode(texts).tolist(),                               # text_dense_vector
+                [recipe.name for recipe in recipes],                        # name
+                [recipe.date.strftime("%d %b %Y") for recipe in recipes],   # timestamp
+                texts,                                                      # text
+            ]
+            mr = collection.insert(entities)
+            inserted += mr.insert_count
+            logger.debug(f"Inserted {inserted} entities so far")
+        if not inserted:
+            raise ValueError("No data or texts to insert")
 
         collection.flush()
         logger.debug("Flushed data to Milvus")
@@ -137,10 +120,8 @@ def insert_embeding(recipes: list):
         raise
 
 try:
-    texts = text_prepare()
-    recipes = repo.get_all_recipes()
     init_collection()
-    insert_embeding(recipes=recipes)
+    insert_embeding(CSVDataReader(DEFAULT_CSV_PATH).iter_recipes(batch_size=BATCH_SIZE))
     search_params = {"metric_type": "COSINE", "params": {"nprobe": 16}}
     query_vector = model.encode("A frozen dessert recipe").tolist()
 
@@ -0,0 +1,139 @@
+import ast
+import csv
+
+import pytest
+
+from recipe.adapters.datareader.csvdatareader import CSVDataReader
+from recipe.adapters.datareader.literals import parse_string_list
+from recipe.adapters.datareader.vocabulary import Vocabulary
+from recipe.adapters.memory_repo import DEFAULT_CSV_PATH
+
+LIST_COLUMNS = ['Images', 'RecipeIngredientQuantities', 'RecipeIngredientParts', 'RecipeInstructions']
+
+
+def literal_eval_or_error(cell):
+    try:
+        return ast.literal_eval(cell)
+    except Exception:
+        return 'error'
+
+
+def parse_or_error(cell):
+    try:
+        return parse_string_list(cell)
+    except Exception:
+        return 'error'
+
+
+def test_parse_string_list_matches_literal_eval_on_whole_csv():
+    with open(DEFAULT_CSV_PATH, encoding='utf-8') as csv_file:
+        rows = list(csv.DictReader(csv_file))
+    assert rows
+    for row in rows:
+        for column in LIST_COLUMNS:
+            assert parse_or_error(row[column]) == literal_eval_or_error(row[column]), (row['RecipeId'], column)
+
+
+@pytest.mark.parametrize("cell", [
+    "['a', 'b']",
+    "[]",
+    "[ ]",
+    "['']",
+    "['it''s']",
+    "['a','b']",
+    "[\"don't\", 'stop']",
+    "['a', \"b, c\", 'd']",
+    "['tab\\tescape']",
+    "['a', ]",
+    "['a', NA]",
+    "['a'] ",
+    "['a' 'b']",
+    "['line\nbreak']",
+    "[u'prefixed']",
+    "['''triple''']",
+    "NA",
+    "character(0)",
+    "",
+    "c('a', 'b')",
+    "['unterminated",
+])
+def test_parse_string_list_edge_cases(cell):
+    assert parse_or_error(cell) == literal_eval_or_error(cell)
+
+
+def test_reader_treats_unparseable_lists_as_empty(tmp_path):
+    with open(DEFAULT_CSV_PATH, encoding='utf-8') as csv_file:
+        header = csv_file.readline()
+    row = ('99,Odd Recipe,1,Someone,10,5,15,9th Aug 2009,desc,NA,Dessert,"[\'1\', NA]",'
+           '"[\'flour\']",100,1,1,1,1,1,1,1,1,4,NA,character(0)\n')
+    csv_path = tmp_path / "recipes.csv"
+    csv_path.write_text(header + row, encoding='utf-8')
+
+    reader = CSVDataReader(csv_path)
+    reader.csv_reader()
+    recipe = reader.recipes[0]
+    assert recipe.images == []
+    assert recipe.ingredient_quantities == []
+    assert recipe.ingredients == ['flour']
+    assert recipe.instructions == []
+
+
+def test_iter_recipes_streams_same_recipes_as_csv_reader():
+    eager = CSVDataReader(DEFAULT_CSV_PATH)
+    eager.csv_reader()
+
+    streaming = CSVDataReader(DEFAULT_CSV_PATH)
+    streamed = streaming.iter_recipes()
+    first = next(streamed)
+    assert first.id == eager.recipes[0].id
+    assert streaming.recipes == []
+
+    ids = [first.id] + [recipe.id for recipe in streamed]
+    assert ids == [recipe.id for recipe in eager.recipes]
+    assert streaming.recipes == [] and streaming.nutritions == []
+    assert all(author.recipes == [] for author in streaming.authors.values())
+    assert len(streaming.ingredient_vocabulary) == 0
+    assert len(streaming.quantity_vocabulary) == 0
+
+
+def test_iter_recipes_in_batches():
+    batches = list(CSVDataReader(DEFAULT_CSV_PATH).iter_recipes(batch_size=1000))
+    assert [len(batch) for batch in batches[:-1]] == [1000] * (len(batches) - 1)
+    assert 0 < len(batches[-1]) <= 1000
+    assert sum(len(batch) for batch in batches) == 2455
+
+
+def test_lazy_reader_decodes_heavy_fields_on_first_access():
+    eager = CSVDataReader(DEFAULT_CSV_PATH)
+    eager.csv_reader()
+    lazy = CSVDataReader(DEFAULT_CSV_PATH, lazy=True)
+    lazy.csv_reader()
+
+    for eager_recipe, lazy_recipe in zip(eager.recipes, lazy.recipes):
+        assert lazy_recipe.images == eager_recipe.images
+        assert lazy_recipe.ingredients == eager_recipe.ingredients
+        assert lazy_recipe.ingredient_quantities == eager_recipe.ingredient_quantities
+        assert lazy_recipe.instructions == eager_recipe.instructions
+        assert lazy_recipe.ingredients is lazy_recipe.ingredients
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_ingredients_and_quantities_are_interned(lazy):
+    reader = CSVDataReader(DEFAULT_CSV_PATH, lazy=lazy)
+    reader.csv_reader()
+    for field, vocabulary in (('ingredients', reader.ingredient_vocabulary),
+                              ('ingredient_quantities', reader.quantity_vocabulary)):
+        terms = [term for recipe in reader.recipes for term in getattr(recipe, field)]
+        assert len({id(term) for term in terms}) == len(set(terms)) == len(vocabulary)
+        for term in terms:
+            assert vocabulary.terms[vocabulary.id_of(term)] is term
+
+
+def test_vocabulary_ids_are_stable():
+    vocabulary = Vocabulary()
+    butter = "".join(["but", "ter"])
+    assert vocabulary.intern(butter) is butter
+    assert vocabulary.intern("salt") == "salt"
+    assert vocabulary.intern("butter") is butter
+    assert (vocabulary.id_of("butter"), vocabulary.id_of("salt"), vocabulary.id_of("eggs")) == (0, 1, None)
+    assert "salt" in vocabulary and len(vocabulary) == 2
@@ -0,0 +1,67 @@
+from datetime import datetime
+
+import pytest
+
+from recipe.adapters.cursor import decode_cursor, encode_cursor
+from recipe.adapters.memory_repo import MemoryRepository
+from recipe.adapters.sorted_index import SORT_KEYS
+from recipe.domainmodel.author import Author
+from recipe.domainmodel.recipe import Recipe
+
+
+@pytest.fixture(scope="module")
+def repo():
+    return MemoryRepository()
+
+
+@pytest.mark.parametrize("key", ["pie", 15, datetime(2020, 1, 2, 3, 4), (1, 4.5), (0, 0)])
+def test_cursor_round_trip(key):
+    assert decode_cursor(encode_cursor("name", key, 38), "name") == (key, 38)
+
+
+@pytest.mark.parametrize("token", ["", "!!!", "bm90IGpzb24", encode_cursor("date", "pie", 38)])
+def test_bad_cursor_raises_value_error(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token, "name")
+
+
+def walk(fetch):
+    ids, after = [], None
+    while True:
+        page = fetch(after)
+        ids.extend(r.id for r in page.recipes)
+        if page.next_cursor is None:
+            return ids
+        after = page.next_cursor
+
+
+@pytest.mark.parametrize("sort", list(SORT_KEYS))
+@pytest.mark.parametrize("descending", [False, True])
+def test_cursor_walk_matches_offset_pages(repo, sort, descending):
+    ids = walk(lambda after: repo.get_recipes_page(sort, limit=50, descending=descending, after=after))
+    expected = [r.id for r in repo.get_recipes_page(sort, 0, repo.count_recipes(), descending).recipes]
+    assert ids == expected
+
+
+def test_search_cursor_walk_matches_find_by(repo):
+    ids = walk(lambda after: repo.search_recipes('name', 'chicken', limit=7, after=after))
+    assert ids == [r.id for r in repo.find_by_name('chicken')]
+    assert repo.search_recipes('colour', 'chicken').total == 0
+
+
+def test_cursor_pages_do_not_shift_when_recipes_are_added():
+    repo = MemoryRepository(csv_path=None)
+    author = Author(1, "John Doe")
+    for i in range(1, 21):
+        repo.add_recipe(Recipe(i, f"Recipe {i:02d}", author))
+    first = repo.get_recipes_page('name', limit=10)
+    repo.add_recipe(Recipe(21, "Recipe 00", author))
+    second = repo.get_recipes_page('name', limit=10, after=first.next_cursor)
+    assert [r.id for r in second.recipes] == list(range(11, 21))
+    assert second.next_cursor is None
+
+
+def test_cursor_for_other_ordering_is_rejected(repo):
+    token = repo.get_recipes_page('date').next_cursor
+    with pytest.raises(ValueError):
+        repo.get_recipes_page('name', after=token)
@@ -8,6 +8,7 @@ from recipe.domainmodel.recipe import Recipe
 from recipe.domainmodel.review import Review
 from recipe.domainmodel.nutrition import Nutrition
 from recipe.domainmodel.favourite import Favourite
+from recipe.domainmodel.deferred import DeferredField
 
 # Fixtures
 @pytest.fixture
@@ -224,6 +225,24 @@ def test_recipe_hash():
     assert len(recipe_set) == 1
 
 
+def test_recipe_deferred_fields_decoded_once(my_author):
+    calls = []
+
+    def decode(raw):
+        calls.append(raw)
+        return raw.split(",")
+
+    recipe = Recipe(1, "Recipe A", my_author,
+                    ingredients=DeferredField("flour,eggs", decode),
+                    instructions=DeferredField("mix,bake", decode))
+    assert calls == []
+    assert recipe.ingredients == ["flour", "eggs"]
+    assert recipe.ingredients == ["flour", "eggs"]
+    assert calls == ["flour,eggs"]
+    assert recipe.instructions == ["mix", "bake"]
+    assert recipe.ingredient_quantities == []
+
+
 def test_author_set_recipe(my_author):
     new_recipe = Recipe(200, "New Recipe", my_author)
 
@@ -363,4 +382,33 @@ def test_review_hash(my_user, my_recipe):
     review2 = Review(1, my_user, my_recipe, 5, "info")
 
     review_set = {review1, review2}
-    assert len(review_set) == 1
\ No newline at end of file
+    assert len(review_set) == 1
+
+
+def test_recipe_rating_follows_reviews():
+    recipe = Recipe(1, "Soup", Author(1, "John Doe"))
+    reviews = [Review(i, "user", 1, rating, "") for i, rating in enumerate([5, 3.5, 4, 1, 2.5, 4.5])]
+    for i, review in enumerate(reviews):
+        recipe.add_review(review)
+        ratings = [r.rating for r in reviews[:i + 1]]
+        assert recipe.rating == round(sum(ratings) / len(ratings), 1)
+    for i, review in enumerate(reviews[:-1]):
+        recipe.remove_review(review)
+        ratings = [r.rating for r in reviews[i + 1:]]
+        assert recipe.rating == round(sum(ratings) / len(ratings), 1)
+    recipe.remove_review(reviews[-1])
+    assert recipe.rating is None
+
+
+def test_recipe_rating_ignores_duplicate_review_ids():
+    recipe = Recipe(1, "Soup", Author(1, "John Doe"))
+    first = Review(1, "user", 1, 4.0, "")
+    recipe.add_review(first)
+    recipe.add_review(Review(1, "user", 1, 2.0, ""))
+    assert len(recipe.reviews) == 1 and recipe.rating == 4.0
+    recipe.add_review(Review(2, "user", 1, 3.0, ""))
+    # Removing by an equal review takes back the stored review's rating.
+    recipe.remove_review(Review(1, "user", 1, 1.0, ""))
+    assert recipe.reviews == [Review(2, "user", 1, 3.0, "")] and recipe.rating == 3.0
+    recipe.remove_review(Review(2, "user", 1, 5.0, ""))
+    assert len(recipe.reviews) == 0 and recipe.rating is None
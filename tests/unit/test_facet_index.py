@@ -0,0 +1,78 @@
+from collections import Counter
+
+import pytest
+
+from recipe.adapters.facet_index import FACETS, FacetIndex, cook_time_bucket
+from recipe.adapters.memory_repo import MemoryRepository
+from recipe.adapters.nutrition_index import parse_nutrition_filters
+from recipe.domainmodel.author import Author
+from recipe.domainmodel.recipe import Recipe
+
+
+@pytest.fixture(scope="module")
+def repo():
+    return MemoryRepository()
+
+
+def naive_counts(recipes):
+    counts = {}
+    for name, value_of in FACETS.items():
+        counter = Counter(value_of(recipe) for recipe in recipes)
+        counter.pop(None, None)
+        counts[name] = sorted(counter.items(), key=lambda item: (-item[1], item[0]))
+    return counts
+
+
+def test_cook_time_buckets():
+    assert [cook_time_bucket(m) for m in (0, 1, 14, 15, 59, 60, 120, 10080)] == [
+        'No cooking', 'Under 15 min', 'Under 15 min', '15-30 min', '30-60 min', '1-2 hours', 'Over 2 hours',
+        'Over 2 hours']
+
+
+def test_catalogue_counts(repo):
+    assert repo.facet_counts(limit=None) == naive_counts(repo.get_all_recipes())
+
+
+def test_search_counts_with_filters(repo):
+    filters = parse_nutrition_filters("calories<400")
+    recipes = [r for r in repo.find_by_name("chicken") if r.nutrition.calories < 400]
+    assert repo.facet_counts('name', 'chicken', filters, limit=None) == naive_counts(recipes)
+    assert repo.facet_counts('name', 'chicken', filters, limit=3)['author'] == naive_counts(recipes)['author'][:3]
+
+
+def test_drill_down(repo):
+    selections = (('category', 'Dessert'), ('cook_time', '15-30 min'), ('cook_time', 'No cooking'),
+                  ('health_rating', '0'))
+    expected = [r for r in repo.get_all_recipes()
+                if r.category.name == 'Dessert' and r.nutrition.health_rating == 0
+                and cook_time_bucket(r.cook_time) in ('15-30 min', 'No cooking')]
+    page = repo.search_recipes(None, '', limit=1000, facets=selections)
+    assert [r.id for r in page.recipes] == [r.id for r in expected]
+    assert repo.facet_counts(facets=selections, limit=None) == naive_counts(expected)
+    assert repo.search_recipes('name', 'cake', facets=(('author', 'nobody at all'),)).total == 0
+
+
+def test_added_recipes_are_counted():
+    repo = MemoryRepository(csv_path=None)
+    repo.add_recipe(Recipe(1, "Soup", Author(1, "John Doe"), cook_time=20))
+    repo.add_recipe(Recipe(2, "Stew", Author(1, "John Doe"), cook_time=200))
+    counts = repo.facet_counts()
+    assert counts['author'] == [('John Doe', 2)]
+    assert counts['cook_time'] == [('15-30 min', 1), ('Over 2 hours', 1)]
+    assert counts['category'] == []
+    assert counts['health_rating'] == [('Unrated', 2)]
+
+
+def test_select_without_matches():
+    index = FacetIndex()
+    assert index.select((('category', 'Dessert'),)) == []
+
+
+def test_catalogue_counts_follow_added_recipes():
+    index = FacetIndex()
+    index.add(0, Recipe(1, "Soup", Author(1, "Ann"), cook_time=10))
+    assert index.counts()['author'] == [('Ann', 1)]
+    index.add(1, Recipe(2, "Stew", Author(2, "Bob"), cook_time=200))
+    index.add(2, Recipe(3, "Pie", Author(2, "Bob"), cook_time=40))
+    assert index.counts()['author'] == [('Bob', 2), ('Ann', 1)]
+    assert index.counts(limit=1)['author'] == [('Bob', 2)]
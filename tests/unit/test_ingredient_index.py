@@ -0,0 +1,114 @@
+import random
+
+import pytest
+
+from recipe.adapters.ingredient_index import (IngredientIndex, difference, intersect, parse_ingredient_query,
+                                              union)
+from recipe.adapters.memory_repo import MemoryRepository
+from recipe.domainmodel.author import Author
+from recipe.domainmodel.deferred import DeferredField
+from recipe.domainmodel.recipe import Recipe
+
+
+@pytest.fixture(scope="module")
+def repo():
+    return MemoryRepository()
+
+
+def naive(recipes, clauses):
+    ids = []
+    for recipe in recipes:
+        ingredients = {' '.join(i.lower().split()) for i in recipe.ingredients}
+        if any(ingredients.issuperset(required) and ingredients.isdisjoint(excluded)
+               for required, excluded in clauses):
+            ids.append(recipe.id)
+    return ids
+
+
+def test_parse_ingredient_query():
+    assert parse_ingredient_query("Eggs AND flour OR tofu AND NOT peanuts") == (
+        (('eggs', 'flour'), ()), (('tofu',), ('peanuts',)))
+    assert parse_ingredient_query("lemon, juice of; -milk | ") == ((('lemon, juice of',), ('milk',)),)
+    assert parse_ingredient_query("salt and pepper") == ((('salt and pepper',), ()),)
+    assert parse_ingredient_query("  ") == ()
+
+
+def test_set_operations():
+    assert intersect([1, 3, 5, 7], [0, 3, 4, 7, 9]) == [3, 7]
+    assert difference([1, 3, 5, 7], [3, 4, 7]) == [1, 5]
+    assert difference([1, 3], [0, 2, 3, 5, 8]) == [1]
+    assert union([[1, 4], [2, 4, 6], []]) == [1, 2, 4, 6]
+
+
+def test_boolean_queries_match_scan(repo):
+    recipes = repo.get_all_recipes()
+    rng = random.Random(13)
+    common = ["salt", "sugar", "butter", "eggs", "flour", "milk", "garlic", "onion", "water", "no such thing"]
+    for _ in range(150):
+        clauses = []
+        for _ in range(rng.randint(1, 3)):
+            terms = rng.sample(common, rng.randint(1, 4))
+            split = rng.randint(0, len(terms))
+            clauses.append((terms[:split], terms[split:]))
+        query = " OR ".join(" AND ".join(required + [f"NOT {term}" for term in excluded])
+                            for required, excluded in clauses)
+        assert [r.id for r in repo.find_by_ingredient(query)] == naive(recipes, clauses), query
+
+
+def test_ingredient_search_page(repo):
+    page = repo.search_recipes('ingredient', 'EGGS;  Flour ; -butter', limit=5)
+    assert page.total == len(naive(repo.get_all_recipes(), [(['eggs', 'flour'], ['butter'])]))
+    assert all({'eggs', 'flour'} <= set(r.ingredients) and 'butter' not in r.ingredients for r in page.recipes)
+
+
+def test_index_groups_duplicate_ingredients():
+    index = IngredientIndex()
+    index.add(0, ["Salt", "salt ", "pepper"])
+    index.add(2, ["salt"])
+    assert list(index.postings("SALT")) == [0, 2]
+    assert index.frequency("pepper") == 1
+    assert index.search("-salt") == [1]
+
+
+@pytest.mark.parametrize("pantry", [
+    ["eggs", "flour", "milk", "butter"],
+    ["Salt", "water", "sugar", "onion", "garlic", "olive oil", "pepper", "lemon juice"],
+    ["no such thing"],
+])
+def test_pantry_ranking_matches_scan(repo, pantry):
+    have = {' '.join(i.lower().split()) for i in pantry}
+    scored = []
+    for recipe in repo.get_all_recipes():
+        ingredients = {' '.join(i.lower().split()) for i in recipe.ingredients}
+        covered = len(ingredients & have)
+        if covered:
+            scored.append((len(ingredients) - covered, -covered, recipe.id, covered))
+    scored.sort(key=lambda s: s[:2])
+    matches = repo.find_by_pantry(pantry, k=20)
+    assert [(m.missing, -m.covered, m.recipe.id, m.covered) for m in matches] == scored[:20]
+
+
+def test_pantry_prefers_fewest_missing():
+    index = IngredientIndex()
+    index.add(0, ["eggs", "flour", "milk", "sugar", "vanilla"])
+    index.add(1, ["eggs", "salt"])
+    index.add(2, ["eggs", "flour"])
+    assert index.coverage(["eggs", "flour", "milk"], k=2) == [(2, 2, 0), (1, 1, 1)]
+
+
+def test_indexing_leaves_ingredients_deferred():
+    calls = []
+
+    def decode(raw):
+        calls.append(raw)
+        return raw.split(",")
+
+    recipe = Recipe(1, "Cake", Author(1, "Ann"), ingredients=DeferredField("flour,eggs", decode))
+    repo = MemoryRepository(csv_path=None)
+    repo.add_recipe(recipe)
+    assert [r.id for r in repo.find_by_ingredient("eggs")] == [1]
+    assert repo.suggest('ingredient', 'fl') == ["flour"]
+    # Indexing decoded a transient copy; the first real read decodes and keeps its own.
+    assert len(calls) == 1
+    assert recipe.ingredients == recipe.ingredients == ["flour", "eggs"]
+    assert len(calls) == 2
@@ -0,0 +1,74 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from recipe.adapters.memory_repo import MemoryRepository, NameNotUniqueException
+from recipe.domainmodel.author import Author
+from recipe.domainmodel.recipe import Recipe
+from recipe.domainmodel.review import Review
+from recipe.domainmodel.user import User
+
+
+@pytest.fixture
+def empty_repo():
+    return MemoryRepository(csv_path=None)
+
+
+@pytest.fixture
+def author():
+    return Author(1, "John Doe")
+
+
+def test_get_recipe_uses_index_after_add(empty_repo, author):
+    recipe = Recipe(5, "Soup", author)
+    empty_repo.add_recipe(recipe)
+    assert empty_repo.get_recipe(5) is recipe
+    assert empty_repo.get_recipe(6) is None
+
+
+def test_duplicate_recipe_id_keeps_first(empty_repo, author):
+    first = Recipe(5, "Soup", author)
+    empty_repo.add_recipe(first)
+    empty_repo.add_recipe(Recipe(5, "Other Soup", author))
+    assert empty_repo.get_recipe(5) is first
+    assert len(empty_repo.get_all_recipes()) == 2
+
+
+def test_replacing_catalogue_rebuilds_index(empty_repo, author):
+    empty_repo.add_recipe(Recipe(5, "Soup", author))
+    empty_repo._recipes = [Recipe(7, "Stew", author)]
+    assert empty_repo.get_recipe(5) is None
+    assert empty_repo.get_recipe(7).name == "Stew"
+
+
+def test_read_all_recipes_indexes_catalogue():
+    repo = MemoryRepository()
+    assert repo.get_recipe(38).name == "Low-Fat Berry Blue Frozen Dessert"
+
+
+def test_get_user_by_username(empty_repo):
+    user = User("alice", "hash")
+    empty_repo.add_user(user)
+    with pytest.raises(NameNotUniqueException):
+        empty_repo.add_user(User("alice", "other"))
+    assert empty_repo.get_user("alice") is user
+    assert empty_repo.get_user("bob") is None
+
+
+def test_reviews_are_kept_in_date_order(empty_repo):
+    rng = random.Random(23)
+    base = datetime(2024, 1, 1)
+    reviews = [Review(i, "user", 1, 4, f"review {i}", base + timedelta(days=rng.randrange(30)))
+               for i in range(300)]
+    for review in reviews:
+        empty_repo.add_review(review)
+    expected = sorted(reviews, key=lambda r: r.date_submitted, reverse=True)
+    assert [r.id for r in empty_repo.get_reviews_for_recipe(1)] == [r.id for r in expected]
+    assert empty_repo.count_reviews_for_recipe(1) == 300
+    assert empty_repo.count_reviews_for_recipe(2) == 0
+
+    page = empty_repo.get_reviews_page(1, offset=290, limit=20)
+    assert page.total == 300 and [r.id for r in page.reviews] == [r.id for r in expected[290:]]
+    assert empty_repo.get_reviews_page(1, offset=300).reviews == []
+    assert empty_repo.get_reviews_page(2) == ([], 0, 0)
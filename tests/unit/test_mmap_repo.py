@@ -0,0 +1,70 @@
+import shutil
+
+import pytest
+
+from recipe.adapters.memory_repo import DEFAULT_CSV_PATH, MemoryRepository
+from recipe.adapters.mmap_repo import MmapRepository
+from recipe.domainmodel.author import Author
+from recipe.domainmodel.recipe import Recipe
+
+
+@pytest.fixture
+def csv_copy(tmp_path):
+    csv_path = tmp_path / "recipes.csv"
+    shutil.copy(DEFAULT_CSV_PATH, csv_path)
+    return csv_path
+
+
+@pytest.fixture
+def mmap_repo(csv_copy):
+    return MmapRepository(csv_copy, cache_size=8)
+
+
+@pytest.fixture(scope="module")
+def memory_repo():
+    return MemoryRepository()
+
+
+def test_get_recipe_matches_memory_repository(mmap_repo, memory_repo):
+    for expected in memory_repo.get_all_recipes():
+        recipe = mmap_repo.get_recipe(expected.id)
+        assert recipe.name == expected.name
+        assert recipe.author.name == expected.author.name
+        assert recipe.category.name == expected.category.name
+        assert recipe.images == expected.images
+        assert recipe.ingredients == expected.ingredients
+        assert recipe.instructions == expected.instructions
+        assert recipe.nutrition.health_rating == expected.nutrition.health_rating
+    assert mmap_repo.get_recipe(999999) is None
+
+
+def test_cache_is_bounded_and_reused(mmap_repo):
+    first = mmap_repo.get_recipe(38)
+    assert mmap_repo.get_recipe(38) is first
+    for recipe in mmap_repo.get_all_recipes()[:50]:
+        mmap_repo.get_recipe(recipe.id)
+    assert len(mmap_repo._cache) == 8
+
+
+def test_index_is_persisted_and_invalidated(csv_copy, mmap_repo):
+    index_path = csv_copy.with_name(csv_copy.name + ".idx")
+    assert index_path.exists()
+    assert MmapRepository(csv_copy)._load_index(index_path)
+
+    with open(csv_copy, 'a', encoding='utf-8') as csv_file:
+        csv_file.write('\n')
+    assert not MmapRepository(csv_copy, index_path=csv_copy.with_name("other.idx"))._load_index(index_path)
+
+
+def test_search_and_listing_match_memory_repository(mmap_repo, memory_repo):
+    assert [r.id for r in mmap_repo.get_all_recipes()] == [r.id for r in memory_repo.get_all_recipes()]
+    assert [r.id for r in mmap_repo.find_by_name("cake")] == [r.id for r in memory_repo.find_by_name("cake")]
+    assert [r.id for r in mmap_repo.find_by_author("dancer")] == [r.id for r in memory_repo.find_by_author("dancer")]
+    assert len(mmap_repo.get_random_recipes(4)) == 4
+
+
+def test_added_recipes_are_kept_in_memory(mmap_repo):
+    recipe = Recipe(10 ** 9, "Brand New Stew", Author(1, "Chef"))
+    mmap_repo.add_recipe(recipe)
+    assert mmap_repo.get_recipe(10 ** 9) is recipe
+    assert mmap_repo.get_all_recipes()[-1] is recipe
@@ -0,0 +1,117 @@
+import operator
+import random
+from urllib.parse import parse_qsl
+
+import pytest
+from werkzeug.datastructures import MultiDict
+
+from recipe.adapters.memory_repo import MemoryRepository
+from recipe.adapters.nutrition_index import (NUTRIENTS, NutritionIndex, nutrition_filters_from_args,
+                                             parse_nutrition_filters)
+from recipe.adapters.sorted_index import SORT_KEYS
+from recipe.domainmodel.author import Author
+from recipe.domainmodel.nutrition import Nutrition
+from recipe.domainmodel.recipe import Recipe
+
+OPS = {'<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge, '=': operator.eq}
+
+
+@pytest.fixture(scope="module")
+def repo():
+    return MemoryRepository()
+
+
+def naive(recipes, filters):
+    ids = []
+    for recipe in recipes:
+        values = [getattr(recipe.nutrition, name) for name, _, _ in filters]
+        if all(value is not None and OPS[op](value, bound)
+               for value, (_, op, bound) in zip(values, filters)):
+            ids.append(recipe.id)
+    return ids
+
+
+def test_parse_nutrition_filters():
+    assert parse_nutrition_filters("calories<500&protein>=20&health_rating>=4&sort=name") == (
+        ('calories', '<', 500.0), ('health_rating', '>=', 4.0), ('protein', '>=', 20.0))
+    # As re-encoded by url_for after Flask split the raw arguments.
+    assert parse_nutrition_filters("calories%3C500=&protein%3E=20.5") == (
+        ('calories', '<', 500.0), ('protein', '>=', 20.5))
+    assert parse_nutrition_filters("filters=fat%3C%3D10+sugar%3D%3D0") == (('fat', '<=', 10.0), ('sugar', '=', 0.0))
+    assert parse_nutrition_filters("query=cake&transfat<3") == ()
+
+
+def request_args(query_string):
+    return MultiDict(parse_qsl(query_string, keep_blank_values=True))
+
+
+def test_filters_from_request_args():
+    assert nutrition_filters_from_args(request_args("calories<500&protein>=20&health_rating>=4&sort=name")) == (
+        ('calories', '<', 500.0), ('health_rating', '>=', 4.0), ('protein', '>=', 20.0))
+    assert nutrition_filters_from_args(request_args("calories%3C500=&protein%3E=20.5&fat=3")) == (
+        ('calories', '<', 500.0), ('fat', '=', 3.0), ('protein', '>=', 20.5))
+    assert nutrition_filters_from_args(request_args("filters=fat%3C%3D10+sugar%3D%3D0")) == (
+        ('fat', '<=', 10.0), ('sugar', '=', 0.0))
+    # Search text and facet values that look like filters are not filters.
+    assert nutrition_filters_from_args(request_args(
+        "query=calories<100&criteria=name&facet_category=low+fat<3")) == ()
+    assert nutrition_filters_from_args(request_args("query=low+calories%3C100&filters=protein>5")) == (
+        ('protein', '>', 5.0),)
+
+
+def test_random_filters_match_scan(repo):
+    recipes = repo.get_all_recipes()
+    rng = random.Random(15)
+    for _ in range(300):
+        filters = []
+        for _ in range(rng.randint(1, 3)):
+            name = rng.choice(NUTRIENTS)
+            value = getattr(rng.choice(recipes).nutrition, name)
+            filters.append((name, rng.choice(list(OPS)), value if value is not None else 3.0))
+        page = repo.search_recipes(None, '', limit=len(recipes), filters=tuple(filters))
+        assert [r.id for r in page.recipes] == naive(recipes, filters), filters
+
+
+def test_filters_narrow_search_results(repo):
+    filters = parse_nutrition_filters("calories<300&health_rating>=3")
+    page = repo.search_recipes('category', 'dessert', limit=5000, filters=filters)
+    assert [r.id for r in page.recipes] == naive(repo.find_by_category('dessert'), filters)
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_filtered_cursor_walk_is_sorted(repo, descending):
+    filters = parse_nutrition_filters("protein>=20")
+    key = SORT_KEYS['cook_time']
+    expected = sorted((r for r in repo.get_all_recipes() if r.nutrition.protein >= 20), key=lambda r: (key(r), r.id))
+    if descending:
+        expected.reverse()
+    ids, after = [], None
+    while True:
+        page = repo.search_recipes(None, '', limit=37, after=after, sort='cook_time', descending=descending,
+                                   filters=filters)
+        ids.extend(r.id for r in page.recipes)
+        after = page.next_cursor
+        if after is None:
+            break
+    assert ids == [r.id for r in expected]
+
+
+def test_added_recipes_are_filterable():
+    repo = MemoryRepository(csv_path=None)
+    author = Author(1, "John Doe")
+    for i, calories in enumerate([400.0, 100.0, 250.0], start=1):
+        repo.add_recipe(Recipe(i, f"Recipe {i}", author, nutrition=Nutrition(i, calories, 1.0, 1.0, 1.0, 1.0,
+                                                                             1.0, 1.0, 1.0, 1.0)))
+    repo.add_recipe(Recipe(4, "No nutrition", author))
+    filters = parse_nutrition_filters("calories<=250")
+    assert [r.id for r in repo.search_recipes(None, '', filters=filters).recipes] == [2, 3]
+
+
+def test_same_nutrient_filters_combine():
+    index = NutritionIndex()
+    for position, calories in enumerate([50.0, 150.0, 250.0, 350.0]):
+        index.add(position, Nutrition(position + 1, calories, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0), bulk=True)
+    index.sort()
+    assert index.filter((('calories', '>', 100.0), ('calories', '<', 300.0))) == [1, 2]
+    assert index.filter((('calories', '>', 300.0), ('calories', '<', 100.0))) == []
+    assert index.filter((('calories', '>=', 150.0),), candidates=[0, 3]) == [3]
@@ -0,0 +1,84 @@
+import pickle
+import random
+
+import numpy as np
+import pytest
+
+from recipe.adapters.datareader.csvdatareader import CSVDataReader
+from recipe.adapters.memory_repo import DEFAULT_CSV_PATH
+from recipe.domainmodel.nutrition import Nutrition
+from recipe.domainmodel.nutrition_table import NUTRIENT_COLUMNS, NutritionTable, NutritionView
+
+
+@pytest.fixture(scope="module")
+def reader():
+    reader = CSVDataReader(DEFAULT_CSV_PATH, lazy=True)
+    reader.csv_reader()
+    return reader
+
+
+def test_catalogue_uses_views_matching_standalone_nutrition(reader):
+    assert len(reader.nutrition_table) == len(reader.recipes)
+    for nutrition in reader.nutritions:
+        assert isinstance(nutrition, NutritionView)
+        values = [getattr(nutrition, name) for name in NUTRIENT_COLUMNS]
+        standalone = Nutrition(nutrition.id, *values)
+        assert standalone.health_rating == nutrition.health_rating
+        assert standalone == nutrition and hash(standalone) == hash(nutrition)
+        assert all(type(value) is float for value in values)
+
+
+def test_vectorised_rating_matches_create_health_rating_on_edge_values():
+    rng = random.Random(16)
+    interesting = [0.0, 0.5, 1.0, 2.5, 12.5, 100.0, 1e-9, 1e9, float('inf'), float('nan')]
+    table = NutritionTable()
+    rows = []
+    for i in range(1, 5001):
+        values = tuple(rng.choice(interesting) if rng.random() < 0.2 else rng.uniform(0, 500)
+                       for _ in NUTRIENT_COLUMNS)
+        rows.append(values)
+        table.append(i, values)
+    table.freeze()
+    for row, values in enumerate(rows):
+        assert table.rating(row) == Nutrition(row + 1, *values).health_rating, values
+
+
+def test_rows_added_after_freeze_are_rated(reader):
+    table = NutritionTable()
+    first = table.append(1, (100.0,) + (1.0,) * 8)
+    table.freeze()
+    second = table.append(2, (0.0,) + (1.0,) * 8)
+    assert second.health_rating is None
+    assert first.health_rating == Nutrition(1, 100.0, *(1.0,) * 8).health_rating
+
+
+def test_negative_values_are_rejected():
+    table = NutritionTable()
+    table.append(1, (100.0, -1.0) + (1.0,) * 7)
+    with pytest.raises(ValueError):
+        table.freeze()
+    with pytest.raises(ValueError):
+        table.append(0, (1.0,) * 9)
+
+
+def test_views_pickle_with_a_shared_table(reader):
+    nutritions = pickle.loads(pickle.dumps(reader.nutritions[:3]))
+    assert nutritions[0]._table is nutritions[2]._table
+    assert [n.calories for n in nutritions] == [n.calories for n in reader.nutritions[:3]]
+
+
+def test_aggregates(reader):
+    table = reader.nutrition_table
+    categories = sorted({r.category.name for r in reader.recipes})
+    codes = np.array([categories.index(r.category.name) for r in reader.recipes])
+    means = table.mean_by_group('calories', codes)
+    dessert = [r.nutrition.calories for r in reader.recipes if r.category.name == 'Dessert']
+    assert means[categories.index('Dessert')] == pytest.approx(sum(dessert) / len(dessert))
+    assert table.percentiles('protein', 50) == pytest.approx(np.median([r.nutrition.protein for r in reader.recipes]))
+
+
+def test_views_only_hold_their_table_and_row():
+    view = NutritionTable().append(1, (100.0,) + (1.0,) * 8)
+    assert NutritionView.__slots__ == ('_table', '_row')
+    assert not hasattr(view, '__dict__')
+    assert not any(name.startswith('_Nutrition__') for name in dir(view))
@@ -0,0 +1,77 @@
+import pickle
+
+import pytest
+
+from recipe.domainmodel.author import Author
+from recipe.domainmodel.category import Category
+from recipe.domainmodel.ordered_set import OrderedSet
+from recipe.domainmodel.recipe import Recipe
+from recipe.domainmodel.review import Review
+from recipe.domainmodel.user import User
+
+
+def test_list_like_api():
+    items = OrderedSet(["b", "a", "b"])
+    assert items == ["b", "a"] and items == ("b", "a") and items != ["a", "b"]
+    assert len(items) == 2 and "a" in items and "c" not in items
+    assert (items[0], items[-1], items[1:]) == ("b", "a", ["a"])
+    assert list(reversed(items)) == ["a", "b"]
+    assert items.append("c") is True and items.append("c") is False
+    assert items.remove("b") == "b"
+    assert items == ["a", "c"] and repr(items) == "['a', 'c']"
+    with pytest.raises(ValueError):
+        items.remove("b")
+    with pytest.raises(IndexError):
+        OrderedSet()[0]
+
+
+def test_domain_collections_keep_their_errors():
+    author = Author(1, "John Doe")
+    recipe = Recipe(1, "Soup", author)
+    author.add_recipe(recipe)
+    with pytest.raises(ValueError):
+        author.add_recipe(Recipe(1, "Soup again", author))
+    assert author.recipes == [recipe]
+
+    user = User("jane", "hash", 1)
+    review = Review(1, user, recipe.id, 4, "Tasty")
+    recipe.add_review(review)
+    user.add_review(review)
+    user.remove_review(review)
+    recipe.remove_review(review)
+    assert user.reviews == [] and recipe.reviews == [] and recipe.rating is None
+    with pytest.raises(ValueError):
+        user.remove_review(review)
+    with pytest.raises(ValueError):
+        recipe.remove_review(review)
+
+
+def test_pickles_inside_reference_cycles():
+    author = Author(1, "John Doe")
+    category = Category("Soups")
+    recipes = [Recipe(i, f"Soup {i}", author, category=category) for i in range(1, 4)]
+    for recipe in recipes:
+        author.add_recipe(recipe)
+        category.add_recipe(recipe)
+    loaded = pickle.loads(pickle.dumps(recipes, pickle.HIGHEST_PROTOCOL))
+    assert loaded[0].author.recipes == recipes
+    assert loaded[2] in loaded[0].category.recipes
+    assert loaded[0].author.recipes[1] is loaded[1]
+
+
+def test_positional_access_follows_changes():
+    items = OrderedSet(range(5))
+    assert [items[i] for i in range(len(items))] == [0, 1, 2, 3, 4]
+    items.append(5)
+    items.append(2)
+    assert (items[5], items[-2], items[1:3]) == (5, 4, [1, 2])
+    items.remove(1)
+    assert [items[i] for i in range(len(items))] == [0, 2, 3, 4, 5]
+    loaded = pickle.loads(pickle.dumps(items))
+    assert loaded[3] == 4 and loaded == items
+
+
+def test_indexing_in_a_loop_does_not_copy_each_time():
+    items = OrderedSet(range(20000))
+    assert sum(items[i] for i in range(len(items))) == sum(range(20000))
+    assert items._list is not None and len(items._list) == 20000
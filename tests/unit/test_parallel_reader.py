@@ -0,0 +1,45 @@
+import pytest
+
+from recipe.adapters.datareader.csvdatareader import CSVDataReader, record_boundaries
+from recipe.adapters.memory_repo import DEFAULT_CSV_PATH
+
+
+def summary(reader):
+    return [
+        (r.id, r.name, r.author.id, r.category.name, r.cook_time, r.preparation_time,
+         r.description, r.images, r.ingredient_quantities, r.ingredients, r.instructions,
+         r.servings, r.recipe_yield, r.nutrition.calories, r.nutrition.health_rating)
+        for r in reader.recipes
+    ]
+
+
+@pytest.fixture(scope="module")
+def serial_reader():
+    reader = CSVDataReader(DEFAULT_CSV_PATH)
+    reader.csv_reader()
+    return reader
+
+
+def test_record_boundaries_split_between_records():
+    boundaries = record_boundaries(DEFAULT_CSV_PATH, 16)
+    assert boundaries == sorted(boundaries)
+    with open(DEFAULT_CSV_PATH, 'rb') as csv_file:
+        data = csv_file.read()
+    assert boundaries[-1] == len(data)
+    for offset in boundaries[:-1]:
+        assert data[offset - 1:offset] == b'\n'
+        assert data[:offset].count(b'"') % 2 == 0
+
+
+def test_parallel_reader_matches_serial(serial_reader):
+    parallel = CSVDataReader(DEFAULT_CSV_PATH)
+    parallel.csv_reader(workers=2)
+
+    assert summary(parallel) == summary(serial_reader)
+    assert parallel.authors.keys() == serial_reader.authors.keys()
+    assert parallel.categories.keys() == serial_reader.categories.keys()
+    for author_id, author in parallel.authors.items():
+        assert [r.id for r in author.recipes] == [r.id for r in serial_reader.authors[author_id].recipes]
+    for recipe in parallel.recipes:
+        assert recipe.author is parallel.authors[recipe.author.id]
+        assert recipe.category is parallel.categories[recipe.category.name]
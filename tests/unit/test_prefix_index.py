@@ -0,0 +1,69 @@
+import random
+from collections import Counter
+
+import pytest
+
+from recipe.adapters.ingredient_index import normalise_ingredient
+from recipe.adapters.memory_repo import MemoryRepository
+from recipe.adapters.prefix_index import PrefixIndex
+from recipe.domainmodel.author import Author
+from recipe.domainmodel.recipe import Recipe
+
+
+@pytest.fixture(scope="module")
+def repo():
+    return MemoryRepository()
+
+
+def naive_suggest(values, prefix, limit):
+    counts = Counter(value.strip().lower() for value in values if value.strip())
+    display = {}
+    for value in values:
+        display.setdefault(value.strip().lower(), value.strip())
+    keys = sorted((key for key in counts if key.startswith(prefix.lstrip().lower())), key=lambda key: (-counts[key], key))
+    return [display[key] for key in keys[:limit]]
+
+
+@pytest.mark.parametrize("criteria, values_of", [
+    ("name", lambda r: [r.name]),
+    ("category", lambda r: [r.category.name]),
+    ("author", lambda r: [r.author.name]),
+    ("ingredient", lambda r: sorted(set(map(normalise_ingredient, r.ingredients)))),
+])
+def test_suggestions_match_counting_every_value(repo, criteria, values_of):
+    values = [value for r in repo.get_all_recipes() for value in values_of(r)]
+    rng = random.Random(19)
+    prefixes = ["a", "C", "ch", "zzz", ""] + [rng.choice(values)[:rng.randint(1, 6)] for _ in range(100)]
+    for prefix in prefixes:
+        for limit in (1, 8):
+            expected = naive_suggest(values, prefix, limit) if prefix.strip() else []
+            assert repo.suggest(criteria, prefix, limit) == expected, prefix
+
+
+def test_unknown_criteria(repo):
+    with pytest.raises(ValueError):
+        repo.suggest("servings", "4")
+
+
+def test_added_recipes_update_suggestions():
+    repo = MemoryRepository(csv_path=None)
+    assert repo.suggest('name', 'so') == []
+    repo.add_recipe(Recipe(1, "Soup", Author(1, "John Doe")))
+    assert repo.suggest('name', 'so') == ['Soup']
+    repo.add_recipe(Recipe(2, "Sorbet", Author(2, "Jane Doe"), rating=4.5))
+    assert repo.suggest('name', 'so') == ['Sorbet', 'Soup']
+    repo.add_recipe(Recipe(3, "soup", Author(1, "John Doe")))
+    assert repo.suggest('name', 'SO') == ['Soup', 'Sorbet']
+    assert repo.suggest('author', 'j') == ['John Doe', 'Jane Doe']
+
+
+def test_rating_breaks_ties():
+    index = PrefixIndex()
+    index.add("Beef Stew", bulk=True)
+    index.add("Bean Salad", 3.0, bulk=True)
+    index.add("Beef Stew", 2.0, bulk=True)
+    index.add("Bread", 5.0, bulk=True)
+    index.sort()
+    assert index.suggest("b") == ["Beef Stew", "Bread", "Bean Salad"]
+    assert index.suggest("be", limit=1) == ["Beef Stew"]
+    assert index.suggest("  ") == []
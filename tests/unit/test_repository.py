@@ -0,0 +1,38 @@
+import pytest
+
+from recipe.adapters import repository
+from recipe.adapters.memory_repo import MemoryRepository
+from recipe.domainmodel.user import User
+
+
+@pytest.fixture
+def shared_repo():
+    previous = repository.repo_instance
+    repository.set_repository(None)
+    yield repository.get_repository()
+    repository.set_repository(previous)
+
+
+def test_repository_is_built_once(shared_repo):
+    assert isinstance(shared_repo, MemoryRepository)
+    assert repository.get_repository() is shared_repo
+    assert repository.init_repository() is shared_repo
+
+
+def test_users_visible_through_shared_repository(shared_repo):
+    shared_repo.add_user(User("alice", "hash"))
+    assert repository.get_repository().get_user("alice") is not None
+
+
+def test_different_config_rebuilds_repository(shared_repo, tmp_path):
+    assert repository.init_repository({'REPOSITORY': 'memory'}) is shared_repo
+    durable = repository.init_repository({'DATA_DIR': tmp_path})
+    assert durable is not shared_repo and durable._write_log is not None
+    assert repository.get_repository() is durable
+    assert repository.init_repository({'DATA_DIR': tmp_path}) is durable
+
+
+def test_injected_repository_is_kept(shared_repo):
+    injected = MemoryRepository(csv_path=None)
+    repository.set_repository(injected)
+    assert repository.init_repository({'REPOSITORY': 'mmap'}) is injected
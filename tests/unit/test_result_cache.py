@@ -0,0 +1,89 @@
+import pytest
+
+from recipe.adapters.memory_repo import MemoryRepository
+from recipe.adapters.result_cache import ResultCache
+from recipe.adapters.sorted_index import SORT_KEYS
+from recipe.domainmodel.author import Author
+from recipe.domainmodel.recipe import Recipe
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_evicts_least_recently_used():
+    cache = ResultCache(maxsize=2)
+    cache.put("a", 1, [1])
+    cache.put("b", 1, [2])
+    assert cache.get("a", 1) == [1]
+    cache.put("c", 1, [3])
+    assert cache.get("b", 1) is None
+    assert cache.get("a", 1) == [1]
+    assert cache.stats() == {'hits': 2, 'misses': 1, 'evictions': 1, 'size': 2, 'maxsize': 2}
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = ResultCache(ttl=10, clock=clock)
+    cache.put("a", 1, [1])
+    clock.now = 9.9
+    assert cache.get("a", 1) == [1]
+    clock.now = 10
+    assert cache.get("a", 1) is None
+    assert len(cache) == 0
+
+
+def test_other_version_is_a_miss():
+    cache = ResultCache()
+    cache.put("a", 1, [1])
+    assert cache.get("a", 2) is None
+    assert cache.get("a", 1) is None
+
+
+@pytest.fixture
+def repo():
+    repo = MemoryRepository(csv_path=None)
+    author = Author(1, "John Doe")
+    for i, name in enumerate(["Mushroom Soup", "Chocolate Cake", "Mushroom Risotto"], start=1):
+        repo.add_recipe(Recipe(i, name, author, cook_time=10 - i))
+    return repo
+
+
+def test_repeated_search_is_served_from_cache(repo):
+    first = repo.search_recipes('name', 'mushroom')
+    again = repo.search_recipes('name', 'MUSHROOM', offset=1)
+    assert [r.id for r in first.recipes] == [1, 3]
+    assert [r.id for r in again.recipes] == [3]
+    assert repo.search_cache_stats()['hits'] == 1
+    assert repo.search_cache_stats()['misses'] == 1
+
+
+def test_add_recipe_invalidates_cached_results(repo):
+    assert len(repo.find_by_name("mushroom")) == 2
+    repo.add_recipe(Recipe(4, "Mushroom Pie", Author(2, "Jane Smith")))
+    assert [r.id for r in repo.find_by_name("mushroom")] == [1, 3, 4]
+    repo._recipes = []
+    assert repo.find_by_name("mushroom") == []
+
+
+def test_sorted_search_pages_and_cursors(repo):
+    page = repo.search_recipes('name', 'mushroom', limit=1, sort='cook_time')
+    assert [r.id for r in page.recipes] == [3]
+    page = repo.search_recipes('name', 'mushroom', limit=1, sort='cook_time', after=page.next_cursor)
+    assert [r.id for r in page.recipes] == [1]
+    assert page.next_cursor is None
+    with pytest.raises(ValueError):
+        repo.search_recipes('name', 'mushroom', sort='calories')
+
+
+@pytest.mark.parametrize("sort", list(SORT_KEYS))
+def test_sorted_search_matches_sorted_find_by(sort):
+    repo = MemoryRepository()
+    key = SORT_KEYS[sort]
+    expected = sorted(repo.find_by_category("dessert"), key=lambda r: (key(r), r.id))
+    page = repo.search_recipes('category', 'dessert', limit=len(expected), sort=sort)
+    assert [r.id for r in page.recipes] == [r.id for r in expected]
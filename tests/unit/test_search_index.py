@@ -0,0 +1,104 @@
+import math
+import random
+
+import pytest
+
+from recipe.adapters.memory_repo import MemoryRepository
+from recipe.adapters.search_index import NGramIndex, ngrams
+
+
+@pytest.fixture(scope="module")
+def repo():
+    return MemoryRepository()
+
+
+def naive(recipes, query, field):
+    return [r.id for r in recipes if query.lower() in field(r).lower()]
+
+
+def sample_queries(values, count=200):
+    rng = random.Random(235)
+    queries = ["", "a", "ch", "cake", "CHICKEN", "zzzz", "é", " and ", "1/2"]
+    for _ in range(count):
+        value = rng.choice(values)
+        start = rng.randrange(len(value))
+        queries.append(value[start:start + rng.randint(1, 8)])
+    return queries
+
+
+@pytest.mark.parametrize("method, field", [
+    ("find_by_name", lambda r: r.name),
+    ("find_by_category", lambda r: r.category.name),
+    ("find_by_author", lambda r: r.author.name),
+])
+def test_index_matches_substring_scan(repo, method, field):
+    recipes = repo.get_all_recipes()
+    for query in sample_queries([field(r) for r in recipes]):
+        assert [r.id for r in getattr(repo, method)(query)] == naive(recipes, query, field), query
+
+
+def test_ngram_index_groups_identical_values():
+    index = NGramIndex()
+    index.add(0, "Dessert")
+    index.add(1, "Beverages")
+    index.add(2, "dessert")
+    assert len(index) == 2
+    assert index.search("SSER") == [0, 2]
+    assert index.search("bev") == [1]
+    assert index.search("e") == [0, 1, 2]
+    assert index.search("tea") == []
+
+
+def naive_similar(recipes, query, field, threshold):
+    # Ties are ranked by the value's first appearance, then catalogue order.
+    grams = ngrams(query.lower())
+    first_seen = {}
+    scored = []
+    for position, r in enumerate(recipes):
+        text = field(r).lower()
+        first_seen.setdefault(text, position)
+        value = ngrams(text)
+        shared = len(grams & value)
+        if not grams:
+            # Too short for a trigram: substring matches, all scored alike.
+            if query.lower() in text:
+                scored.append((0, 0, first_seen[text], position, r.id))
+        elif shared >= max(1, math.ceil(threshold * len(grams))):
+            scored.append((-shared / len(grams), -shared / len(grams | value), first_seen[text], position, r.id))
+    return [recipe_id for *_, recipe_id in sorted(scored)]
+
+
+@pytest.mark.parametrize("criteria, field", [
+    ("name", lambda r: r.name),
+    ("author", lambda r: r.author.name),
+])
+def test_similar_matches_scoring_every_value(repo, criteria, field, monkeypatch):
+    monkeypatch.setattr(repo, 'FUZZY_BUDGET', None)
+    recipes = repo.get_all_recipes()
+    rng = random.Random(18)
+    for value in rng.sample([field(r) for r in recipes], 50) + ["choclate cake", "zzzz", "ab"]:
+        # Drop a character to make a typo.
+        i = rng.randrange(len(value))
+        query = value[:i] + value[i + 1:]
+        expected = naive_similar(recipes, query, field, repo.FUZZY_THRESHOLD)
+        assert [r.id for r in repo.find_similar(query, criteria)] == expected, query
+
+
+def test_fuzzy_search_finds_typos(repo):
+    assert repo.find_by_name("choclate cake") == []
+    names = [r.name for r in repo.find_similar("choclate cake")]
+    assert names and all("chocolate" in name.lower() and "cake" in name.lower() for name in names[:5])
+
+    first = repo.search_recipes('name', "choclate cake", limit=3, fuzzy=True)
+    second = repo.search_recipes('name', "choclate cake", limit=3, fuzzy=True, after=first.next_cursor)
+    assert [r.name for r in first.recipes + second.recipes] == names[:6]
+    with pytest.raises(ValueError):
+        repo.search_recipes('ingredient', "eggs", fuzzy=True)
+
+
+def test_similar_stops_at_budget():
+    index = NGramIndex()
+    for i in range(2000):
+        index.add(i, f"chocolate cake {i}")
+    assert len(index.similar("chocolate cake", budget=None)) == 2000
+    assert len(index.similar("chocolate cake", budget=-1)) == 256
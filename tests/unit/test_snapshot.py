@@ -0,0 +1,73 @@
+import os
+
+import pytest
+
+from recipe.adapters.datareader import snapshot
+from recipe.adapters.datareader.csvdatareader import CSVDataReader
+from recipe.adapters.memory_repo import DEFAULT_CSV_PATH, MemoryRepository
+
+
+@pytest.fixture
+def small_csv(tmp_path):
+    with open(DEFAULT_CSV_PATH, encoding='utf-8') as source:
+        lines = source.readlines()[:40]
+    csv_path = tmp_path / "recipes.csv"
+    csv_path.write_text(''.join(lines), encoding='utf-8')
+    return csv_path
+
+
+def test_snapshot_round_trip(small_csv):
+    reader = CSVDataReader(small_csv)
+    reader.csv_reader()
+    assert snapshot.save_snapshot(reader)
+
+    warm = CSVDataReader(small_csv)
+    assert snapshot.load_snapshot(warm)
+    assert [r.id for r in warm.recipes] == [r.id for r in reader.recipes]
+    assert [r.ingredients for r in warm.recipes] == [r.ingredients for r in reader.recipes]
+    assert warm.authors.keys() == reader.authors.keys()
+    assert warm.recipes[0].author is warm.authors[warm.recipes[0].author.id]
+    salt = warm.ingredient_vocabulary.intern("salt")
+    assert all(term is salt for r in warm.recipes for term in r.ingredients if term == "salt")
+
+
+def test_missing_snapshot_is_not_loaded(small_csv):
+    assert not snapshot.load_snapshot(CSVDataReader(small_csv))
+
+
+def test_stale_snapshot_is_ignored(small_csv):
+    reader = CSVDataReader(small_csv)
+    reader.csv_reader()
+    snapshot.save_snapshot(reader)
+
+    with open(small_csv, 'a', encoding='utf-8') as csv_file:
+        csv_file.write('\n')
+    assert not snapshot.load_snapshot(CSVDataReader(small_csv))
+
+
+def test_same_size_edit_is_detected_by_hash(small_csv):
+    reader = CSVDataReader(small_csv)
+    reader.csv_reader()
+    snapshot.save_snapshot(reader)
+    stat = os.stat(small_csv)
+
+    data = small_csv.read_bytes().replace(b'Dessert', b'Dissert', 1)
+    small_csv.write_bytes(data)
+    os.utime(small_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert not snapshot.load_snapshot(CSVDataReader(small_csv))
+
+
+def test_warm_repository_restores_indexes_from_snapshot(small_csv, monkeypatch):
+    cold = MemoryRepository(small_csv)
+    expected = [r.id for r in cold.search_recipes("name", "a", limit=50).recipes]
+
+    index_recipes = MemoryRepository._index_recipes
+
+    def rebuild(self):
+        assert not self._recipes, "indexes were rebuilt on a warm boot"
+        index_recipes(self)
+
+    monkeypatch.setattr(MemoryRepository, '_index_recipes', rebuild)
+    warm = MemoryRepository(small_csv)
+    assert [r.id for r in warm.search_recipes("name", "a", limit=50).recipes] == expected
+    assert warm.get_recipe(expected[0]).id == expected[0]
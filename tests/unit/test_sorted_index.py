@@ -0,0 +1,52 @@
+import random
+
+import pytest
+
+from recipe.adapters.memory_repo import MemoryRepository
+from recipe.adapters.sorted_index import SORT_KEYS
+from recipe.domainmodel.author import Author
+from recipe.domainmodel.recipe import Recipe
+
+
+@pytest.fixture(scope="module")
+def repo():
+    return MemoryRepository()
+
+
+def expected_order(recipes, sort, descending=False):
+    key = SORT_KEYS[sort]
+    ordered = sorted(recipes, key=lambda r: (key(r), r.id))
+    return ordered[::-1] if descending else ordered
+
+
+@pytest.mark.parametrize("sort", list(SORT_KEYS))
+@pytest.mark.parametrize("descending", [False, True])
+def test_pages_match_full_sort(repo, sort, descending):
+    expected = [r.id for r in expected_order(repo.get_all_recipes(), sort, descending)]
+    for offset in (0, 10, 1230, len(expected) - 5, len(expected) + 10):
+        page = repo.get_recipes_page(sort, offset, 10, descending)
+        assert [r.id for r in page.recipes] == expected[offset:offset + 10]
+        assert page.total == len(expected)
+
+
+def test_name_order_matches_old_browse_sort(repo):
+    expected = sorted(repo.get_all_recipes(), key=lambda r: r.name.lower())
+    assert [r.name for r in repo.get_recipes_page('name', 0, 50).recipes] == [r.name for r in expected[:50]]
+
+
+def test_added_recipes_are_inserted_in_order():
+    repo = MemoryRepository(csv_path=None)
+    author = Author(1, "John Doe")
+    rng = random.Random(10)
+    recipes = [Recipe(i, f"Recipe {rng.randint(0, 1000)}", author, cook_time=rng.randint(0, 90))
+               for i in range(1, 101)]
+    for recipe in recipes:
+        repo.add_recipe(recipe)
+    for sort in ('name', 'cook_time'):
+        assert repo.get_recipes_page(sort, 0, 100).recipes == expected_order(recipes, sort)
+    assert repo.count_recipes() == 100
+
+
+def test_unknown_sort_key_raises():
+    with pytest.raises(ValueError):
+        MemoryRepository(csv_path=None).get_recipes_page('calories')
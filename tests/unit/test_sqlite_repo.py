@@ -0,0 +1,194 @@
+import threading
+from datetime import datetime
+
+import pytest
+
+from recipe.adapters.memory_repo import DEFAULT_CSV_PATH, MemoryRepository, NameNotUniqueException
+from recipe.adapters.nutrition_index import parse_nutrition_filters
+from recipe.adapters.sqlite_repo import SQLiteRepository
+from recipe.domainmodel.author import Author
+from recipe.domainmodel.favourite import Favourite
+from recipe.domainmodel.recipe import Recipe
+from recipe.domainmodel.review import Review
+from recipe.domainmodel.user import User
+
+
+@pytest.fixture(scope="module")
+def memory():
+    return MemoryRepository()
+
+
+@pytest.fixture(scope="module")
+def sqlite(tmp_path_factory):
+    repo = SQLiteRepository(path=tmp_path_factory.mktemp("sqlite") / "recipes.sqlite3")
+    yield repo
+    repo.close()
+
+
+def ids(recipes):
+    return [recipe.id for recipe in recipes]
+
+
+def same_page(a, b):
+    # Cursors are compared by following them: recipes without a publication
+    # date are stamped with their load time, which differs between backends.
+    assert ids(a.recipes) == ids(b.recipes)
+    assert (a.total, a.offset, a.next_cursor is None) == (b.total, b.offset, b.next_cursor is None)
+
+
+def test_catalogue_matches_memory(memory, sqlite):
+    assert sqlite.count_recipes() == memory.count_recipes()
+    assert ids(sqlite.get_all_recipes()) == ids(memory.get_all_recipes())
+    expected = memory.get_all_recipes()[17]
+    recipe = sqlite.get_recipe(expected.id)
+    assert (recipe.name, recipe.author.name, recipe.category.name, recipe.ingredients, recipe.date) == \
+        (expected.name, expected.author.name, expected.category.name, expected.ingredients, expected.date)
+    assert recipe.nutrition.health_rating == expected.nutrition.health_rating
+    assert sqlite.get_recipe(-1) is None
+
+
+@pytest.mark.parametrize("sort", MemoryRepository.SORT_KEYS)
+@pytest.mark.parametrize("descending", [False, True])
+def test_pages_and_cursors_match_memory(memory, sqlite, sort, descending):
+    expected = memory.get_recipes_page(sort, offset=30, limit=7, descending=descending)
+    page = sqlite.get_recipes_page(sort, offset=30, limit=7, descending=descending)
+    same_page(page, expected)
+    same_page(sqlite.get_recipes_page(sort, limit=7, descending=descending, after=page.next_cursor),
+              memory.get_recipes_page(sort, limit=7, descending=descending, after=expected.next_cursor))
+
+
+@pytest.mark.parametrize("criteria, query", [
+    ('name', 'chicken'), ('name', 'Pie'), ('name', 'ya'), ('name', ''), ('category', 'dessert'),
+    ('author', 'kitten'), ('ingredient', 'eggs AND flour AND NOT milk'), ('ingredient', 'tofu | -salt'),
+    (None, ''), ('unknown', 'x'),
+])
+def test_search_matches_memory(memory, sqlite, criteria, query):
+    same_page(sqlite.search_recipes(criteria, query, limit=5), memory.search_recipes(criteria, query, limit=5))
+    filters = parse_nutrition_filters("calories<500 protein>=5")
+    facets = (('cook_time', 'Under 15 min'), ('cook_time', '1-2 hours'), ('health_rating', '3'))
+    for sort in (None, 'rating', 'date'):
+        for descending in (False, True):
+            kwargs = dict(sort=sort, descending=descending, filters=filters, facets=facets, limit=4)
+            expected = memory.search_recipes(criteria, query, **kwargs)
+            page = sqlite.search_recipes(criteria, query, **kwargs)
+            same_page(page, expected)
+            same_page(sqlite.search_recipes(criteria, query, after=page.next_cursor, **kwargs),
+                      memory.search_recipes(criteria, query, after=expected.next_cursor, **kwargs))
+    assert sqlite.facet_counts(criteria, query, limit=None) == memory.facet_counts(criteria, query, limit=None)
+    assert sqlite.facet_counts(criteria, query, filters, facets) == memory.facet_counts(criteria, query, filters,
+                                                                                        facets)
+
+
+def test_find_matches_memory(memory, sqlite):
+    assert ids(sqlite.find_by_name("cake")) == ids(memory.find_by_name("cake"))
+    assert ids(sqlite.find_by_category("bread")) == ids(memory.find_by_category("bread"))
+    assert ids(sqlite.find_by_author("ann")) == ids(memory.find_by_author("ann"))
+    assert ids(sqlite.find_by_ingredient("butter; sugar")) == ids(memory.find_by_ingredient("butter; sugar"))
+    pantry = ["eggs", "Flour", "butter", "milk", "sugar"]
+    assert [(m.recipe.id, m.covered, m.missing) for m in sqlite.find_by_pantry(pantry)] == \
+        [(m.recipe.id, m.covered, m.missing) for m in memory.find_by_pantry(pantry)]
+
+
+@pytest.mark.parametrize("criteria, query", [
+    ('name', 'choclate cake'), ('name', 'chiken soup'), ('category', 'desert'), ('author', 'kittn'), ('name', 'pi'),
+])
+def test_fuzzy_matches_memory(memory, sqlite, criteria, query):
+    assert ids(sqlite.find_similar(query, criteria)) == ids(memory.find_similar(query, criteria))
+    expected = memory.search_recipes(criteria, query, limit=3, fuzzy=True)
+    page = sqlite.search_recipes(criteria, query, limit=3, fuzzy=True)
+    same_page(page, expected)
+    assert page.next_cursor == expected.next_cursor
+    same_page(sqlite.search_recipes(criteria, query, limit=3, fuzzy=True, after=page.next_cursor),
+              memory.search_recipes(criteria, query, limit=3, fuzzy=True, after=expected.next_cursor))
+    assert sqlite.facet_counts(criteria, query, fuzzy=True) == memory.facet_counts(criteria, query, fuzzy=True)
+    with pytest.raises(ValueError):
+        sqlite.find_similar(query, 'ingredient')
+
+
+@pytest.mark.parametrize("criteria, prefix", [
+    ('name', 'c'), ('name', 'chi'), ('category', 'b'), ('author', 'Ma'), ('ingredient', 'light '),
+    ('ingredient', 'egg'), ('name', 'zzzz'),
+])
+def test_suggestions_match_memory(memory, sqlite, criteria, prefix):
+    assert sqlite.suggest(criteria, prefix, 8) == memory.suggest(criteria, prefix, 8)
+    with pytest.raises(ValueError):
+        sqlite.suggest('nonsense', prefix)
+
+
+def test_reload_only_when_csv_changes(sqlite):
+    version = sqlite._catalogue_version()
+    sqlite.read_all_recipes(DEFAULT_CSV_PATH)
+    assert sqlite._catalogue_version() == version
+    sqlite.read_all_recipes(DEFAULT_CSV_PATH, use_snapshot=False)
+    assert sqlite._catalogue_version() == version + 1
+
+
+def test_added_recipes_are_searchable(tmp_path):
+    repo = SQLiteRepository(csv_path=None, path=tmp_path / "db.sqlite3")
+    repo.add_recipe(Recipe(1, "Pumpkin Soup", Author(1, "John Doe"), cook_time=20, ingredients=["Pumpkin"]))
+    assert repo.facet_counts()['author'] == [('John Doe', 1)]
+    repo.add_recipe(Recipe(2, "Stew", Author(1, "John Doe"), cook_time=200))
+    assert ids(repo.find_by_name("pumpkin")) == [1]
+    assert ids(repo.find_by_ingredient("pumpkin")) == [1]
+    assert ids(repo.get_recipes_page('cook_time', descending=True).recipes) == [2, 1]
+    assert repo.suggest('author', 'jo') == ["John Doe"]
+    assert repo.facet_counts()['health_rating'] == [('Unrated', 2)]
+    assert repo.facet_counts()['author'] == [('John Doe', 2)]
+
+
+def test_users_reviews_and_favourites_persist(tmp_path):
+    path = tmp_path / "db.sqlite3"
+    repo = SQLiteRepository(csv_path=None, path=path)
+    repo.add_recipe(Recipe(1, "Soup", Author(1, "John Doe")))
+    user = User("alice", "hash", 7)
+    repo.add_user(user)
+    repo.add_review(Review(1, "alice", 1, 4, "Nice", datetime(2024, 1, 2)))
+    repo.add_review(Review(2, user, 1, 2, "Meh", datetime(2024, 1, 1)))
+    repo.add_review(Review(3, "bob", 1, 5, "Same day", datetime(2024, 1, 2)))
+    repo.add_favourite(Favourite(1, user, repo.get_recipe(1)))
+    repo.close()
+
+    reopened = SQLiteRepository(csv_path=None, path=path)
+    assert reopened.get_user("alice").password == "hash"
+    assert reopened.get_user("nobody") is None
+    reviews = reopened.get_reviews_for_recipe(1)
+    assert [r.id for r in reviews] == [1, 3, 2]
+    assert reviews[0].user == "alice"
+    assert reviews[2].user == reopened.get_user("alice")
+    page = reopened.get_reviews_page(1, offset=1, limit=1)
+    assert ([r.id for r in page.reviews], page.total, page.offset) == ([3], 3, 1)
+    assert reopened.count_reviews_for_recipe(2) == 0
+    assert [f.recipe.id for f in reopened.get_favourites_for_user(7)] == [1]
+    assert reopened.get_favourites_for_user(8) == []
+
+
+def test_threads_use_their_own_connections(tmp_path):
+    repo = SQLiteRepository(csv_path=None, path=tmp_path / "db.sqlite3")
+    repo.add_recipe(Recipe(1, "Soup", Author(1, "John Doe")))
+    errors = []
+
+    def post(n):
+        try:
+            for i in range(20):
+                repo.add_review(Review(n * 100 + i, f"user{n}", 1, 3, "ok", datetime(2024, 1, 1)))
+                repo.get_reviews_page(1)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=post, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert repo.count_reviews_for_recipe(1) == 160
+    # Each finished thread's connection was closed with it.
+    assert len(repo._connections) == 1
+
+
+def test_usernames_are_unique(tmp_path):
+    repo = SQLiteRepository(csv_path=None, path=tmp_path / "db.sqlite3")
+    repo.add_user(User("alice", "first"))
+    with pytest.raises(NameNotUniqueException):
+        SQLiteRepository(csv_path=None, path=tmp_path / "db.sqlite3").add_user(User("alice", "second"))
+    assert repo.get_user("alice").password == "first"
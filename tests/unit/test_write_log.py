@@ -0,0 +1,213 @@
+import os
+import threading
+from datetime import datetime
+
+import pytest
+
+from recipe.adapters import write_log
+from recipe.adapters.memory_repo import MemoryRepository, NameNotUniqueException
+from recipe.adapters.write_log import LOG_NAME, WriteAheadLog
+from recipe.domainmodel.author import Author
+from recipe.domainmodel.favourite import Favourite
+from recipe.domainmodel.recipe import Recipe
+from recipe.domainmodel.review import Review
+from recipe.domainmodel.user import User
+
+
+def make_repo(data_dir):
+    return MemoryRepository(csv_path=None, data_dir=data_dir)
+
+
+def test_records_replay_in_order(tmp_path):
+    log = WriteAheadLog(tmp_path)
+    log.append(('a', 1))
+    log.append(('b', 2), ('c', 3))
+    assert log.read_new() == []
+    assert WriteAheadLog(tmp_path).read_new() == [('a', 1), ('b', 2), ('c', 3)]
+
+
+def test_torn_tail_is_truncated(tmp_path):
+    log = WriteAheadLog(tmp_path)
+    log.append(('a', 1), ('b', 2))
+    path = os.path.join(tmp_path, LOG_NAME)
+    size = os.path.getsize(path)
+    with open(path, 'r+b') as f:
+        f.truncate(size - 3)
+    reopened = WriteAheadLog(tmp_path)
+    assert reopened.read_new() == [('a', 1)]
+    reopened.append(('c', 3))
+    assert WriteAheadLog(tmp_path).read_new() == [('a', 1), ('c', 3)]
+
+
+def test_corrupt_record_ends_the_log(tmp_path):
+    log = WriteAheadLog(tmp_path)
+    log.append(('a', 1))
+    log.append(('b', 2))
+    path = os.path.join(tmp_path, LOG_NAME)
+    with open(path, 'r+b') as f:
+        f.seek(-1, os.SEEK_END)
+        last = f.read(1)
+        f.seek(-1, os.SEEK_END)
+        f.write(bytes([last[0] ^ 0xFF]))
+    assert WriteAheadLog(tmp_path).read_new() == [('a', 1)]
+
+
+def test_compaction_keeps_history(tmp_path):
+    log = WriteAheadLog(tmp_path)
+    log.append(*[('n', i) for i in range(5)])
+    log.compact()
+    log.append(('n', 5))
+    assert os.path.getsize(os.path.join(tmp_path, LOG_NAME)) < 100
+    assert WriteAheadLog(tmp_path).read_new() == [('n', i) for i in range(6)]
+
+
+def test_readers_follow_other_writers_across_compaction(tmp_path):
+    reader, writer = WriteAheadLog(tmp_path), WriteAheadLog(tmp_path)
+    writer.append(('n', 0))
+    assert reader.read_new() == [('n', 0)]
+    writer.append(('n', 1))
+    writer.compact()
+    writer.append(('n', 2))
+    assert reader.read_new() == [('n', 1), ('n', 2)]
+    reader.append(('n', 3))
+    assert writer.read_new() == [('n', 3)]
+
+
+def test_readers_finish_sealed_segments_by_offset(tmp_path, monkeypatch):
+    reader, writer = WriteAheadLog(tmp_path), WriteAheadLog(tmp_path)
+    writer.append(*[('n', i) for i in range(3)])
+    assert reader.read_new() == [('n', 0), ('n', 1), ('n', 2)]
+    writer.append(('n', 3))
+    writer.compact()
+    writer.append(('n', 4))
+
+    def load_snapshot(self, header_only=False):
+        raise AssertionError("snapshot reloaded")
+
+    monkeypatch.setattr(WriteAheadLog, '_load_snapshot', load_snapshot)
+    assert reader.read_new() == [('n', 3), ('n', 4)]
+
+
+def test_lagging_reader_falls_back_to_the_snapshot(tmp_path):
+    reader, writer = WriteAheadLog(tmp_path), WriteAheadLog(tmp_path)
+    writer.append(('n', 0))
+    assert reader.read_new() == [('n', 0)]
+    for i in (1, 2):
+        writer.append(('n', i))
+        writer.compact()
+    writer.append(('n', 3))
+    # The segment the reader was part way through has been removed.
+    assert not os.path.exists(os.path.join(tmp_path, 'writes.0.log'))
+    assert reader.read_new() == [('n', 1), ('n', 2), ('n', 3)]
+
+
+def test_appends_do_not_wait_for_a_fold(tmp_path, monkeypatch):
+    log, other = WriteAheadLog(tmp_path), WriteAheadLog(tmp_path)
+    log.append(('n', 0))
+    write_temporary = WriteAheadLog._write_temporary
+    appended = []
+
+    def slow_write_temporary(self, path, write):
+        if not path.endswith(write_log.SNAPSHOT_NAME):
+            return write_temporary(self, path, write)
+        thread = threading.Thread(target=lambda: (other.append(('n', 1)), appended.append(other.read_new())))
+        thread.start()
+        thread.join(5)
+        return write_temporary(self, path, write)
+
+    monkeypatch.setattr(WriteAheadLog, '_write_temporary', slow_write_temporary)
+    log.compact()
+    assert appended == [[('n', 0)]]
+    monkeypatch.undo()
+    assert WriteAheadLog(tmp_path).read_new() == [('n', 0), ('n', 1)]
+
+
+def test_interrupted_fold_recovers(tmp_path, monkeypatch):
+    log = WriteAheadLog(tmp_path)
+    log.append(('n', 0))
+    monkeypatch.setattr(WriteAheadLog, '_fold', lambda self, generation: None)
+    log.compact()
+    monkeypatch.undo()
+    log.append(('n', 1))
+    assert WriteAheadLog(tmp_path).read_new() == [('n', 0), ('n', 1)]
+    log.compact()
+    assert WriteAheadLog(tmp_path).read_new() == [('n', 0), ('n', 1)]
+
+
+def test_interrupted_compaction_recovers(tmp_path, monkeypatch):
+    log = WriteAheadLog(tmp_path)
+    log.append(('n', 0))
+    # Crash after the snapshot was replaced but before the new log was.
+    monkeypatch.setattr(WriteAheadLog, '_new_log', lambda self, generation: None)
+    log.compact()
+    monkeypatch.undo()
+    assert WriteAheadLog(tmp_path).read_new() == [('n', 0)]
+
+
+def test_concurrent_appends_share_flushes(tmp_path, monkeypatch):
+    log = WriteAheadLog(tmp_path, commit_delay=0.005)
+    syncs = []
+    fsync = os.fsync
+    monkeypatch.setattr(write_log.os, 'fsync', lambda fd: (syncs.append(fd), fsync(fd)))
+    threads = [threading.Thread(target=log.append, args=(('n', i),)) for i in range(40)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(WriteAheadLog(tmp_path).read_new()) == [('n', i) for i in range(40)]
+    assert len(syncs) < 40
+
+
+def test_failed_flush_raises_for_the_batch(tmp_path, monkeypatch):
+    log = WriteAheadLog(tmp_path)
+
+    def fail(fd):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(write_log.os, 'fsync', fail)
+    with pytest.raises(OSError):
+        log.append(('n', 0))
+
+
+def test_repository_writes_survive_restart(tmp_path):
+    repo = MemoryRepository(data_dir=tmp_path)
+    recipe = repo.get_all_recipes()[0]
+    user = User("alice", "hash")
+    repo.add_user(user)
+    repo.add_review(Review(1, "alice", recipe.id, 4, "Nice", datetime(2024, 1, 2)))
+    repo.add_review(Review(2, user, recipe.id, 2, "Meh", datetime(2024, 1, 1)))
+    repo.add_favourite(Favourite(1, user, recipe))
+
+    restarted = MemoryRepository(data_dir=tmp_path)
+    assert restarted.get_user("alice").password == "hash"
+    reviews = restarted.get_reviews_for_recipe(recipe.id)
+    assert [r.id for r in reviews] == [1, 2]
+    assert reviews[0].user == "alice"
+    assert reviews[1].user is restarted.get_user("alice")
+    assert [f.recipe for f in restarted.get_favourites_for_user(None)] == [recipe]
+
+
+def test_favourites_of_removed_recipes_are_dropped(tmp_path):
+    repo = make_repo(tmp_path)
+    repo.add_recipe(Recipe(1, "Soup", Author(1, "John Doe")))
+    repo.add_favourite(Favourite(1, User("dave", "hash"), repo.get_recipe(1)))
+    assert make_repo(tmp_path).get_favourites_for_user(None) == []
+
+
+def test_repositories_share_writes(tmp_path):
+    first, second = make_repo(tmp_path), make_repo(tmp_path)
+    first.add_user(User("bob", "hash"))
+    first.add_review(Review(1, "bob", 1, 5, "Great", datetime(2024, 1, 1)))
+    assert second.get_user("bob") is not None
+    assert second.count_reviews_for_recipe(1) == 1
+    assert first.count_reviews_for_recipe(1) == 1
+
+
+def test_usernames_stay_unique_across_repositories(tmp_path):
+    first, second = make_repo(tmp_path), make_repo(tmp_path)
+    first.add_user(User("carol", "first"))
+    # second has not read the log since; the name is checked under its lock.
+    with pytest.raises(NameNotUniqueException):
+        second.add_user(User("carol", "second"))
+    assert second.get_user("carol").password == "first"
+    assert [record[2] for record in WriteAheadLog(tmp_path).read_new()] == ["first"]